@@ -0,0 +1,64 @@
+"""
+Compares reportng.rngescape with dominate's escape across content sizes.
+
+    python benchmarks/bench_escape.py
+"""
+
+import timeit
+import tracemalloc
+
+from dominate.util import escape as dominate_escape
+
+from reportng import rngescape
+
+SIZES = (100, 10 * 1024, 1024 * 1024, 16 * 1024 * 1024)
+LINE = 'GET /index.html?a=1&b=2 "200" <ok>\n'
+SAFE_LINE = "GET /index.html 200 ok\n"
+
+
+def _time(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def _peak(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def bench_text():
+    print(
+        "%-10s %-8s %12s %12s %8s"
+        % ("size", "content", "dominate", "rngescape", "speedup")
+    )
+    for size in SIZES:
+        number = max(1, 2**22 // size)
+        for name, line in (("unsafe", LINE), ("safe", SAFE_LINE)):
+            text = (line * (size // len(line) + 1))[:size]
+            a = _time(lambda: dominate_escape(text), number)
+            b = _time(lambda: rngescape.escape(text), number)
+            peaks = (
+                _peak(lambda: dominate_escape(text)),
+                _peak(lambda: rngescape.escape(text)),
+            )
+            print(
+                "%-10d %-8s %10.3fms %10.3fms %7.1fx %6.1f/%6.1f"
+                % ((size, name, a * 1000, b * 1000, a / b) + peaks)
+            )
+
+
+def bench_cells():
+    cells = ["cell <%d> & more" % i for i in range(100000)]
+    a = _time(lambda: [dominate_escape(c) for c in cells], 5)
+    b = _time(lambda: rngescape.escape_many(cells), 5)
+    print(
+        "%d table cells: dominate %.1fms, escape_many %.1fms, %.1fx"
+        % (len(cells), a * 1000, b * 1000, a / b)
+    )
+
+
+if __name__ == "__main__":
+    bench_text()
+    bench_cells()
@@ -0,0 +1,41 @@
+"""
+Overhead of journal mode per section, for different fsync batch sizes.
+
+    python benchmarks/bench_journal.py
+"""
+import os
+import tempfile
+import time
+
+from reportng import Reportng
+
+SECTIONS = 2000
+CONTENT = "GET /index.html 200 ok\n" * 200
+
+
+def build(**kwargs):
+    r = Reportng(report_name="journal", brand="bench", **kwargs)
+    start = time.perf_counter()
+    for i in range(SECTIONS):
+        r.section("section %d" % i, CONTENT)
+    r.sync_journal()
+    return (time.perf_counter() - start) / SECTIONS
+
+
+if __name__ == "__main__":
+    base = build()
+    print("%-24s %8.1fus per section" % ("no journal", base * 1e6))
+    with tempfile.TemporaryDirectory() as tmp:
+        for every in (1, 8, 32, 128):
+            path = os.path.join(tmp, "report-%d.journal" % every)
+            t = build(journal=path, journal_sync_every=every)
+            print(
+                "%-24s %8.1fus per section, +%.1fus"
+                % ("journal, fsync every %d" % every, t * 1e6, (t - base) * 1e6)
+            )
+        start = time.perf_counter()
+        Reportng.resume(path)
+        print(
+            "resume %d sections       %8.1fms"
+            % (SECTIONS, (time.perf_counter() - start) * 1e3)
+        )
@@ -0,0 +1,50 @@
+"""
+Throughput of sections_from_records against one section call per record.
+
+    python benchmarks/bench_records.py
+"""
+
+import time
+
+from reportng import Reportng
+
+RECORDS = 50000
+COLORS = ("red", "yellow", "blue", "green")
+
+
+def records():
+    return (
+        {
+            "title": "finding %d" % i,
+            "content": "host 10.0.%d.%d port 443 <tls> weak cipher"
+            % (i // 256, i % 256),
+            "severity": COLORS[i % len(COLORS)],
+        }
+        for i in range(RECORDS)
+    )
+
+
+def per_call():
+    r = Reportng(report_name="records", brand="bench")
+    for record in records():
+        r.section(record["title"], record["content"], section_color=record["severity"])
+    return r
+
+
+def bulk():
+    r = Reportng(report_name="records", brand="bench")
+    return r.sections_from_records(records(), color_key="severity")
+
+
+if __name__ == "__main__":
+    for name, build in (
+        ("section per record", per_call),
+        ("sections_from_records", bulk),
+    ):
+        start = time.perf_counter()
+        build()
+        seconds = time.perf_counter() - start
+        print(
+            "%-24s %8.0f records/s %8.1fus per record"
+            % (name, RECORDS / seconds, seconds / RECORDS * 1e6)
+        )
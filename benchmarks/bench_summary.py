@@ -0,0 +1,40 @@
+"""
+Time of summary statistics over 100M values, read as chunks like a file that
+does not fit in memory, and over an array in memory.
+
+    python benchmarks/bench_summary.py
+"""
+
+import time
+
+import numpy as np
+
+from reportng import Reportng, rngstats
+
+CHUNKS = 100
+CHUNK = 1000000
+
+
+def chunks():
+    rng = np.random.default_rng(0)
+    for _ in range(CHUNKS):
+        yield rng.lognormal(3, 1, CHUNK)
+
+
+if __name__ == "__main__":
+    # generating the data is timed separately
+    start = time.perf_counter()
+    for _ in chunks():
+        pass
+    generate = time.perf_counter() - start
+    start = time.perf_counter()
+    Reportng(report_name="summary", brand="bench").summary("sizes", chunks())
+    total = time.perf_counter() - start - generate
+    print("%d values in chunks   %6.2fs" % (CHUNKS * CHUNK, total))
+
+    data = np.concatenate([c for c, _ in zip(chunks(), range(20))])
+    start = time.perf_counter()
+    stats = rngstats.describe(data)
+    print("%d values in memory   %6.2fs" % (len(data), time.perf_counter() - start))
+    exact = np.percentile(data, 99)
+    print("p99 %.4f, exact %.4f" % (stats["p99"], exact))
@@ -1 +1,19 @@
-from reportng.core import Reportng, Assets, __version__, __author__
\ No newline at end of file
+import sys
+
+from reportng.__version__ import __version__, __author__
+
+__all__ = ["Reportng", "Assets", "__version__", "__author__"]
+
+if sys.version_info >= (3, 7):
+    # reportng.core pulls in dominate and the typing helpers. It is only
+    # imported when Reportng or Assets is first used so that short lived
+    # processes that only need the cli or the version do not pay for it.
+    def __getattr__(name):
+        if name in ("Reportng", "Assets"):
+            from reportng import core
+
+            return getattr(core, name)
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+else:
+    from reportng.core import Reportng, Assets
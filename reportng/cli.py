@@ -0,0 +1,448 @@
+"""
+Command line interface for reportng. Reports are described by spec files
+(JSON, YAML or a JSONL stream of specs) and rendered on a worker pool.
+
+A spec looks like::
+
+    {
+        "report_name": "Scan results",
+        "brand": "securisec",
+        "options": {"theme": "pulse", "show_progress_bar": false},
+        "output": "scan.html",
+        "sections": [
+            {"type": "section", "title": "Output", "content": "..."},
+            {"type": "table", "table_header": ["a"], "data": [["1"]]}
+        ]
+    }
+
+``type`` is the name of the ``Reportng`` method used to build the section and
+every other key is passed to it as a keyword argument.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+#: Reportng methods a spec is allowed to call
+BUILDERS = (
+    "section",
+    "sections_from_records",
+    "section_from_file",
+    "section_collapsible",
+    "image_carousel",
+    "asciinema",
+    "code",
+    "captions",
+    "table",
+    "chart",
+    "summary",
+    "cards",
+    "footer",
+    "list_group",
+    "custom_html",
+)
+
+
+class SpecError(Exception):
+    """
+    Exception when a report spec is not valid
+    """
+
+    pass
+
+
+def _load_yaml(path: Path) -> Iterator[dict]:
+    try:
+        import yaml
+    except ImportError:
+        raise SpecError("PyYAML needs to be installed to read %s" % path)
+    with open(str(path), encoding="utf-8") as f:
+        for spec in yaml.safe_load_all(f):
+            if spec:
+                yield spec
+
+
+def _load_jsonl(stream) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _load_jsonl_file(path: Path) -> Iterator[dict]:
+    with open(str(path), encoding="utf-8") as f:
+        yield from _load_jsonl(f)
+
+
+def iter_specs(sources: List[str]) -> Iterator[Tuple[str, int, dict]]:
+    """Read report specs from files. ``-`` reads a JSONL stream from stdin.
+
+    Args:
+        sources (List[str]): Paths of .json, .yaml/.yml or .jsonl files
+
+    Yields:
+        Tuple[str, int, dict]: The source, the index of the spec in the source and the spec
+    """
+    for source in sources:
+        if source == "-":
+            specs = _load_jsonl(sys.stdin)
+        else:
+            path = Path(source)
+            if path.suffix in (".yaml", ".yml"):
+                specs = _load_yaml(path)
+            elif path.suffix == ".jsonl":
+                specs = _load_jsonl_file(path)
+            else:
+                with open(str(path), encoding="utf-8") as f:
+                    specs = json.load(f)
+                if isinstance(specs, dict):
+                    specs = [specs]
+        for index, spec in enumerate(specs):
+            yield source, index, spec
+
+
+def _output_path(source: str, index: int, spec: dict, output_dir: str) -> Path:
+    if spec.get("output"):
+        return Path(output_dir, spec["output"])
+    stem = "stdin" if source == "-" else Path(source).stem
+    if index:
+        stem = "%s-%d" % (stem, index)
+    return Path(output_dir, "%s.html" % stem)
+
+
+def spec_files(value) -> Iterator[str]:
+    """
+    Strings in a spec that are paths of existing files, like images or logs
+    """
+    if isinstance(value, str):
+        if len(value) < 4096 and os.path.isfile(value):
+            yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from spec_files(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from spec_files(v)
+
+
+def section_key(options: dict, section: dict) -> str:
+    """
+    Hash of a section spec, the report options and the size and modification
+    time of the files the section uses. Sections with the same key render the
+    same.
+    """
+    h = hashlib.sha1(
+        json.dumps([options, section], sort_keys=True, default=str).encode("utf-8")
+    )
+    for path in spec_files(section):
+        st = os.stat(path)
+        h.update(("\0%s\0%d\0%d" % (path, st.st_mtime_ns, st.st_size)).encode())
+    return h.hexdigest()
+
+
+def build_report(spec: dict, cache: Dict[str, tuple] = None):
+    """Build a report from a spec
+
+    Args:
+        spec (dict): The report spec
+        cache (Dict[str, tuple], optional): Sections of a previous build by ``section_key``. Sections found in it are reused instead of built again, and it is updated to hold the sections of this build. Defaults to None.
+
+    Raises:
+        SpecError: If the spec is missing keys or uses an unknown section type
+
+    Returns:
+        Reportng: The Reportng object
+    """
+    from .core import Reportng
+
+    for k in ("report_name", "brand"):
+        if k not in spec:
+            raise SpecError("{} key not found".format(k))
+    options = spec.get("options", {})
+    report = Reportng(spec["report_name"], spec["brand"], **options)
+    sections = spec.get("sections", [])
+    keys = [None] * len(sections)
+    if cache is not None:
+        keys = [section_key(options, s) for s in sections]
+    links = [
+        s["asciinema_link"]
+        for k, s in zip(keys, sections)
+        if s.get("type") == "asciinema"
+        and "asciinema_link" in s
+        and (cache is None or k not in cache)
+    ]
+    if links:
+        report.prefetch_asciinema(links)
+    built = {}
+    for key, section in zip(keys, sections):
+        # a section repeated in the spec is built again for its own anchor
+        if cache is not None and key in cache and key not in built:
+            for s in cache[key]:
+                report._add_section(
+                    s.builder, s.html, s.title, s.anchor, s.attached, **s.meta
+                )
+            built[key] = cache[key]
+            continue
+        section = dict(section)
+        builder = section.pop("type", "section")
+        if builder not in BUILDERS:
+            raise SpecError("%s is not a valid section type" % builder)
+        count = len(report._sections)
+        getattr(report, builder)(**section)
+        built.setdefault(key, tuple(report._sections[count:]))
+    if cache is not None:
+        # only the sections of this build are kept
+        cache.clear()
+        cache.update(built)
+    return report
+
+
+_worker_assets = None
+
+
+def _init_worker(assets_rel_path: str):
+    # asset setup only happens once per worker, not once per report
+    global _worker_assets
+    if assets_rel_path and assets_rel_path != _worker_assets:
+        from .core import Assets
+
+        Assets.local(assets_rel_path)
+        _worker_assets = assets_rel_path
+
+
+def _render(job: Tuple[str, int, dict, str, str]) -> Tuple[str, int, str]:
+    source, index, spec, output_dir, assets_rel_path = job
+    _init_worker(assets_rel_path)
+    path = _output_path(source, index, spec, output_dir)
+    try:
+        report = build_report(spec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report.save(str(path))
+    except Exception as e:
+        return "%s[%d]" % (source, index), 0, "%s: %s" % (type(e).__name__, e)
+    return str(path), path.stat().st_size, ""
+
+
+def _render_batch(jobs: List[tuple]) -> List[Tuple[str, int, str]]:
+    return [_render(job) for job in jobs]
+
+
+def _bounded_map(
+    pool: Executor, jobs: Iterator[tuple], chunksize: int, window: int
+) -> Iterator[Tuple[str, int, str]]:
+    # like pool.map, but only window batches of chunksize jobs are read ahead,
+    # so that a JSONL stream of any length is not read into memory up front
+    jobs = iter(jobs)
+    pending = deque()
+    while True:
+        while len(pending) < window:
+            batch = list(islice(jobs, chunksize))
+            if not batch:
+                break
+            pending.append(pool.submit(_render_batch, batch))
+        if not pending:
+            return
+        yield from pending.popleft().result()
+
+
+def build(
+    sources: List[str],
+    output_dir: str = ".",
+    workers: int = None,
+    chunksize: int = 16,
+    assets_rel_path: str = None,
+) -> Dict[str, float]:
+    """Render all the reports described by the spec files
+
+    Args:
+        sources (List[str]): Spec files. ``-`` reads a JSONL stream from stdin
+        output_dir (str, optional): Directory to save the reports in. Defaults to ".".
+        workers (int, optional): Number of worker processes. 1 renders in process. Defaults to the number of CPUs.
+        chunksize (int, optional): Number of specs sent to a worker at once. Two batches per worker are read ahead. Defaults to 16.
+        assets_rel_path (str, optional): Use local assets with ``Assets.local``. Defaults to None.
+
+    Returns:
+        Dict[str, float]: Throughput stats of the build
+    """
+    jobs = (
+        (source, index, spec, output_dir, assets_rel_path)
+        for source, index, spec in iter_specs(sources)
+    )
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(_render, jobs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = _bounded_map(
+            pool, jobs, chunksize, 2 * (workers or os.cpu_count() or 1)
+        )
+    stats = {"reports": 0, "failed": 0, "bytes": 0}
+    try:
+        for name, size, error in results:
+            if error:
+                stats["failed"] += 1
+                logging.error("Failed to build %s: %s" % (name, error))
+            else:
+                stats["reports"] += 1
+                stats["bytes"] += size
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    stats["seconds"] = time.perf_counter() - start
+    stats["reports_per_second"] = stats["reports"] / (stats["seconds"] or 1e-9)
+    return stats
+
+
+def _build_command(args) -> int:
+    stats = build(
+        args.specs,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        assets_rel_path=args.assets,
+    )
+    print(
+        "Built %d reports (%d failed, %.1f MB) in %.2fs: %.1f reports/s"
+        % (
+            stats["reports"],
+            stats["failed"],
+            stats["bytes"] / 1024 / 1024,
+            stats["seconds"],
+            stats["reports_per_second"],
+        )
+    )
+    return 1 if stats["failed"] else 0
+
+
+def _index_command(args) -> int:
+    from . import rngsearch
+
+    stats = rngsearch.index(args.paths, db=args.db)
+    print(
+        "Indexed %d reports (%d sections), %d unchanged, %d removed in %.2fs"
+        % (
+            stats["indexed"],
+            stats["sections"],
+            stats["unchanged"],
+            stats["removed"],
+            stats["seconds"],
+        )
+    )
+    return 0
+
+
+def _search_command(args) -> int:
+    from . import rngsearch
+
+    try:
+        results = rngsearch.search(
+            " ".join(args.query), db=args.db, limit=args.limit, raw=args.raw
+        )
+    except ValueError as e:
+        # the exit status of argparse usage errors
+        print("reportng search: error: %s" % e, file=sys.stderr)
+        return 2
+    for r in results:
+        link = "%s#%s" % (r["path"], r["anchor"]) if r["anchor"] else r["path"]
+        print("%s\n    %s: %s" % (link, r["title"], r["snippet"]))
+    return 0 if results else 1
+
+
+def _serve_command(args) -> int:
+    from .rngserve import ReportServer
+
+    server = ReportServer(
+        args.spec,
+        (args.host, args.port),
+        index=args.index,
+        root=args.root,
+        local_assets=args.local_assets,
+    )
+    print("Serving %s on http://%s:%d/" % (args.spec, args.host, args.port))
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="reportng", description="Build reportng reports from the command line"
+    )
+    commands = p.add_subparsers(dest="command")
+    commands.required = True
+
+    b = commands.add_parser("build", help="Render reports from spec files")
+    b.add_argument(
+        "specs",
+        nargs="+",
+        help="JSON, YAML or JSONL spec files. - reads JSONL from stdin",
+    )
+    b.add_argument("-o", "--output-dir", default=".", help="Directory for the reports")
+    b.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes. Defaults to CPU count",
+    )
+    b.add_argument(
+        "--chunksize", type=int, default=16, help="Specs sent to a worker at once"
+    )
+    b.add_argument(
+        "--assets", default=None, help="Relative path of local assets, see Assets.local"
+    )
+    b.set_defaults(func=_build_command)
+
+    i = commands.add_parser("index", help="Add saved reports to the search index")
+    i.add_argument("paths", nargs="+", help="Report files or folders of reports")
+    i.add_argument("--db", default=None, help="Path of the search index")
+    i.set_defaults(func=_index_command)
+
+    s = commands.add_parser("search", help="Search the indexed reports")
+    s.add_argument("query", nargs="+", help="Words to search for")
+    s.add_argument("--db", default=None, help="Path of the search index")
+    s.add_argument("-n", "--limit", type=int, default=20, help="Max results")
+    s.add_argument(
+        "--raw", action="store_true", help="The query uses the SQLite FTS5 syntax"
+    )
+    s.set_defaults(func=_search_command)
+
+    v = commands.add_parser(
+        "serve", help="Preview a spec and rebuild the report when it changes"
+    )
+    v.add_argument("spec", help="JSON, YAML or JSONL spec file")
+    v.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    v.add_argument("-p", "--port", type=int, default=8000, help="Port to listen on")
+    v.add_argument(
+        "--index", type=int, default=0, help="Spec to serve when the file has many"
+    )
+    v.add_argument(
+        "--root", default=None, help="Folder of images and other files. Defaults to ."
+    )
+    v.add_argument(
+        "--local-assets",
+        action="store_true",
+        help="Serve the javascript and css from the reportng cache",
+    )
+    v.set_defaults(func=_serve_command)
+    return p
+
+
+def main(argv: List[str] = None) -> int:
+    args = parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
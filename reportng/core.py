@@ -5,20 +5,95 @@ Usage is simple. Follows header, section..., footer structure. reportng
 relies on JS for some of its dynamic properties and has been developed
 using modern browsers.
 """
+import json
 import logging
-from pathlib import Path
-from collections import OrderedDict
-from typing_extensions import Literal, TypedDict
-from typing import Union, Tuple, Dict, List
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from itertools import count
+from time import localtime, perf_counter
+from typing import Union, Tuple, Dict, Iterable, List, Sequence
 import dominate
 import dominate.tags as tag
 from dominate.util import raw
 
+try:
+    from typing import Literal
+except ImportError:  # python < 3.8
+    from typing_extensions import Literal
+
 from . import rnghelpers as rng
+from .rngescape import escape, escape_many, escaped
 from .rngtypes import *
 from .__version__ import __author__, __version__
 
 
+#: Max number of rendered heads kept in memory
+HEAD_CACHE_SIZE = 64
+
+_head_cache: Dict[tuple, str] = {}
+# placeholders in cached heads
+_TITLE = "reportng-head-title-a8c1d"
+_REPORT_NAME = "reportng-head-report-name-a8c1d"
+_BRAND = "reportng-head-brand-a8c1d"
+
+
+# files that are already compressed are stored in zips as is
+_STORED_SUFFIXES = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".avif",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".gz",
+    ".zip",
+    ".mp4",
+    ".webm",
+)
+
+
+def _zip_compression(name: str) -> int:
+    import zipfile
+
+    if name.lower().endswith(_STORED_SUFFIXES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _record_stats(builder):
+    # times a builder call and records what it added to the report when the
+    # report collects stats
+    @wraps(builder)
+    def wrapper(self, *args, **kwargs):
+        if self.stats is None:
+            return builder(self, *args, **kwargs)
+        # sections are collected per thread, so that builders running
+        # concurrently on one report are not mixed up
+        outer = getattr(self._local, "added", None)
+        self._local.added = added = []
+        start = perf_counter()
+        try:
+            result = builder(self, *args, **kwargs)
+        finally:
+            self._local.added = outer
+        if outer is not None:
+            outer.extend(added)
+        self.stats.record(
+            builder.__name__,
+            " ".join(s.title for s in added),
+            perf_counter() - start,
+            "".join(s.html for s in added),
+        )
+        return result
+
+    return wrapper
+
+
 class Reportng:
     def __init__(
         self,
@@ -37,6 +112,12 @@ class Reportng:
         navbar_background: Literal[
             "primary", "red", "green", "yellow", "blue", "light"
         ] = "primary",
+        collect_stats: bool = False,
+        budget: Budget = None,
+        budget_action: Literal["warn", "raise"] = "warn",
+        dedup_threshold: int = None,
+        journal: str = None,
+        journal_sync_every: int = 32,
     ):
         """The __init__ method for the `Reportng` class. The init method is used 
         to set the `brand` and `report_name` for the report, along with 
@@ -58,11 +139,39 @@ class Reportng:
             use_bootstrap (bool, optional): Base Bootstrap 4 theme. Defaults to False.
             search_highlight_color (str, optional): Highlight color for matching search results. Defaults to "#f1c40f".
             navbar_background (Literal[, optional): Color for navbar. Defaults to "primary".
+            collect_stats (bool, optional): Record time, bytes and elements of every builder call in `stats`. Defaults to False.
+            budget (Budget, optional): Performance budget checked on save. Dictionary with keys max_total_bytes, max_section_bytes, max_table_rows, max_elements and max_carousel_images. Defaults to None.
+            budget_action (Literal[, optional): Warn or raise BudgetExceeded when the budget is exceeded. Defaults to "warn".
+            dedup_threshold (int, optional): Store section and section_collapsible bodies of at least this many characters once, and reference them from every section that repeats them. Defaults to None.
+            journal (str, optional): Append every section to this file, so that the report can be rebuilt with `Reportng.resume` if the process dies. Closed by `close` or at the end of a with block. Defaults to None.
+            journal_sync_every (int, optional): fsync the journal after this many entries. Defaults to 32.
         """
-        self.report: str = ""
+        # the constructor arguments are stored in the journal for resume
+        arguments = dict(locals())
+        for k in ("self", "journal", "journal_sync_every"):
+            del arguments[k]
+        self._head: str = ""
+        self._sections: List[Section] = []
+        self._lock = threading.Lock()
+        self._sequence = count()
+        self._local = threading.local()
+        self._keyed = False
+        self._report_resources: Dict[str, str] = {}
+        self._blocks: Dict[str, str] = {}
+        # the last rendered report, see _render
+        self._rendered: Tuple[tuple, str] = None
+        self.dedup_threshold = dedup_threshold
+        #: stats: Build stats of the report when collect_stats is set
+        self.stats = rng.BuildStats() if collect_stats else None
+        self.budget = budget or {}
+        self.budget_action = budget_action
+        self.journal_sync_every = journal_sync_every
+        self._journal = None
+        self._journal_pending = 0
+        # resources shared by sections are journaled once, see _journal_lines
+        self._journal_ids: Dict[str, int] = {}
         self.report_name = report_name
         self.brand = brand
-        self.document = dominate.document(title=self.report_name)
         self.__asciinema = use_asciinema
         self.__highlight = highlight_code
 
@@ -73,7 +182,64 @@ class Reportng:
             )
             self.report_name = "{}...".format(self.report_name[0:37])
 
-        with self.document.head as report_head:
+        options = (
+            use_asciinema,
+            show_progress_bar,
+            show_search,
+            highlight_code,
+            theme_preview,
+            user_javascript,
+            user_css,
+            theme,
+            use_bootstrap,
+            search_highlight_color,
+            navbar_background,
+        )
+        # the head only depends on the options and the assets in use, so it is
+        # rendered once and reused by every report with the same options
+        key = options + tuple(
+            v for k, v in sorted(vars(rng.JSCSS).items()) if not k.startswith("__")
+        )
+        self._head_options = options
+        self._title = report_name
+        self._document = None
+        head = _head_cache.get(key)
+        if head is None:
+            head = str(self._render_head(*options).head)
+            if len(_head_cache) >= HEAD_CACHE_SIZE:
+                _head_cache.pop(next(iter(_head_cache)), None)
+            _head_cache[key] = head
+        self._head = (
+            head.replace(_TITLE, escape(report_name))
+            .replace(_REPORT_NAME, escape(self.report_name))
+            .replace(_BRAND, escape(self.brand))
+        )
+        if journal:
+            self._journal = open(journal, "w", encoding="utf-8")
+            self._journal_write({"report": arguments})
+            self.sync_journal()
+
+    @staticmethod
+    def _render_head(
+        use_asciinema: bool,
+        show_progress_bar: bool,
+        show_search: bool,
+        highlight_code: bool,
+        theme_preview: bool,
+        user_javascript: str,
+        user_css: str,
+        theme: str,
+        use_bootstrap: bool,
+        search_highlight_color: str,
+        navbar_background: str,
+        title: str = _TITLE,
+        report_name: str = _REPORT_NAME,
+        brand: str = _BRAND,
+    ) -> dominate.document:
+        # renders the head and navbar, by default with placeholders for the
+        # title, report name and brand. The head is cached by Reportng.__init__
+        document = dominate.document(title=title)
+        with document.head:
             # link and script builder for bootstrap 4
             tag.comment("Created using reportng by securisec")
             tag.meta(
@@ -130,14 +296,14 @@ class Reportng:
 
             # constructing this way to avoid loading un needed js and css
             # css for asciinema
-            if self.__asciinema:
+            if use_asciinema:
                 tag.comment("css for asciinema")
                 tag.link(
                     rel="stylesheet", type="text/css", href=rng.JSCSS.asciinema_css
                 )
 
             # css and js for highlight.js
-            if self.__highlight == True:
+            if highlight_code == True:
                 tag.comment("css and js for highlight.js")
                 tag.link(rel="stylesheet", href=rng.JSCSS.highlightjs_css)
                 tag.script(src=rng.JSCSS.highlightjs_js)
@@ -178,9 +344,9 @@ class Reportng:
                 _class="navbar navbar-expand-lg navbar-dark bg-%s sticky-top"
                 % rng.HelperFunctions.color_to_tag(navbar_background)
             ):
-                tag.a(self.brand, _class="navbar-brand", href="#")
+                tag.a(brand, _class="navbar-brand", href="#")
                 # sets the report title on the navbar
-                tag.span(self.report_name, _class="navbar-text text-secondary")
+                tag.span(report_name, _class="navbar-text text-secondary")
                 # theme previewer
                 if theme_preview:
                     tag.comment("Theme previewer")
@@ -259,7 +425,392 @@ class Reportng:
                 # theme preview jquery
                 tag.comment("theme preview jquery")
                 tag.script(raw(rng.JSCustom.themes_preview))
-        self.report += str(report_head)
+        return document
+
+    @property
+    def document(self) -> dominate.document:
+        """The dominate document with the head and navbar of the report. Only
+        built when it is used, as reports reuse the rendered head."""
+        if self._document is None:
+            self._document = self._render_head(
+                *self._head_options,
+                title=self._title,
+                report_name=self.report_name,
+                brand=self.brand
+            )
+        return self._document
+
+    @property
+    def report(self) -> str:
+        """The rendered report as a single html string. Html appended with
+        ``r.report += html`` is added as a raw section."""
+        return self._render()[1]
+
+    @report.setter
+    def report(self, html: str):
+        # keeps r.report += html working, the html is added as a raw section
+        (sections, resources), current = self._render()
+        if not html.startswith(current):
+            raise ValueError(
+                "Only html appended to the report can be set, like r.report += html"
+            )
+        self._add_section("raw", html[len(current) :])
+        if getattr(self._local, "key", None) is None:
+            # the raw section is the last one, so html is the new report. If
+            # another thread added a section meanwhile the count does not match
+            self._rendered = ((sections + 1, resources), html)
+
+    def _render(self) -> Tuple[tuple, str]:
+        # sections and resources are only ever added, so their counts tell if
+        # the last rendered report is still current. Appending to the report
+        # with r.report += html then does not render it again every time.
+        with self._lock:
+            state = (len(self._sections), len(self._report_resources))
+        if self._rendered is None or self._rendered[0] != state:
+            sections = self._ordered_sections()
+            head, body = self._resources(sections)
+            self._rendered = (state, head + "".join(s.html for s in sections) + body)
+        return self._rendered
+
+    def _ordered_sections(self) -> List[Section]:
+        # sections in the order of their ordering keys, see ordered()
+        with self._lock:
+            sections = list(self._sections)
+        if self._keyed:
+            sections.sort(key=lambda s: s.order)
+        return sections
+
+    def _order(self, key, sequence: int) -> tuple:
+        # sections added with a key sort between the sections added without
+        # one before ordered was first used and those added after it, so keys
+        # are only compared with each other
+        if key is not None:
+            return (1, key, sequence)
+        return (2 if self._keyed else 0, 0, sequence)
+
+    @contextmanager
+    def ordered(self, key):
+        """Sections added by the calling thread inside this context are placed
+        by key instead of by the time they were added. Sections with the same
+        key keep the order they were added in. Sections added outside of
+        ordered stay before all keyed sections when they were added before
+        ordered was first used, and after them otherwise.
+
+        Builders can be called from many threads on the same report. Every
+        section is rendered in the calling thread and only added to the report
+        under a lock.
+
+        Example:
+            >>> def collect(host):
+            >>>     with r.ordered(hosts.index(host)):
+            >>>         r.section(host, scan(host)).table(["port"], ports(host))
+            >>> ThreadPoolExecutor().map(collect, hosts)
+
+        Args:
+            key (Any): Sort key. All keys of a report have to be comparable.
+
+        Yields:
+            Reportng: The Reportng object
+        """
+        outer = getattr(self._local, "key", None)
+        self._local.key = key
+        self._keyed = True
+        try:
+            yield self
+        finally:
+            self._local.key = outer
+
+    def _journal_write(self, entry: Union[dict, str]):
+        # called with the lock held. Entries are one json document per line
+        if isinstance(entry, dict):
+            entry = json.dumps(entry, separators=(",", ":"))
+        self._journal.write(entry + "\n")
+        self._journal_pending += 1
+        if self._journal_pending >= self.journal_sync_every:
+            self.sync_journal()
+
+    def sync_journal(self):
+        """Write the pending journal entries to disk. Called every
+        journal_sync_every entries and on save.
+
+        Returns:
+            Reportng: The Reportng object.
+        """
+        if self._journal is not None:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_pending = 0
+        return self
+
+    def _journal_lines(
+        self, sections: List[Section]
+    ) -> Tuple[List[str], Dict[str, int]]:
+        # called with the lock held, before the sections are added, so that a
+        # section that can not be serialized leaves the report unchanged.
+        # Resources are journaled once and sections reference them by id.
+        # Returns the lines and the ids of the resources new in them.
+        lines, new = [], {}
+        for section in sections:
+            entry = section._asdict()
+            if "resources" in section.meta:
+                ids = []
+                for r in section.meta["resources"]:
+                    i = self._journal_ids.get(r, new.get(r))
+                    if i is None:
+                        i = new[r] = len(self._journal_ids) + len(new)
+                        lines.append(json.dumps({"shared": r}, separators=(",", ":")))
+                    ids.append(i)
+                entry["meta"] = dict(section.meta, resources=ids)
+            lines.append(json.dumps(entry, separators=(",", ":")))
+        return lines, new
+
+    def close(self):
+        """Write the pending journal entries to disk and close the journal.
+        Sections added afterwards are not journaled. Called at the end of a
+        with block.
+
+        Example:
+            >>> with Reportng(report_name='Scan', brand='securisec', journal='scan.journal') as r:
+            >>>     r.section('Host', content).save('scan.html')
+
+        Returns:
+            Reportng: The Reportng object.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self.sync_journal()
+                self._journal.close()
+                self._journal = None
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def resume(cls, journal: str) -> "Reportng":
+        """Rebuild a report from its journal, for example after the process
+        building it died. Sections that are added afterwards are appended to
+        the same journal.
+
+        Example:
+            >>> r = Reportng.resume('scan.journal')
+            >>> r.section('Last host', content).save('scan.html')
+
+        Args:
+            journal (str): Path of the journal, see the journal argument of Reportng
+
+        Returns:
+            Reportng: The Reportng object
+        """
+        entries, good = [], 0
+        with open(journal, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line.decode("utf-8")))
+                except ValueError:
+                    # the last line is cut off when the process died writing it
+                    break
+                good += len(line)
+        report = cls(**entries[0]["report"])
+        last, shared = -1, []
+        for entry in entries[1:]:
+            if "resource" in entry:
+                report._report_resources.setdefault(entry["resource"], entry["place"])
+                continue
+            if "shared" in entry:
+                shared.append(entry["shared"])
+                continue
+            meta = entry["meta"]
+            if "resources" in meta:
+                meta["resources"] = tuple(shared[i] for i in meta["resources"])
+            if "blocks" in meta:
+                meta["blocks"] = tuple(meta["blocks"])
+            for digest in meta.get("blocks", ()):
+                prefix = '<template id="reportng-block-%s">' % digest
+                report._blocks.update(
+                    (digest, r) for r in meta["resources"] if r.startswith(prefix)
+                )
+            order = tuple(
+                tuple(o) if isinstance(o, list) else o for o in entry["order"]
+            )
+            report._keyed = report._keyed or order[0] != 0
+            last = max(last, order[-1])
+            report._sections.append(
+                Section(
+                    entry["builder"],
+                    entry["title"],
+                    entry["anchor"],
+                    entry["html"],
+                    entry["attached"],
+                    meta,
+                    order,
+                )
+            )
+        report._sequence = count(last + 1)
+        report._journal_ids = {r: i for i, r in enumerate(shared)}
+        with open(journal, "r+b") as f:
+            f.truncate(good)
+        report._journal = open(journal, "a", encoding="utf-8")
+        return report
+
+    def _resources(self, sections: List[Section], head: str = None) -> Tuple[str, str]:
+        # every script, stylesheet and modal dialog is emitted exactly once, no
+        # matter how many sections need it. Stylesheets go in the head, the
+        # rest at the end of the body.
+        needed = dict(self._report_resources)
+        for s in sections:
+            for r in s.meta.get("resources", ()):
+                needed.setdefault(r, "body")
+        head = self._head if head is None else head
+        stylesheets = "".join(r for r, place in needed.items() if place == "head")
+        if stylesheets:
+            head = head.replace("</head>", stylesheets + "</head>", 1)
+        return head, "".join(r for r, place in needed.items() if place == "body")
+
+    def _write(self, f, sections: List[Section], head: str = None, extra: str = ""):
+        head, body = self._resources(sections, head)
+        f.write(head)
+        for s in sections:
+            f.write(s.html)
+        f.write(extra)
+        f.write(body)
+
+    def _add_section(
+        self,
+        builder: str,
+        html: str,
+        title: str = "",
+        anchor: str = "",
+        attached: bool = False,
+        resources: Tuple[str, ...] = (),
+        modals: List[Modal] = (),
+        **meta
+    ):
+        resources = tuple(resources) + tuple(
+            str(rng.HelperFunctions.modal_dialog(m)) for m in modals
+        )
+        if resources:
+            meta["resources"] = resources
+        key = getattr(self._local, "key", None)
+        with self._lock:
+            sequence = next(self._sequence)
+            section = Section(
+                builder,
+                title,
+                anchor,
+                html,
+                attached,
+                meta,
+                self._order(key, sequence),
+            )
+            if self._journal is not None:
+                lines, new = self._journal_lines([section])
+            self._sections.append(section)
+            if self._journal is not None:
+                self._journal_ids.update(new)
+                for line in lines:
+                    self._journal_write(line)
+        added = getattr(self._local, "added", None)
+        if added is not None:
+            added.append(section)
+
+    def _add_sections(self, builder: str, sections: List[tuple]):
+        # adds many sections in one step, see _add_section. sections holds
+        # the html, title, anchor, attached flag and meta of each.
+        key = getattr(self._local, "key", None)
+        with self._lock:
+            added = [
+                Section(
+                    builder,
+                    title,
+                    anchor,
+                    html,
+                    attached,
+                    meta,
+                    self._order(key, sequence),
+                )
+                for (html, title, anchor, attached, meta), sequence in zip(
+                    sections, self._sequence
+                )
+            ]
+            if self._journal is not None:
+                lines, new = self._journal_lines(added)
+            self._sections.extend(added)
+            if self._journal is not None:
+                self._journal_ids.update(new)
+                for line in lines:
+                    self._journal_write(line)
+        local = getattr(self._local, "added", None)
+        if local is not None:
+            local.extend(added)
+
+    def _dedup(self, content: str) -> Tuple[str, Dict[str, str], Tuple[str, ...]]:
+        # a large body is stored once in a template that the sections using it
+        # reference. Returns the content, attributes and resources to use.
+        if self.dedup_threshold is None or len(content) < self.dedup_threshold:
+            return content, {}, ()
+        import hashlib
+
+        digest = hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+        digest = digest[:16]
+        if digest not in self._blocks:
+            # threads adding the same body at once store the same template
+            self._blocks.setdefault(
+                digest,
+                '<template id="reportng-block-%s">%s</template>'
+                % (digest, escape(content)),
+            )
+        return (
+            "",
+            {"data-reportng-block": digest},
+            (self._blocks[digest], str(tag.script(raw(rng.JSCustom.expand_blocks)))),
+        )
+
+    def add_javascript(self, code: str = None, src: str = None):
+        """Add javascript to the report. The same script is only added once
+        no matter how often it is added.
+
+        Args:
+            code (str, optional): Inline javascript. Defaults to None.
+            src (str, optional): Link to a javascript file. Defaults to None.
+
+        Returns:
+            Reportng: The Reportng object.
+        """
+        if src:
+            self._add_resource(str(tag.script(src=src)), "body")
+        if code:
+            self._add_resource(str(tag.script(raw(code))), "body")
+        return self
+
+    def add_stylesheet(self, href: str = None, css: str = None):
+        """Add css to the head of the report. The same stylesheet is only added
+        once no matter how often it is added.
+
+        Args:
+            href (str, optional): Link to a css file. Defaults to None.
+            css (str, optional): Inline css. Defaults to None.
+
+        Returns:
+            Reportng: The Reportng object.
+        """
+        if href:
+            self._add_resource(
+                str(tag.link(rel="stylesheet", type="text/css", href=href)), "head"
+            )
+        if css:
+            self._add_resource(str(tag.style(raw(css))), "head")
+        return self
+
+    def _add_resource(self, html: str, place: str):
+        with self._lock:
+            if html not in self._report_resources:
+                self._report_resources[html] = place
+                if self._journal is not None:
+                    self._journal_write({"resource": html, "place": place})
 
     def _set_title_bg(self, title):
         if title:
@@ -289,8 +840,11 @@ class Reportng:
             rng.HelperFunctions.create_badges(add_badge)
         if add_modal:
             assert isinstance(add_modal, dict), "Not a dict"
-            rng.HelperFunctions.make_modals(title.replace(" ", ""), add_modal)
+            rng.HelperFunctions.modal_button(add_modal)
+            return [add_modal]
+        return []
 
+    @_record_stats
     def section(
         self,
         title: str,
@@ -343,6 +897,7 @@ class Reportng:
         tag.br()
 
         style = self._append_section(is_section)
+        content, attrs, resources = self._dedup(content)
         # creates the jumbotron. User dictates if it is pre or p tag
         with tag.div(
             _class="jumbotron container context reportng-report-section-class",
@@ -350,28 +905,32 @@ class Reportng:
         ) as div:  # padding mods
             # can change the text color, or the background color
             if use_h2_title:
+                anchor = ""
                 tag.h2(title)
             else:
+                anchor = rng.HelperFunctions.id_with_random(5, title)
                 tag.h1(
                     title,
                     _class="%s-%s"
                     % (color, rng.HelperFunctions.color_to_tag(section_color)),
-                    id="%s" % rng.HelperFunctions.id_with_random(5, title),
+                    id="%s" % anchor,
                 )
 
             # creates a reference button with link
             with tag.div(_class="container", style=overflow_control):
                 if keep_formatting:
                     tag.pre(
-                        content,
+                        escaped(content),
                         _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color),
+                        **attrs
                     )
                 else:
                     tag.p(
-                        content,
+                        escaped(content),
                         _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color),
+                        **attrs
                     )
-            self._add_decorators(
+            modals = self._add_decorators(
                 tag=div,
                 title=title,
                 add_reference=add_reference,
@@ -379,9 +938,233 @@ class Reportng:
                 add_badge=add_badge,
                 add_modal=add_modal,
             )
-        self.report += str(rng.HelperFunctions.convert_to_string(div))
+        self._add_section(
+            "section",
+            rng.HelperFunctions.convert_to_string(div),
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            resources=resources,
+            modals=modals,
+            blocks=tuple(attrs.values()),
+        )
         return self
 
+    @_record_stats
+    def sections_from_records(
+        self,
+        records: Iterable[dict],
+        title_key: str = "title",
+        content_key: str = "content",
+        color_key: str = None,
+        keep_formatting: bool = True,
+        section_color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        title_background: bool = False,
+        overflow_control: str = rng.CSSControl.css_overflow,
+        text_color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        is_section: bool = False,
+    ):
+        """Adds a section for every record, like calling `section` for each of
+        them but much faster. The shared options are checked and the section
+        markup is rendered once, and all sections are added in one step.
+        Use `section` for sections with references, alerts, badges or modals.
+
+        Args:
+            records (Iterable[dict]): Records with a title and content each
+            title_key (str, optional): Key of the title in a record. Defaults to "title".
+            content_key (str, optional): Key of the content in a record. Defaults to "content".
+            color_key (str, optional): Key of the section color in a record. Records without it use section_color. Defaults to None.
+            keep_formatting (bool, optional): Use a pre tag for the content to keep formatting. Defaults to True.
+            section_color (Literal[, optional): Color of the section title bar. Defaults to "primary".
+            title_background (bool, optional): If true, background color is applied. Else, text color is changed. Defaults to False.
+            overflow_control (str, optional): Uses valid CSS to control overflow of data. Defaults to rng.CSSControl.css_overflow.
+            text_color (Literal[, optional): Text color of sections. Defaults to "primary".
+            is_section (bool, optional): Add every section as extra data to the container before it. Defaults to False.
+
+        Raises:
+            NotValidTag: If the color of a record is not valid
+
+        Returns:
+            Reportng: The Reportng object
+
+        Example:
+            >>> r.sections_from_records(
+            >>>     findings, title_key="name", content_key="output", color_key="severity"
+            >>> )
+        """
+        assert self._check_valid_color(section_color)
+        color = self._set_title_bg(title_background)
+        # title classes of every valid color, so records are checked by a lookup
+        classes = {
+            c: "%s-%s" % (color, rng.HelperFunctions.color_to_tag(c))
+            for c in rng.HelperFunctions.valid_tags
+        }
+        body = tag.pre if keep_formatting else tag.p
+
+        def template(**attrs) -> str:
+            # the section markup with placeholders, rendered by dominate once
+            # so that it is the same as the markup of `section`
+            with tag.div(
+                _class="jumbotron container context reportng-report-section-class",
+                style=self._append_section(is_section),
+            ) as div:
+                tag.h1(
+                    raw("\x00title\x00"), _class="\x00class\x00", id="\x00anchor\x00"
+                )
+                with tag.div(_class="container", style=overflow_control):
+                    body(
+                        raw("\x00content\x00"),
+                        _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color),
+                        **attrs
+                    )
+            html = rng.HelperFunctions.convert_to_string(div).replace("%", "%%")
+            for name in ("title", "class", "anchor", "content", "block"):
+                html = html.replace("\x00%s\x00" % name, "%%(%s)s" % name)
+            return html
+
+        plain = template()
+        deduped = template(**{"data-reportng-block": "\x00block\x00"})
+        sections = []
+        for record in records:
+            title = record[title_key]
+            title = title if isinstance(title, str) else str(title)
+            content = record[content_key]
+            content = content if isinstance(content, str) else str(content)
+            section = (
+                record.get(color_key, section_color) if color_key else section_color
+            )
+            if section not in classes:
+                raise rng.NotValidTag("%s is not a valid color" % section)
+            content, attrs, resources = self._dedup(content)
+            # quotes are escaped like dominate escapes the text of section()
+            values = {
+                "title": escape(title),
+                "class": classes[section],
+                "anchor": rng.HelperFunctions.id_with_random(5, title),
+                "content": escape(content),
+            }
+            meta = {"blocks": tuple(attrs.values())}
+            if attrs:
+                values["block"] = attrs["data-reportng-block"]
+                meta["resources"] = resources
+            sections.append(
+                (
+                    (deduped if attrs else plain) % values,
+                    title,
+                    values["anchor"],
+                    is_section,
+                    meta,
+                )
+            )
+        self._add_sections("section", sections)
+        return self
+
+    @_record_stats
+    def section_from_file(
+        self,
+        path: str,
+        title: str = None,
+        head: int = None,
+        tail: int = None,
+        line_range: Tuple[int, int] = None,
+        pattern: str = None,
+        max_bytes: int = None,
+        encoding: str = "utf-8",
+        section_color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        overflow_control: str = rng.CSSControl.css_overflow,
+        text_color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        is_section: bool = False,
+    ):
+        """Create a section from a file, like a large log. The file is memory
+        mapped and only the selected lines are read and escaped, so the size of
+        the file does not matter. head, tail and line_range select a window of
+        the file, pattern keeps only the lines in it that match a regex. When
+        no lines are selected, at most max_bytes or rngfiles.MAX_BYTES bytes
+        of the file are included.
+
+        Example:
+            >>> r.section_from_file('/var/log/syslog', tail=200, pattern='error|warn')
+
+        Args:
+            path (str): Path of the file
+            title (str, optional): Title of the section. Defaults to the file name.
+            head (int, optional): Include the first lines. Defaults to None.
+            tail (int, optional): Include the last lines. Defaults to None.
+            line_range (Tuple[int, int], optional): Include the lines from first to last, starting at 1. Defaults to None.
+            pattern (str, optional): Only include lines that match this regex. Defaults to None.
+            max_bytes (int, optional): Include at most this many bytes of the file. Defaults to None, which is rngfiles.MAX_BYTES when no lines are selected.
+            encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+            section_color (Literal[, optional): Color of the section title bar. Defaults to "primary".
+            overflow_control (str, optional): Uses valid CSS to control overflow of data. Defaults to rng.CSSControl.css_overflow.
+            text_color (Literal[, optional): Text color of section. Defaults to "primary".
+            is_section (bool, optional): Add as extra data to the previous container. Defaults to False.
+
+        Raises:
+            TypeError: If more than one of head, tail and line_range is used
+
+        Returns:
+            Reportng: The Reportng object
+        """
+        from pathlib import Path
+        from . import rngfiles
+
+        if sum(x is not None for x in (head, tail, line_range)) > 1:
+            raise TypeError("Use only one of head, tail or line_range")
+        assert self._check_valid_color(section_color)
+        title = title or Path(path).name
+        capped = max_bytes is None and (head, tail, line_range, pattern) == (None,) * 4
+        if capped:
+            # a whole file is never read into the report by accident
+            max_bytes = rngfiles.MAX_BYTES
+        content, size = rngfiles.read_escaped(
+            path, head, tail, line_range, pattern, encoding, max_bytes
+        )
+        if capped and size >= max_bytes and Path(path).stat().st_size > size:
+            logging.warning(
+                "Only the first %d bytes of %s are included. Select lines or set max_bytes"
+                % (size, path)
+            )
+
+        tag.br()
+        style = self._append_section(is_section)
+        anchor = rng.HelperFunctions.id_with_random(5, title)
+        # the escaped content is spliced into the rendered markup so that
+        # large files are not copied and escaped again by dominate
+        placeholder = "reportng-file-%s" % anchor
+        with tag.div(
+            _class="jumbotron container context reportng-report-section-class",
+            style=style,
+        ) as div:
+            tag.h1(
+                title,
+                _class="text-%s" % rng.HelperFunctions.color_to_tag(section_color),
+                id="%s" % anchor,
+            )
+            with tag.div(_class="container", style=overflow_control):
+                tag.pre(
+                    placeholder,
+                    _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color),
+                )
+        before, after = str(div).rsplit(placeholder, 1)
+        self._add_section(
+            "section_from_file",
+            before + content + after,
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            bytes_read=size,
+        )
+        return self
+
+    @_record_stats
     def section_collapsible(
         self,
         title: str,
@@ -389,40 +1172,163 @@ class Reportng:
         section_color: str = "default",
         raw_html_content: str = "",
         keep_formatting: bool = True,
+        lazy: bool = True,
         **kwargs
     ):
-        """Create a collapsed section. 
-        
+        """Create a collapsed section.
+
         Args:
             title (str): Title for section
             content (str, optional): Section Content. Defaults to "".
             section_color (str, optional): Section color. Defaults to "default".
             raw_html_content (str, optional): Raw html content. Defaults to "".
             keep_formatting (bool, optional): Preserve formatting. Defaults to True.
-        
+            lazy (bool, optional): Only add the content to the page when the section is expanded. Search uses a text index to find it. Defaults to True.
+
         Returns:
-            Reportng: The Reportng object. 
+            Reportng: The Reportng object.
         """
         color = "bg-%s" % rng.HelperFunctions.color_to_tag(section_color)
-        self.report += rng.HelperFunctions.accordian_collapse(
+        anchor = rng.HelperFunctions.id_with_random(5, title)
+        attrs, resources = {}, ()
+        if not raw_html_content:
+            content, attrs, resources = self._dedup(content)
+        if lazy:
+            # the index points search at the template that holds the text of a
+            # body that is not rendered yet, so the text is not repeated
+            block = attrs.get("data-reportng-block")
+            resources = (
+                '<script type="application/json" data-reportng-index="collapse%s">%s</script>'
+                % (
+                    anchor,
+                    json.dumps(
+                        "reportng-block-%s" % block
+                        if block
+                        else "reportng-lazy-%s" % anchor
+                    ),
+                ),
+                str(tag.script(raw(rng.JSCustom.lazy_collapse))),
+            ) + resources
+        html = rng.HelperFunctions.accordian_collapse(
             color,
             title=title,
             content=content,
             pre=keep_formatting,
             raw_html=raw_html_content,
+            anchor=anchor,
+            attrs=attrs,
+            lazy=lazy,
             **kwargs
         )
+        self._add_section(
+            "section_collapsible",
+            html,
+            title=title,
+            anchor=anchor,
+            resources=resources,
+            blocks=tuple(attrs.values()),
+        )
         return self
 
-    def image_carousel(self, images: List[ImageCarouselType]):
-        """Create an image carousel
-        
+    @_record_stats
+    def image_carousel(
+        self,
+        images: List[ImageCarouselType],
+        embed: Literal[None, "datauri", "copy"] = None,
+        thumbnail_width: int = None,
+        asset_dir: str = None,
+        rel_path: str = "",
+        workers: int = None,
+        lazy_load: bool = True,
+        srcset_widths: List[int] = None,
+    ):
+        """Create an image carousel. Local images can be embedded in the report
+        as data URIs, or copied into an asset folder, with downscaled thumbnails
+        that link to the full image. Images are processed in parallel and cached
+        by content, see ``reportng.rngimages``. Only the first slide is loaded
+        with the page, the other slides load when the carousel gets to them.
+
         Args:
             images (List[ImageCarouselType]): List of image paths
-        
+            embed (Literal[, optional): datauri to embed the images, copy to copy them into asset_dir. Defaults to None.
+            thumbnail_width (int, optional): Show thumbnails downscaled to this width. Needs Pillow. Defaults to None.
+            asset_dir (str, optional): Folder to copy the images to. Defaults to None.
+            rel_path (str, optional): Relative path to asset_dir from the report. Defaults to "".
+            workers (int, optional): Number of threads used to process images. Defaults to None.
+            lazy_load (bool, optional): Load slides after the first one when they are shown. Defaults to True.
+            srcset_widths (List[int], optional): Widths to generate for a responsive srcset. Needs embed, copy is recommended. Defaults to None.
+
         Returns:
-            Reportng: The Reportng object. 
+            Reportng: The Reportng object.
         """
+        paths = [image.get("path") for image in images]
+        srcsets = [{} for _ in images]
+        # local files the report links to, for save_zip
+        files = {}
+        assert embed or not srcset_widths, "srcset_widths needs embed"
+        from . import rngimages
+
+        if embed:
+            assert embed != "copy" or asset_dir, "asset_dir is needed to copy images"
+            widths = sorted(({thumbnail_width} | set(srcset_widths or [])) - {None})
+            include_full = embed == "copy" or not widths
+            # embedded thumbnails link to the original file instead of
+            # embedding the full image a second time
+            prepared = rngimages.prepare_images(
+                paths,
+                embed,
+                widths=widths,
+                asset_dir=asset_dir,
+                rel_path=rel_path,
+                workers=workers,
+                include_full=include_full,
+            )
+            # embedded srcsets fall back to their largest width
+            src_width = thumbnail_width
+            if not src_width and srcset_widths and embed == "datauri":
+                src_width = max(srcset_widths)
+            sources = [
+                (p["widths"].get(src_width, p["full"]), p["full"]) for p in prepared
+            ]
+            if embed == "copy":
+                for path, p in zip(paths, prepared):
+                    if rngimages.is_local(path):
+                        for src in [p["full"]] + list(p["widths"].values()):
+                            files[src] = os.path.join(asset_dir, src[len(rel_path) :])
+            elif not include_full:
+                files.update((p, p) for p in paths if rngimages.is_local(p))
+            if srcset_widths:
+                srcsets = [
+                    (
+                        {
+                            "srcset": ", ".join(
+                                "%s %dw" % (p["widths"][w], w)
+                                for w in sorted(srcset_widths)
+                                if w in p["widths"]
+                            ),
+                            "sizes": "(max-width: 1200px) 100vw, 1140px",
+                        }
+                        if p["widths"]
+                        else {}
+                    )
+                    for p in prepared
+                ]
+        else:
+            sources = [(p, p) for p in paths]
+            files.update((p, p) for p in paths if rngimages.is_local(p))
+        # a data uri link would duplicate the image and browsers block it anyway
+        links = [
+            {} if href.startswith("data:") else {"href": href} for _, href in sources
+        ]
+        # slides after the first keep their sources in data attributes until
+        # the carousel slides to them
+        img_attributes = []
+        for index_num, (src, _) in enumerate(sources):
+            attributes = dict(srcsets[index_num], src=src)
+            if lazy_load and index_num > 0:
+                attributes = {"data-" + k: v for k, v in attributes.items()}
+                attributes["loading"] = "lazy"
+            img_attributes.append(attributes)
 
         # create jumbotron container
         with tag.div(
@@ -445,11 +1351,11 @@ class Reportng:
                         # so that the first image is set to active
                         if index_num == 0:
                             with tag.div(_class="carousel-item active").add(
-                                tag.a(href=image.get("path"), target="_blank")
+                                tag.a(target="_blank", **links[index_num])
                             ):
                                 tag.img(
-                                    src=image.get("path"),
                                     _class="img-fluid img-thumbnail rounded mx-auto d-block",
+                                    **img_attributes[index_num]
                                 )
 
                                 if has_caption:
@@ -459,11 +1365,11 @@ class Reportng:
                         # images 2+
                         else:
                             with tag.div(_class="carousel-item").add(
-                                tag.a(href=image.get("path"), target="_blank")
+                                tag.a(target="_blank", **links[index_num])
                             ):
                                 tag.img(
-                                    src=image.get("path"),
                                     _class="img-fluid img-thumbnail rounded mx-auto d-block",
+                                    **img_attributes[index_num]
                                 )
                                 try:
                                     if has_caption:
@@ -493,9 +1399,20 @@ class Reportng:
                             _class="carousel-control-next-icon", aria_hidden="true"
                         )
                         tag.span("Next", _class="sr-only")
-        self.report += str(carousel)
+        resources = ()
+        if lazy_load and len(images) > 1:
+            resources = (str(tag.script(raw(rng.JSCustom.lazy_carousel))),)
+        self._add_section(
+            "image_carousel",
+            str(carousel),
+            attached=True,
+            resources=resources,
+            images=len(images),
+            files=files,
+        )
         return self
 
+    @_record_stats
     def asciinema(
         self,
         asciinema_link: str,
@@ -505,39 +1422,44 @@ class Reportng:
         add_alert: Alert = None,
         add_badge: List[Badge] = None,
         add_modal: Modal = None,
+        compress_cast: bool = False,
+        timeout: float = 10,
     ):
-        """Add an asciinema section
-        
+        """Add an asciinema section. Links are resolved through a persistent
+        cache, use `prefetch_asciinema` to resolve many links at once. A local
+        .cast recording is embedded in the report so it works offline.
+
         Args:
-            asciinema_link (str): Link to asciinema
+            asciinema_link (str): Link to asciinema, or path to a local .cast file
             title (str, optional): Title for asciinema. Defaults to "".
             is_section (bool, optional): Add as extra data to previous section. Defaults to False.
             add_reference (Reference, optional): Add a reference link. Argument is a dictionary with keys color and link Defaults to None.
             add_alert (Alert, optional): Add an alert. Argument is a dictionary with keys color and message Defaults to None.
             add_badge (List[Badge], optional): Add a reference link. Argument is a list of dictionaries with keys color and message Defaults to None.
             add_modal (Modal, optional): Add a modal message box. Argument is a dictionary with keys button, title and message Defaults to None.
-        
+            compress_cast (bool, optional): gzip an embedded .cast file. Needs a browser with DecompressionStream. Defaults to False.
+            timeout (float, optional): Seconds to wait for asciinema.org. Defaults to 10.
+
         Returns:
-            Reportng: The Reportng object. 
+            Reportng: The Reportng object.
         """
-        from requests import get
+        from . import rngasciinema
 
-        logging.warning(
-            "This method only works with asciinema links because of the way\n \
-            browsers enforce CORS"
-        )
         # checks to see if asciinema has been intialized
         assert (
             self.__asciinema
         ), "To integrate asciinema, set asciinema=True in ReportWriter"
 
-        # hacky way to bypass the CORS problem
-        try:
-            url = get("%s.json" % asciinema_link).url
-        except:
+        cast_file = rngasciinema.is_cast_file(asciinema_link)
+        if cast_file:
+            url = rngasciinema.cast_source(asciinema_link, compress=compress_cast)
+        else:
             logging.warning(
-                "Need internet to get the proper url for %s" % asciinema_link
+                "This method only works with asciinema links because of the way\n \
+                browsers enforce CORS"
             )
+            # hacky way to bypass the CORS problem
+            url = rngasciinema.resolve(asciinema_link, timeout=timeout)
 
         # controls if sticky or not
         style = self._append_section(is_section)
@@ -546,22 +1468,56 @@ class Reportng:
             _class="jumbotron jumbomargin container reportng-acsiinema-class",
             style=style,
         ) as a:
+            anchor = ""
             if title != "":
-                tag.h1(title, id="%s" % rng.HelperFunctions.id_with_random(5, title))
+                anchor = rng.HelperFunctions.id_with_random(5, title)
+                tag.h1(title, id="%s" % anchor)
 
             with tag.div(_class="container", style="text-align: center;" + style):
-                raw('<asciinema-player src="%s"></asciinema-player>' % url)
-                tag.script(src=rng.JSCSS.asciinema_js)
-                tag.a(
-                    "Asciinema link",
-                    _class="btn btn-secondary row justify-content-center btn-sm",
-                    role="button",
-                    href=asciinema_link,
-                    target="_blank",
-                )
-        self.report += str(a)
+                if cast_file and compress_cast:
+                    tag.div(_class="reportng-asciinema-cast", data_cast=url)
+                else:
+                    raw('<asciinema-player src="%s"></asciinema-player>' % url)
+                if not cast_file:
+                    tag.a(
+                        "Asciinema link",
+                        _class="btn btn-secondary row justify-content-center btn-sm",
+                        role="button",
+                        href=asciinema_link,
+                        target="_blank",
+                    )
+        resources = [str(tag.script(src=rng.JSCSS.asciinema_js))]
+        if cast_file and compress_cast:
+            resources.append(str(tag.script(raw(rng.JSCustom.asciinema_cast))))
+        self._add_section(
+            "asciinema",
+            str(a),
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            resources=resources,
+        )
+        return self
+
+    def prefetch_asciinema(self, links: List[str], timeout: float = 10):
+        """Resolve many asciinema links concurrently so that the following
+        `asciinema` calls are served from the cache.
+
+        Args:
+            links (List[str]): Asciinema links. Local .cast files are skipped
+            timeout (float, optional): Seconds to wait for asciinema.org. Defaults to 10.
+
+        Returns:
+            Reportng: The Reportng object.
+        """
+        from . import rngasciinema
+
+        rngasciinema.resolve_many(
+            [l for l in links if not rngasciinema.is_cast_file(l)], timeout=timeout
+        )
         return self
 
+    @_record_stats
     def code(
         self,
         title: str,
@@ -596,7 +1552,8 @@ class Reportng:
             _class="jumbotron container context reportng-code-section-class",
             style=style,
         ) as c:  # padding mods
-            t = tag.h1(title, id="%s" % rng.HelperFunctions.id_with_random(5, title))
+            anchor = rng.HelperFunctions.id_with_random(5, title)
+            t = tag.h1(title, id="%s" % anchor)
             if add_reference:
                 t.add(rng.HelperFunctions.ref_button(add_reference))
             # create dismissable alert box
@@ -606,18 +1563,28 @@ class Reportng:
                 _class="container",
                 style="max-height: 70%; overflow: auto; margin-bottom: 20",
             ):
-                tag.pre().add(tag.code(content))
+                tag.pre().add(tag.code(escaped(content)))
                 if add_badge:
                     rng.HelperFunctions.create_badges(add_badge)
+            modals = []
             if (
                 add_modal
                 and isinstance(add_modal, dict)
                 and rng.check_keys(["button", "title", "content"], dict(add_modal))
             ):
-                rng.HelperFunctions.make_modals(title.replace(" ", ""), add_modal)
-        self.report += str(c)
+                rng.HelperFunctions.modal_button(add_modal)
+                modals.append(add_modal)
+        self._add_section(
+            "code",
+            str(c),
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            modals=modals,
+        )
         return self
 
+    @_record_stats
     def captions(
         self,
         content: str,
@@ -644,13 +1611,19 @@ class Reportng:
             _class="container text-center reportng-captions-class", style=style
         ) as div:
             tag.p(
-                content, _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color)
+                escaped(content),
+                _class="text-%s" % rng.HelperFunctions.color_to_tag(text_color),
             )
             if raw_html:
                 raw(raw_html)
-        self.report += str(rng.HelperFunctions.convert_to_string(div))
+        self._add_section(
+            "captions",
+            rng.HelperFunctions.convert_to_string(div),
+            attached=is_section,
+        )
         return self
 
+    @_record_stats
     def table(
         self,
         table_header: List[str],
@@ -674,6 +1647,10 @@ class Reportng:
             "light",
         ] = "dark",
         show_index: bool = False,
+        sortable: bool = False,
+        filterable: bool = False,
+        export: Literal["csv", "json"] = None,
+        export_path: str = None,
         add_reference: Reference = None,
         add_alert: Alert = None,
         add_badge: List[Badge] = None,
@@ -688,6 +1665,10 @@ class Reportng:
             section_title (str, optional): Title for section. Defaults to "".
             header_color (Literal[, optional): Title header color. Defaults to "dark".
             show_index (bool, optional): Show the table index. Defaults to False.
+            sortable (bool, optional): Sort the rows by clicking a column header. Rows are sorted when the report is built, so sorting is instant at any size. Defaults to False.
+            filterable (bool, optional): Add a box that filters the rows by their text. Defaults to False.
+            export (Literal[, optional): Add a download link for the rows as csv or json. The rows are written while the table is rendered. Defaults to None.
+            export_path (str, optional): File to write the export to, gzip compressed if it ends with .gz. It is linked as given, like images. Defaults to None, which embeds the export in the report compressed.
             add_reference (Reference, optional): Add a reference link. Argument is a dictionary with keys color and link Defaults to None.
             add_alert (Alert, optional): Add an alert. Argument is a dictionary with keys color and message Defaults to None.
             add_badge (List[Badge], optional): Add a reference link. Argument is a list of dictionaries with keys color and message Defaults to None.
@@ -709,14 +1690,50 @@ class Reportng:
         # Saves length of first arg
         header_length = len(table_header)
 
-        # starts building the table
+        # starts building the table. The export file is closed even when
+        # rendering fails
         with tag.div(
             _class="jumbotron container context reportng-table-class", style=style
-        ) as div:  # padding mods
+        ) as div, ExitStack() as exports:  # padding mods
+            anchor = ""
             if section_title:
-                tag.h1(
-                    section_title,
-                    id="%s" % rng.HelperFunctions.id_with_random(5, section_title),
+                anchor = rng.HelperFunctions.id_with_random(5, section_title)
+                tag.h1(section_title, id="%s" % anchor)
+            table_id = ""
+            if sortable or filterable:
+                table_id = rng.HelperFunctions.id_with_random(8, "table")
+            exporter = None
+            if export:
+                from pathlib import Path
+                from .rngtable import Export
+
+                exporter = exports.enter_context(
+                    Export(export, table_header, export_path)
+                )
+                export_id = rng.HelperFunctions.id_with_random(8, "export")
+                link = {"href": "#", "data_reportng_export": export_id}
+                if export_path:
+                    link = {"href": Path(export_path).as_posix()}
+                name = "".join(filter(str.isalnum, section_title)) or "table"
+                tag.a(
+                    "Download %s" % export.upper(),
+                    _class="btn btn-outline-primary btn-sm",
+                    style="margin-bottom: 1rem",
+                    download=(
+                        Path(export_path).name
+                        if export_path
+                        else "%s.%s" % (name, export)
+                    ),
+                    data_mime=exporter.mime,
+                    **link
+                )
+            if filterable:
+                tag.input_(
+                    type="search",
+                    _class="form-control container",
+                    placeholder="Filter",
+                    style="width: 90%; margin-bottom: 1rem",
+                    data_reportng_filter=table_id,
                 )
             # create dismissable alert box
             with tag.div(
@@ -726,6 +1743,7 @@ class Reportng:
                 with tag.table(
                     _class="table table-striped display nowrap table-hover",
                     style="width: 90%",
+                    **({"id": table_id} if table_id else {})
                 ):
                     # Make table header
                     if table_header:
@@ -736,15 +1754,37 @@ class Reportng:
                             if show_index:
                                 tag.th("Index")
                             for h in range(len(table_header)):
-                                tag.th(table_header[h], scope="col")
+                                tag.th(escaped(table_header[h]), scope="col")
+                    # cells are escaped a batch at a time and the rows are
+                    # rendered as one string instead of a tag per cell
+                    padded = (
+                        (list(row) + [""] * header_length)[:header_length]
+                        for row in data
+                    )
+                    if exporter:
+                        # rows are exported as they are rendered
+                        padded = (exporter.write(row) or row for row in padded)
+                    if table_id:
+                        padded = [[str(c) for c in row] for row in padded]
+                    cells = escape_many(c for row in padded for c in row)
+                    rows = []
                     for row_index in range(len(data)):
-                        row = (data[row_index] + [""] * header_length)[:header_length]
-                        with tag.tr():
-                            if show_index:
-                                tag.td(str(row_index + 1))
-                            for t in range(len(row)):
-                                tag.td(row[t])
-            self._add_decorators(
+                        index = "<td>%d</td>" % (row_index + 1) if show_index else ""
+                        rows.append(
+                            "<tr>%s%s</tr>"
+                            % (
+                                index,
+                                "".join(
+                                    "<td>%s</td>" % next(cells)
+                                    for _ in range(header_length)
+                                ),
+                            )
+                        )
+                    if table_id:
+                        raw("<tbody>%s</tbody>" % "".join(rows))
+                    else:
+                        raw("".join(rows))
+            modals = self._add_decorators(
                 tag=div,
                 title="",
                 add_reference=add_reference,
@@ -752,9 +1792,209 @@ class Reportng:
                 add_badge=add_badge,
                 add_modal=add_modal,
             )
-        self.report += rng.HelperFunctions.convert_to_string(div)
+        resources, meta = (), {}
+        if exporter:
+            blob = exporter.close()
+            if blob is None:
+                # save_zip packs the file next to the report
+                meta["files"] = {Path(export_path).as_posix(): str(export_path)}
+            else:
+                from base64 import b64encode
+
+                resources += (
+                    '<script type="application/octet-stream" data-reportng-export-data="%s">%s</script>'
+                    % (export_id, b64encode(blob).decode("ascii")),
+                    str(tag.script(raw(rng.JSCustom.table_export))),
+                )
+        if table_id:
+            from . import rngtable
+
+            index = rngtable.column_index(
+                list(zip(*padded)) if padded else [[] for _ in range(header_length)],
+                sortable=sortable,
+                filterable=filterable,
+            )
+            index["offset"] = 1 if show_index else 0
+            resources += (
+                rngtable.index_script(table_id, index),
+                str(tag.style(raw(rng.CSSControl.sortable_table))),
+                str(tag.script(raw(rng.JSCustom.sortable_table))),
+            )
+        self._add_section(
+            "table",
+            rng.HelperFunctions.convert_to_string(div),
+            title=section_title,
+            anchor=anchor,
+            attached=is_section,
+            rows=len(data),
+            modals=modals,
+            resources=resources,
+            **meta
+        )
         return self
 
+    @_record_stats
+    def chart(
+        self,
+        title: str,
+        x,
+        y,
+        max_points: int = 1000,
+        method: Literal["lttb", "minmax"] = "lttb",
+        colors: List[str] = None,
+        section_color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        is_section: bool = False,
+    ):
+        """Add a line chart as inline svg. Series of any length are downsampled
+        to max_points points that keep their shape, so the size of the chart
+        does not depend on the data. Numpy arrays are downsampled vectorized.
+
+        Args:
+            title (str): Title of the section
+            x (Sequence): X values, numbers or datetimes in ascending order. None uses the index of the values. Naive datetimes are taken as UTC and labels are in UTC.
+            y (Sequence): Values. A dictionary of series name to values draws many series over the same x.
+            max_points (int, optional): Points to draw per series, at least 3. Defaults to 1000.
+            method (Literal[, optional): Downsampling method. minmax keeps every spike. Defaults to "lttb".
+            colors (List[str], optional): Color of every series. Defaults to rngchart.COLORS.
+            section_color (Literal[, optional): Color of the section title. Defaults to "primary".
+            is_section (bool, optional): Add as extra data to previous section. Defaults to False.
+
+        Raises:
+            ValueError: If x and y do not have the same length, or max_points is less than 3
+
+        Returns:
+            Reportng: The Reportng object.
+
+        Example:
+            >>> r.chart("Latency", timestamps, {"p50": p50, "p99": p99}, method="minmax")
+        """
+        from . import rngchart
+
+        assert self._check_valid_color(section_color)
+        series = y if isinstance(y, dict) else {title: y}
+        colors = [
+            rng.HelperFunctions.color_to_tag(c) for c in (colors or rngchart.COLORS)
+        ]
+        chart, points = rngchart.line_chart(
+            {name: (x, values) for name, values in series.items()},
+            colors,
+            points=max_points,
+            method=method,
+            label=title,
+        )
+        with tag.div(
+            _class="jumbotron container context reportng-chart-class",
+            style=self._append_section(is_section),
+        ) as div:
+            anchor = rng.HelperFunctions.id_with_random(5, title)
+            tag.h1(
+                title,
+                _class="text-%s" % rng.HelperFunctions.color_to_tag(section_color),
+                id=anchor,
+            )
+            with tag.div(_class="container"):
+                raw(chart)
+        self._add_section(
+            "chart",
+            rng.HelperFunctions.convert_to_string(div),
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            points=points,
+        )
+        return self
+
+    @_record_stats
+    def summary(
+        self,
+        title: str,
+        data,
+        percentiles: Sequence[float] = (25, 50, 75, 90, 99),
+        bins: int = 30,
+        color: Literal[
+            "primary", "red", "green", "yellow", "blue", "light"
+        ] = "primary",
+        border_only: bool = True,
+        is_section: bool = False,
+    ):
+        """Add summary statistics and a histogram of numeric data, shown as
+        cards and an inline svg. The data is read once, a chunk at a time, so
+        large arrays and iterators that do not fit in memory work. Percentiles
+        are within 2 * range / rngstats.BINS of the exact value, as the bins
+        widen when later chunks extend the range.
+
+        Args:
+            title (str): Title of the section
+            data (Sequence): A numpy array, a sequence of numbers, or an iterable of numbers or of chunks of numbers. A dictionary of column name to data adds every column.
+            percentiles (Sequence[float], optional): Percentiles to show. Defaults to (25, 50, 75, 90, 99).
+            bins (int, optional): Bins of the histogram. Defaults to 30.
+            color (Literal[, optional): Color of the cards and the histogram. Defaults to "primary".
+            border_only (bool, optional): Show cards with borders only. Defaults to True.
+            is_section (bool, optional): Add as extra data to previous section. Defaults to False.
+
+        Returns:
+            Reportng: The Reportng object.
+
+        Example:
+            >>> r.summary("Response sizes", np.load("sizes.npy", mmap_mode="r"))
+        """
+        from . import rngchart, rngstats
+
+        assert self._check_valid_color(color)
+        columns = data if isinstance(data, dict) else {"": data}
+        stats = {}
+        with tag.div(
+            _class="jumbotron container context reportng-summary-class",
+            style=self._append_section(is_section),
+        ) as div:
+            anchor = rng.HelperFunctions.id_with_random(5, title)
+            tag.h1(
+                title,
+                _class="text-%s" % rng.HelperFunctions.color_to_tag(color),
+                id=anchor,
+            )
+            for name, values in columns.items():
+                stats[name] = s = rngstats.describe(values, percentiles, bins)
+                if name:
+                    tag.h2(name)
+                cards = [("Count", "%d" % s["count"])]
+                if s["missing"]:
+                    cards.append(("Missing", "%d" % s["missing"]))
+                if s["count"]:
+                    cards += [
+                        ("Mean", "%.6g" % s["mean"]),
+                        ("Std", "%.6g" % s["std"]),
+                        ("Min", "%.6g" % s["min"]),
+                    ]
+                    cards += [("p%g" % q, "%.6g" % s["p%g" % q]) for q in percentiles]
+                    cards.append(("Max", "%.6g" % s["max"]))
+                with tag.div(_class="row justify-content-center"):
+                    for header, value in cards:
+                        rng.HelperFunctions.make_cards(
+                            border_only, color, header, value
+                        )
+                with tag.div(_class="container"):
+                    raw(
+                        rngchart.histogram(
+                            s["edges"],
+                            s["counts"],
+                            rng.HelperFunctions.color_to_tag(color),
+                            label=name or title,
+                        )
+                    )
+        self._add_section(
+            "summary",
+            rng.HelperFunctions.convert_to_string(div),
+            title=title,
+            anchor=anchor,
+            attached=is_section,
+            stats=stats if isinstance(data, dict) else stats[""],
+        )
+        return self
+
+    @_record_stats
     def cards(
         self,
         cards: List[Cards],
@@ -790,8 +2030,10 @@ class Reportng:
         with tag.div(
             _class="jumbotron container context", style=style
         ) as div:  # padding mods
+            anchor = ""
             if section_title:
-                tag.h1(section_title)
+                anchor = rng.HelperFunctions.id_with_random(5, section_title)
+                tag.h1(section_title, id="%s" % anchor)
 
             with tag.div(_class="row justify-content-center"):
                 for i in range(len(cards)):
@@ -800,7 +2042,7 @@ class Reportng:
                     v = cards[i].get("message")
                     rng.HelperFunctions.make_cards(border_only, k, h, v)
 
-            self._add_decorators(
+            modals = self._add_decorators(
                 tag=div,
                 title="",
                 add_reference=None,
@@ -809,9 +2051,17 @@ class Reportng:
                 add_modal=add_modal,
             )
 
-        self.report += str(div)
+        self._add_section(
+            "cards",
+            str(div),
+            title=section_title or "",
+            anchor=anchor,
+            attached=is_section,
+            modals=modals,
+        )
         return self
 
+    @_record_stats
     def footer(
         self,
         message: str = "",
@@ -863,13 +2113,14 @@ class Reportng:
                                 tag.i(_class="fas fa-at fa-2x white-text mr-md-4")
                             )
                         # i tag for user message
-                        tag.span(message, style="font-size: 125%;")
+                        tag.span(escaped(message), style="font-size: 125%;")
                 if raw_html:
                     raw(raw_html)
 
-        self.report += str(footer)
+        self._add_section("footer", str(footer))
         return self
 
+    @_record_stats
     def list_group(
         self,
         section_title: str,
@@ -906,22 +2157,20 @@ class Reportng:
         with tag.div(
             _class="jumbotron container context reportng-list-group-class", style=style
         ) as div:
-            tag.h1(
-                section_title,
-                id="%s" % rng.HelperFunctions.id_with_random(5, section_title),
-            )
+            anchor = rng.HelperFunctions.id_with_random(5, section_title)
+            tag.h1(section_title, id="%s" % anchor)
 
             with tag.ul(_class="list-group"):
                 for i in range(len(items)):
                     tag.li(
-                        items[i],
+                        escaped(items[i]),
                         _class="list-group-item d-flex justify-content-between align-items-center text-primary",
                     )
 
             if raw_html:
                 raw(raw_html)
 
-            self._add_decorators(
+            modals = self._add_decorators(
                 tag=div,
                 title=section_title,
                 add_reference=add_reference,
@@ -930,9 +2179,17 @@ class Reportng:
                 add_modal=add_modal,
             )
 
-        self.report += rng.HelperFunctions.convert_to_string(div)
+        self._add_section(
+            "list_group",
+            rng.HelperFunctions.convert_to_string(div),
+            title=section_title,
+            anchor=anchor,
+            attached=is_section,
+            modals=modals,
+        )
         return self
 
+    @_record_stats
     def custom_html(self, html: str):
         """Add a custom section with raw html inside a jumbotron
         
@@ -947,17 +2204,364 @@ class Reportng:
             style="padding:0",
         ) as c:
             raw(html)
-        self.report += rng.HelperFunctions.convert_to_string(c)
+        self._add_section("custom_html", rng.HelperFunctions.convert_to_string(c))
         return self
 
-    def save(self, path: str) -> None:
+    def check_budget(self) -> List[str]:
+        """Check the report against its performance budget. Called by save.
+
+        Raises:
+            BudgetExceeded: If the budget is exceeded and budget_action is "raise"
+
+        Returns:
+            List[str]: A message for every budget that is exceeded
+        """
+        if not self.budget:
+            return []
+        budget, problems = self.budget, []
+        sections = self._ordered_sections()
+
+        def name(index, s):
+            return s.title or "%s #%d" % (s.builder, index + 1)
+
+        def largest(values):
+            top = sorted(range(len(sections)), key=lambda i: -values[i])[:3]
+            return ", ".join("'%s'" % name(i, sections[i]) for i in top)
+
+        def size(html):
+            return len(html.encode("utf-8"))
+
+        # what save writes: the head and body with the resources of the
+        # sections, like templates, table indexes and exports, once each
+        head, body = self._resources(sections)
+        html = [s.html for s in sections]
+
+        def needs(s, measure):
+            # a section with the resources it needs
+            return measure(s.html) + sum(map(measure, s.meta.get("resources", ())))
+
+        sizes = [needs(s, size) for s in sections]
+        total = size(head) + sum(size(h) for h in html) + size(body)
+        if "max_total_bytes" in budget and total > budget["max_total_bytes"]:
+            problems.append(
+                "Report is %d bytes, budget is %d. Largest sections: %s"
+                % (total, budget["max_total_bytes"], largest(sizes))
+            )
+        if "max_elements" in budget:
+            count = rng.HelperFunctions.count_elements
+            elements = count(head) + sum(count(h) for h in html) + count(body)
+            if elements > budget["max_elements"]:
+                problems.append(
+                    "Report has %d elements, budget is %d. Largest sections: %s"
+                    % (
+                        elements,
+                        budget["max_elements"],
+                        largest([needs(s, count) for s in sections]),
+                    )
+                )
+        for i, s in enumerate(sections):
+            if sizes[i] > budget.get("max_section_bytes", sizes[i]):
+                problems.append(
+                    "Section '%s' is %d bytes, budget is %d"
+                    % (name(i, s), sizes[i], budget["max_section_bytes"])
+                )
+            rows = s.meta.get("rows", 0)
+            if rows > budget.get("max_table_rows", rows):
+                problems.append(
+                    "Table '%s' has %d rows, budget is %d"
+                    % (name(i, s), rows, budget["max_table_rows"])
+                )
+            images = s.meta.get("images", 0)
+            if images > budget.get("max_carousel_images", images):
+                problems.append(
+                    "Image carousel '%s' has %d images, budget is %d"
+                    % (name(i, s), images, budget["max_carousel_images"])
+                )
+        if problems and self.budget_action == "raise":
+            raise rng.BudgetExceeded("\n".join(problems))
+        for p in problems:
+            logging.warning(p)
+        return problems
+
+    def save(self, path: str, show_stats: bool = False) -> None:
         """Save the report
         
         Args:
             path (str): Path to save the report. 
+            show_stats (bool, optional): Print the build stats summary. Needs collect_stats. Defaults to False.
+
+        Raises:
+            BudgetExceeded: If the budget is exceeded and budget_action is "raise"
         """
+        from pathlib import Path
+
+        self.check_budget()
+        with self._lock:
+            self.sync_journal()
         with open(str(Path(path).resolve()), "w+", encoding="utf-8") as save:
-            save.write(str(self.report))
+            self._write(save, self._ordered_sections())
+        if show_stats and self.stats is not None:
+            print(self.stats.table())
+
+    def save_zip(
+        self, path: str, name: str = "report.html", assets_dir: str = "assets"
+    ) -> None:
+        """Save the report and every file it needs in a zip, in one pass. Remote
+        javascript and css, and the fonts the css uses, are downloaded once
+        into the reportng cache and stored in assets_dir. Local files the report links to, like carousel
+        images, are added as well. Javascript and css that is already local,
+        like with ``Assets.local`` or ``Assets.download``, is looked up next
+        to the zip and then in the working directory. Images and other
+        compressed files are stored as is, text is deflated.
+
+        Example:
+            >>> r.save_zip('/tmp/report.zip')
+
+        Args:
+            path (str): Path of the zip file
+            name (str, optional): Name of the report in the zip. Defaults to "report.html".
+            assets_dir (str, optional): Folder for the assets in the zip. Defaults to "assets".
+
+        Raises:
+            BudgetExceeded: If the budget is exceeded and budget_action is "raise"
+        """
+        import re
+        import shutil
+        import zipfile
+        from hashlib import sha1
+        from pathlib import Path
+        from . import rngimages
+
+        self.check_budget()
+        with self._lock:
+            self.sync_journal()
+        sections = self._ordered_sections()
+        head, body = self._resources(sections)
+        prefix = assets_dir + "/"
+        cache = str(rng.HelperFunctions.cache_dir() / "assets") + "/"
+        head, head_files = Assets._localize(head, cache, prefix)
+        body, body_files = Assets._localize(body, cache, prefix)
+        # name in the zip to file on disk
+        files = {prefix + f: Path(cache, f) for f in head_files + body_files}
+        for arcname, source in list(files.items()):
+            if arcname.endswith(".css"):
+                css = source.read_text(encoding="utf8")
+                files.update(
+                    (prefix + f, Path(cache, f)) for f in Assets.css_files(css)
+                )
+        # local files the report links to
+        local = {}
+        for s in sections:
+            local.update(s.meta.get("files", {}))
+        # javascript and css that is already local, like with Assets.local or
+        # Assets.download, is relative to the report. It is looked up next to
+        # the zip and then in the working directory
+        for link in set(
+            re.findall(r'(?:src|href)="([^"?#]+\.(?:js|css))"', head + body)
+        ):
+            if not rngimages.is_local(link) or link in files:
+                continue
+            for folder in (Path(path).resolve().parent, Path.cwd()):
+                if (folder / link).is_file():
+                    local[link] = str(folder / link)
+                    break
+            else:
+                logging.warning("%s was not found and is not in the zip" % link)
+        # links that can not be used as is inside the zip
+        moved = {}
+        for link, source in local.items():
+            arcname = Path(link).as_posix()
+            if (
+                Path(link).is_absolute()
+                or ".." in Path(link).parts
+                or link.startswith(("file:", "/"))
+            ):
+                arcname = "%sfiles/%s-%s" % (
+                    prefix,
+                    sha1(link.encode("utf-8")).hexdigest()[:12],
+                    Path(source).name,
+                )
+                moved[link] = arcname
+            files[arcname] = Path(source)
+        if moved:
+            links = re.compile(
+                r'(?<=["\s,])(%s)(?=["\s,])'
+                % "|".join(re.escape(l) for l in sorted(moved, key=len, reverse=True))
+            )
+
+            def rewrite(html):
+                return links.sub(lambda m: moved[m.group(1)], html)
+
+        else:
+
+            def rewrite(html):
+                return html
+
+        with zipfile.ZipFile(path, "w") as zf:
+            for arcname, source in files.items():
+                info = zipfile.ZipInfo.from_file(str(source), arcname)
+                info.compress_type = _zip_compression(arcname)
+                with open(str(source), "rb") as src, zf.open(info, "w") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            info = zipfile.ZipInfo(name, localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, "w") as f:
+                f.write(rewrite(head).encode("utf-8"))
+                for s in sections:
+                    f.write(rewrite(s.html).encode("utf-8"))
+                f.write(rewrite(body).encode("utf-8"))
+
+    def _page_groups(self):
+        # attached sections (captions, carousels, is_section=True) always stay
+        # on the same page as the section they belong to
+        groups, footers = [], []
+        for s in self._ordered_sections():
+            if s.builder == "footer":
+                footers.append(s)
+            elif s.attached and groups:
+                groups[-1].append(s)
+            else:
+                groups.append([s])
+        return groups, footers
+
+    def save_sharded(
+        self,
+        directory: str,
+        max_sections_per_page: int = 50,
+        max_bytes_per_page: int = 5 * 1024 * 1024,
+        assets_dir: str = "assets",
+        download_assets: bool = False,
+    ) -> List[str]:
+        """Save the report split across multiple numbered pages. Huge reports
+        stay usable in a browser because every page only holds a slice of the
+        sections. An ``index.html`` with the table of contents of all pages is
+        created, and the navbar dropdown and search on every page cover all pages.
+
+        Args:
+            directory (str): Directory to save the pages in. Created if it does not exist.
+            max_sections_per_page (int, optional): Max number of sections per page. Defaults to 50.
+            max_bytes_per_page (int, optional): Max size in bytes of the sections on a page. Defaults to 5 MB.
+            assets_dir (str, optional): Folder relative to directory holding the files shared by all pages. Defaults to "assets".
+            download_assets (bool, optional): Download the JS/CSS assets into assets_dir with ``Assets.localize``. Defaults to False.
+
+        Returns:
+            List[str]: Paths of the index followed by all pages
+        """
+        from pathlib import Path
+
+        self.check_budget()
+        with self._lock:
+            self.sync_journal()
+        directory = Path(directory)
+        assets = directory / assets_dir
+        assets.mkdir(parents=True, exist_ok=True)
+
+        groups, footers = self._page_groups()
+        pages, size = [[]], 0
+        for group in groups:
+            group_size = sum(len(s.html) for s in group)
+            if pages[-1] and (
+                len(pages[-1]) >= max_sections_per_page
+                or size + group_size > max_bytes_per_page
+            ):
+                pages.append([])
+                size = 0
+            pages[-1].append(group)
+            size += group_size
+        page_names = ["page-%04d.html" % (i + 1) for i in range(len(pages))]
+
+        # table of contents shared by all pages, search text is split per page
+        # and only loaded by the browser once a search is made
+        toc, text_files = [], {}
+        for name, page in zip(page_names, pages):
+            texts = []
+            for group in page:
+                anchored = next((s for s in group if s.anchor), group[0])
+                toc.append(
+                    {
+                        "page": name,
+                        "id": anchored.anchor,
+                        "title": anchored.title or anchored.builder,
+                        "index": len(texts),
+                    }
+                )
+                # deduplicated bodies are searched as part of every section
+                texts.append(
+                    rng.HelperFunctions.strip_tags(
+                        "".join(
+                            s.html
+                            + "".join(self._blocks[b] for b in s.meta.get("blocks", ()))
+                            for s in group
+                        )
+                    )
+                )
+            text_file = "%s.js" % name.rsplit(".", 1)[0]
+            with open(str(assets / text_file), "w", encoding="utf-8") as f:
+                f.write(
+                    "reportngShardText(%s, %s);" % (json.dumps(name), json.dumps(texts))
+                )
+            text_files[name] = "%s/%s" % (assets_dir, text_file)
+        with open(str(assets / "reportng-toc.js"), "w", encoding="utf-8") as f:
+            f.write(
+                "var reportngShards = %s;\nvar reportngShardTextFiles = %s;\n%s"
+                % (
+                    json.dumps(toc),
+                    json.dumps(text_files),
+                    rng.JSCustom.shard_navigation,
+                )
+            )
+
+        # the dropdown lists the sections of every page from the table of
+        # contents, so the headings of the page are not added to it as well
+        head = self._head.replace(
+            str(tag.script(raw(rng.JSCustom.populate_navbar_onload))), "", 1
+        )
+        if download_assets:
+            head = Assets.localize(head, str(assets) + "/", assets_dir + "/")
+        head = head.replace(
+            "</head>",
+            '<script src="%s/reportng-toc.js"></script>\n</head>' % assets_dir,
+            1,
+        )
+        footer = "".join(s.html for s in footers)
+
+        saved = []
+        with tag.div(
+            _class="jumbotron container context reportng-list-group-class"
+        ) as index:
+            tag.h1("Contents", id="reportngcontents")
+            with tag.ul(_class="list-group"):
+                for entry in toc:
+                    with tag.li(_class="list-group-item"):
+                        tag.a(
+                            entry["title"], href="%s#%s" % (entry["page"], entry["id"])
+                        )
+        saved.append(str(directory / "index.html"))
+        with open(saved[-1], "w", encoding="utf-8") as f:
+            self._write(f, [], head, str(index) + footer)
+
+        for i, (name, page) in enumerate(zip(page_names, pages)):
+            with tag.div(_class="container text-center reportng-page-nav-class") as nav:
+                if i > 0:
+                    tag.a(
+                        "Previous",
+                        href=page_names[i - 1],
+                        _class="btn btn-sm btn-secondary m-1",
+                    )
+                tag.a(
+                    "Contents", href="index.html", _class="btn btn-sm btn-secondary m-1"
+                )
+                if i < len(pages) - 1:
+                    tag.a(
+                        "Next",
+                        href=page_names[i + 1],
+                        _class="btn btn-sm btn-secondary m-1",
+                    )
+            saved.append(str(directory / name))
+            with open(saved[-1], "w", encoding="utf-8") as f:
+                sections = [s for group in page for s in group]
+                self._write(f, sections, head, str(nav) + footer)
+        return saved
 
 
 class Assets:
@@ -966,6 +2570,11 @@ class Assets:
     use existing CSS and JS files
     """
 
+    #: headers: Headers used when downloading assets
+    headers = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 Safari/537.36"
+    }
+
     @staticmethod
     def local(rel_path: str):
         """
@@ -985,6 +2594,100 @@ class Assets:
                 local_file = v.split("/")[-1]
                 setattr(rng.JSCSS, k, rel_path + local_file)
 
+    @staticmethod
+    def _local_name(url: str) -> str:
+        # the url path is kept so that same named files do not clash
+        return "_".join(url.split("://", 1)[1].split("?", 1)[0].split("/")[1:])
+
+    @staticmethod
+    def css_files(css: str) -> List[str]:
+        """
+        Names of the local files, like fonts, that a localized stylesheet uses
+        """
+        import re
+
+        return [
+            ref.split("#", 1)[0]
+            for ref in re.findall(r"url\(\s*['\"]?([^'\")]+)", css)
+            if ":" not in ref and "/" not in ref
+        ]
+
+    @staticmethod
+    def _localize_css(css: str, url: str, download_path: str) -> str:
+        # fonts and images used by a stylesheet are downloaded next to it
+        import re
+        from pathlib import Path
+        from urllib.parse import urljoin
+        from requests import get
+
+        def download(m):
+            ref = m.group(2)
+            if ref.startswith("data:"):
+                return m.group(0)
+            source = urljoin(url, ref)
+            fragment = "#" + source.split("#", 1)[1] if "#" in source else ""
+            source = source.split("#", 1)[0]
+            local_file = Assets._local_name(source)
+            if not Path(download_path, local_file).exists():
+                response = get(source, headers=Assets.headers)
+                response.raise_for_status()
+                Path(download_path, local_file).write_bytes(response.content)
+                logging.info("Downloaded %s to %s" % (source, download_path))
+            return "url(%s%s%s%s)" % (m.group(1), local_file, fragment, m.group(1))
+
+        return re.sub(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)", download, css)
+
+    @staticmethod
+    def localize(html: str, download_path: str, rel_path: str) -> str:
+        """
+        Downloads every remote JS and CSS file referenced by the html once into
+        download_path and points the references to the local copies. This allows
+        already rendered reports, or multiple pages of a report, to share one
+        assets folder. Files that stylesheets use, like fonts, are downloaded
+        as well and the stylesheets point to them.
+
+        :param str html: Rendered html
+        :param str download_path: Path to save the files in
+        :param str rel_path: Relative path from where the html will be saved
+        :return: The html with all links pointing to the local files
+
+        Example:
+            >>> from reportng import Assets
+            >>> html = Assets.localize(r.report, '/tmp/report/assets/', 'assets/')
+        """
+        return Assets._localize(html, download_path, rel_path)[0]
+
+    @staticmethod
+    def _localize(
+        html: str, download_path: str, rel_path: str
+    ) -> Tuple[str, List[str]]:
+        # see localize. Also returns the names of the files the links now
+        # point to
+        import re
+        from pathlib import Path
+        from requests import get
+
+        Path(download_path).mkdir(parents=True, exist_ok=True)
+        names = []
+        for url in set(
+            re.findall(r'(?:src|href)="(https?://[^"]+\.(?:js|css))"', html)
+        ):
+            local_file = Assets._local_name(url)
+            if not Path(download_path, local_file).exists():
+                response = get(url, headers=Assets.headers)
+                response.raise_for_status()
+                text = response.text
+                if local_file.endswith(".css"):
+                    text = Assets._localize_css(text, url, download_path)
+                with open(
+                    str(Path(download_path, local_file)), "w", encoding="utf8"
+                ) as f:
+                    f.write(text)
+                logging.info("Downloaded %s to %s" % (url, download_path))
+            html = html.replace('"%s"' % url, '"%s%s"' % (rel_path, local_file))
+            names.append(local_file)
+        return html, names
+
     @staticmethod
     def download(download_path: str, rel_path: str, theme: str = "lux"):
         """
@@ -1001,6 +2704,7 @@ class Assets:
             >>> r = ReportWriter('Title', 'securisec')
         """
 
+        from pathlib import Path
         from requests import get
 
         logging.warning(
@@ -1019,9 +2723,6 @@ class Assets:
                         if "https://bootswatch.com/4/" in v:
                             v = v.replace("lux", theme)
                             local_file = v.split("/")[-1]
-                        headers = {
-                            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 Safari/537.36"
-                        }
-                        f.write(get(v, headers=headers).text)
+                        f.write(get(v, headers=Assets.headers).text)
                         logging.info("Downloaded %s to %s" % (v, download_path))
                         setattr(rng.JSCSS, k, rel_path + local_file)
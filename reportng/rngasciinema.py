@@ -0,0 +1,126 @@
+"""
+Asciinema helpers for reportng. Recording links are resolved to the url the
+player needs through a persistent cache, so a report with recordings can be
+rebuilt offline, and many links can be resolved concurrently. Local ``.cast``
+files can be embedded in the report instead.
+"""
+import base64
+import gzip
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from .rnghelpers import HelperFunctions
+
+#: Seconds to wait for asciinema.org before giving up on a link
+TIMEOUT = 10
+
+_lock = threading.Lock()
+_urls: Dict[str, str] = None
+
+
+def _cache_file() -> Path:
+    return HelperFunctions.cache_dir() / "asciinema.json"
+
+
+def _load() -> Dict[str, str]:
+    global _urls
+    if _urls is None:
+        try:
+            _urls = json.loads(_cache_file().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _urls = {}
+    return _urls
+
+
+def _store():
+    cache = _cache_file()
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_suffix(".%d.tmp" % threading.get_ident())
+    tmp.write_text(json.dumps(_urls), encoding="utf-8")
+    tmp.replace(cache)
+
+
+def _fetch(link: str, timeout: float) -> str:
+    from requests import get
+
+    # the player needs the url asciinema.org redirects the json to, which
+    # works around CORS. The body itself is not needed.
+    response = get("%s.json" % link, timeout=timeout, stream=True)
+    try:
+        # errors are not cached, so the link is tried again on the next build
+        response.raise_for_status()
+    finally:
+        response.close()
+    return response.url
+
+
+def resolve_many(
+    links: List[str], timeout: float = TIMEOUT, workers: int = 8
+) -> Dict[str, str]:
+    """Resolve asciinema links to the url used by the player. Cached links do
+    not touch the network, the others are fetched concurrently.
+
+    Args:
+        links (List[str]): Asciinema links like https://asciinema.org/a/117928
+        timeout (float, optional): Timeout per request in seconds. Defaults to TIMEOUT.
+        workers (int, optional): Number of concurrent requests. Defaults to 8.
+
+    Returns:
+        Dict[str, str]: Link to player url. Links that could not be resolved fall back to link.json
+    """
+    with _lock:
+        urls = _load()
+        missing = sorted({l for l in links if l not in urls})
+    resolved = {}
+    if missing:
+
+        def fetch(link):
+            try:
+                return link, _fetch(link, timeout)
+            except Exception as e:
+                logging.warning(
+                    "Need internet to get the proper url for %s: %s" % (link, e)
+                )
+                return link, None
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            resolved = {l: u for l, u in pool.map(fetch, missing) if u}
+        if resolved:
+            with _lock:
+                urls.update(resolved)
+                _store()
+    return {l: urls.get(l) or resolved.get(l) or "%s.json" % l for l in links}
+
+
+def resolve(link: str, timeout: float = TIMEOUT) -> str:
+    """
+    Resolve a single asciinema link, see ``resolve_many``
+    """
+    return resolve_many([link], timeout=timeout)[link]
+
+
+def is_cast_file(link: str) -> bool:
+    """
+    Checks if a link is a local asciinema recording
+    """
+    return not link.startswith(("http://", "https://")) and Path(link).is_file()
+
+
+def cast_source(path: str, compress: bool = False) -> str:
+    """Encode a local .cast recording for a report
+
+    Args:
+        path (str): Path of the recording
+        compress (bool, optional): gzip the recording. The browser unpacks it with DecompressionStream. Defaults to False.
+
+    Returns:
+        str: A data uri, or base64 of the gzipped recording if compress is set
+    """
+    data = Path(path).read_bytes()
+    if compress:
+        return base64.b64encode(gzip.compress(data)).decode("ascii")
+    return "data:application/json;base64,%s" % base64.b64encode(data).decode("ascii")
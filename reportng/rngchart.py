@@ -0,0 +1,334 @@
+"""
+Inline SVG charts. Series of any length are downsampled to a fixed number of
+points that keep their shape, so the size of a chart does not depend on the
+data. Downsampling is vectorized with numpy when it is installed, and done in
+python otherwise. Colors come from the bootstrap theme through currentColor.
+"""
+from datetime import datetime, timezone
+from math import ceil, isfinite
+from typing import Dict, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .rngescape import escape
+
+#: Size of the svg viewBox
+WIDTH, HEIGHT = 800, 300
+# room for the axis labels
+_LEFT, _RIGHT, _TOP, _BOTTOM = 60, 10, 10, 30
+#: Colors of the series, in order
+COLORS = ("primary", "danger", "success", "warning", "info", "secondary")
+
+
+def _is_array(values) -> bool:
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def as_floats(values: Sequence) -> Tuple[Sequence[float], bool]:
+    """
+    Numbers or datetimes as floats, and if they were datetimes. Datetimes are
+    seconds since the epoch, naive datetimes are taken as UTC like numpy
+    datetimes. Numpy arrays stay numpy arrays.
+    """
+    if np is not None:
+        a = np.asarray(values)
+        if np.issubdtype(a.dtype, np.datetime64):
+            return a.astype("datetime64[ms]").astype(np.float64) / 1000, True
+        if a.dtype == object and len(a) and isinstance(a[0], datetime):
+            return np.fromiter(map(_timestamp, a), np.float64, len(a)), True
+        return a.astype(np.float64), False
+    values = list(values)
+    if values and isinstance(values[0], datetime):
+        return [_timestamp(v) for v in values], True
+    return [float(v) for v in values], False
+
+
+def _finite(x, y):
+    # points with nan or inf can not be drawn
+    if _is_array(y):
+        keep = np.isfinite(x) & np.isfinite(y)
+        return (x, y) if keep.all() else (x[keep], y[keep])
+    points = [(a, b) for a, b in zip(x, y) if isfinite(a) and isfinite(b)]
+    return [a for a, _ in points], [b for _, b in points]
+
+
+def minmax(y: Sequence[float], buckets: int) -> Sequence[int]:
+    """Indexes of the min and max of every bucket, and of the first and last
+    point. Keeps spikes, at two points per bucket.
+
+    Args:
+        y (Sequence[float]): The values
+        buckets (int): Number of buckets
+
+    Returns:
+        Sequence[int]: Sorted indexes
+    """
+    n = len(y)
+    size = max(1, ceil(n / buckets))
+    if _is_array(y):
+        full = n // size * size
+        starts = np.arange(0, full, size)
+        rows = y[:full].reshape(-1, size)
+        parts = [[0, n - 1], starts + rows.argmin(1), starts + rows.argmax(1)]
+        if full < n:
+            parts += [[full + y[full:].argmin(), full + y[full:].argmax()]]
+        return np.unique(np.concatenate(parts))
+    indexes = {0, n - 1}
+    for start in range(0, n, size):
+        bucket = range(start, min(start + size, n))
+        indexes.add(min(bucket, key=y.__getitem__))
+        indexes.add(max(bucket, key=y.__getitem__))
+    return sorted(indexes)
+
+
+def lttb(x: Sequence[float], y: Sequence[float], points: int) -> Sequence[int]:
+    """Largest triangle three buckets. Picks the point of every bucket that
+    forms the largest triangle with the point picked before it and the mean
+    of the next bucket, which keeps the visual shape of the series.
+
+    Args:
+        x (Sequence[float]): Sorted x values
+        y (Sequence[float]): The values
+        points (int): Number of points to keep, at least 3
+
+    Raises:
+        ValueError: If points is less than 3
+
+    Returns:
+        Sequence[int]: Sorted indexes
+    """
+    n = len(y)
+    if points < 3:
+        raise ValueError("points has to be at least 3, not %d" % points)
+    if points >= n:
+        return list(range(n))
+    # the first and last points are kept, the rest is split in buckets
+    edges = [1 + (n - 2) * i // (points - 2) for i in range(points - 1)]
+    edges.append(n)
+    picked = [0]
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        after = slice(end, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        a = picked[-1]
+        if _is_array(y):
+            mean_x, mean_y = x[after].mean(), y[after].mean()
+            area = np.abs(
+                (x[a] - mean_x) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (mean_y - y[a])
+            )
+            picked.append(start + int(area.argmax()))
+            continue
+        count = after.stop - after.start
+        mean_x = sum(x[after]) / count
+        mean_y = sum(y[after]) / count
+        picked.append(
+            max(
+                range(start, end),
+                key=lambda j: abs(
+                    (x[a] - mean_x) * (y[j] - y[a]) - (x[a] - x[j]) * (mean_y - y[a])
+                ),
+            )
+        )
+    picked.append(n - 1)
+    return picked
+
+
+def downsample(
+    x: Sequence[float], y: Sequence[float], points: int, method: str = "lttb"
+) -> Tuple[Sequence[float], Sequence[float]]:
+    """Reduce a series to at most about points points
+
+    Args:
+        x (Sequence[float]): Sorted x values
+        y (Sequence[float]): The values
+        points (int): Number of points to keep, at least 3
+        method (str, optional): lttb, or minmax which keeps every spike. Defaults to "lttb".
+
+    Raises:
+        ValueError: If points is less than 3 or the method is not valid
+
+    Returns:
+        Tuple[Sequence[float], Sequence[float]]: The kept x and y values
+    """
+    if points < 3:
+        raise ValueError("points has to be at least 3, not %d" % points)
+    x, y = _finite(x, y)
+    if len(y) <= points:
+        return x, y
+    if method == "minmax":
+        indexes = minmax(y, max(1, points // 2))
+    elif method == "lttb":
+        if len(y) > points * 8 and _is_array(y):
+            # large series are reduced to their extremes first, so that lttb
+            # only looks at a few points per bucket
+            indexes = minmax(y, points * 4)
+            x, y = x[indexes], y[indexes]
+        indexes = lttb(x, y, points)
+    else:
+        raise ValueError("%s is not a valid method, use lttb or minmax" % method)
+    if _is_array(y):
+        return x[indexes], y[indexes]
+    return [x[i] for i in indexes], [y[i] for i in indexes]
+
+
+def _label(value: float, dates: bool) -> str:
+    if dates:
+        return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d %H:%M")
+    return "%g" % value
+
+
+def _scale(lo: float, hi: float, out_lo: float, out_hi: float):
+    span = (hi - lo) or 1.0
+    return lambda v: out_lo + (v - lo) * (out_hi - out_lo) / span
+
+
+def axes(
+    x_range: Tuple[float, float],
+    y_range: Tuple[float, float],
+    dates: bool = False,
+    ticks: int = 5,
+) -> str:
+    """
+    Grid lines and tick labels of a chart
+    """
+    sy = _scale(y_range[0], y_range[1], HEIGHT - _BOTTOM, _TOP)
+    parts = []
+    for i in range(ticks):
+        v = y_range[0] + (y_range[1] - y_range[0]) * i / (ticks - 1)
+        parts.append(
+            '<line x1="%d" x2="%d" y1="%.1f" y2="%.1f" stroke="currentColor" stroke-opacity=".15"/>'
+            '<text x="%d" y="%.1f" text-anchor="end" dominant-baseline="middle">%s</text>'
+            % (_LEFT, WIDTH - _RIGHT, sy(v), sy(v), _LEFT - 6, sy(v), _label(v, False))
+        )
+    for i in range(ticks):
+        v = x_range[0] + (x_range[1] - x_range[0]) * i / (ticks - 1)
+        parts.append(
+            '<text x="%.1f" y="%d" text-anchor="middle">%s</text>'
+            % (
+                _LEFT + (WIDTH - _RIGHT - _LEFT) * i / (ticks - 1),
+                HEIGHT - 8,
+                _label(v, dates),
+            )
+        )
+    return '<g fill="currentColor" font-size="11" class="text-muted">%s</g>' % "".join(
+        parts
+    )
+
+
+def svg(body: str, label: str) -> str:
+    """
+    The svg element of a chart
+    """
+    return (
+        '<svg viewBox="0 0 %d %d" width="100%%" role="img" aria-label="%s" '
+        'preserveAspectRatio="xMidYMid meet" style="max-height: 400px">%s</svg>'
+        % (WIDTH, HEIGHT, escape(label), body)
+    )
+
+
+def line_chart(
+    series: Dict[str, Tuple[Sequence, Sequence]],
+    colors: Sequence[str],
+    points: int = 1000,
+    method: str = "lttb",
+    label: str = "",
+) -> Tuple[str, int]:
+    """Render series as an svg line chart
+
+    Args:
+        series (Dict[str, Tuple[Sequence, Sequence]]): x and y values by series name
+        colors (Sequence[str]): Bootstrap color tag of every series, like danger
+        points (int, optional): Points to keep per series. Defaults to 1000.
+        method (str, optional): Downsampling method, lttb or minmax. Defaults to "lttb".
+        label (str, optional): Accessible label of the chart. Defaults to "".
+
+    Returns:
+        Tuple[str, int]: The svg, and the number of points drawn
+    """
+    reduced, dates = {}, False
+    for name, (x, y) in series.items():
+        y, _ = as_floats(y)
+        x, is_date = as_floats(range(len(y)) if x is None else x)
+        dates = dates or is_date
+        if len(x) != len(y):
+            raise ValueError("x and y of %s do not have the same length" % name)
+        reduced[name] = downsample(x, y, points, method)
+    drawn = [(x, y) for x, y in reduced.values() if len(y)]
+    if not drawn:
+        return svg(axes((0, 1), (0, 1)), label), 0
+    x_range = (min(min(x) for x, _ in drawn), max(max(x) for x, _ in drawn))
+    y_range = (min(min(y) for _, y in drawn), max(max(y) for _, y in drawn))
+    sx = _scale(x_range[0], x_range[1], _LEFT, WIDTH - _RIGHT)
+    sy = _scale(y_range[0], y_range[1], HEIGHT - _BOTTOM, _TOP)
+    parts, total = [axes(x_range, y_range, dates)], 0
+    for i, (name, (x, y)) in enumerate(reduced.items()):
+        if not len(y):
+            continue
+        total += len(y)
+        path = "M" + "L".join("%.1f %.1f" % (sx(a), sy(b)) for a, b in zip(x, y))
+        parts.append(
+            '<path d="%s" fill="none" stroke="currentColor" stroke-width="1.5" '
+            'class="text-%s"><title>%s</title></path>'
+            % (path, colors[i % len(colors)], escape(name))
+        )
+    if len(reduced) > 1:
+        for i, name in enumerate(reduced):
+            parts.append(
+                '<text x="%d" y="%d" fill="currentColor" font-size="12" class="text-%s">%s</text>'
+                % (
+                    _LEFT + 10,
+                    _TOP + 14 * (i + 1),
+                    colors[i % len(colors)],
+                    escape(name),
+                )
+            )
+    return svg("".join(parts), label), total
+
+
+def histogram(
+    edges: Sequence[float], counts: Sequence[int], color: str, label: str = ""
+) -> str:
+    """Render a histogram as svg
+
+    Args:
+        edges (Sequence[float]): Edges of the bins, one more than counts
+        counts (Sequence[int]): Count of every bin
+        color (str): Bootstrap color tag of the bars, like danger
+        label (str, optional): Accessible label of the chart. Defaults to "".
+
+    Returns:
+        str: The svg
+    """
+    if not counts:
+        return svg(axes((0, 1), (0, 1)), label)
+    x_range, y_range = (edges[0], edges[-1]), (0, max(counts))
+    sx = _scale(x_range[0], x_range[1], _LEFT, WIDTH - _RIGHT)
+    sy = _scale(y_range[0], y_range[1], HEIGHT - _BOTTOM, _TOP)
+    # all bars are one path, with a small gap between them
+    bars = "".join(
+        "M%.1f %.1fH%.1fV%.1fH%.1fZ"
+        % (
+            sx(a) + 0.5,
+            sy(c),
+            max(sx(b) - 0.5, sx(a) + 1),
+            sy(0),
+            sx(a) + 0.5,
+        )
+        for a, b, c in zip(edges, edges[1:], counts)
+        if c
+    )
+    return svg(
+        axes(x_range, y_range)
+        + '<path d="%s" fill="currentColor" fill-opacity=".8" class="text-%s"/>'
+        % (bars, color),
+        label,
+    )
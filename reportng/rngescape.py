@@ -0,0 +1,112 @@
+"""
+HTML escaping for reportng builders. Produces the same output as dominate's
+escape, but text without special characters is returned as is, large strings
+are escaped a chunk at a time into the output, and many short strings, like
+table cells, are escaped a batch at a time.
+"""
+
+from numbers import Number
+from typing import Callable, Iterable, Iterator, List
+
+from dominate.util import raw
+
+#: Characters escaped at a time in large strings
+CHUNK_SIZE = 1024 * 1024
+#: Characters of short strings escaped at a time by escape_many
+BATCH_SIZE = 64 * 1024
+
+# joins batched strings. Escaping never adds or removes it
+_separator = "\x00"
+
+
+def _replace(text: str, quote: bool) -> str:
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    if quote:
+        text = text.replace('"', "&quot;")
+    return text
+
+
+def is_safe(text: str, quote: bool = True) -> bool:
+    """
+    Checks if a string has no characters that need escaping
+    """
+    # substring checks are much faster than a regex over large text
+    return not ("&" in text or "<" in text or ">" in text or (quote and '"' in text))
+
+
+def escape_to(write: Callable[[str], object], text: str, quote: bool = True):
+    """Escape a string into a writer, like ``StringIO.write`` or a file, a
+    chunk at a time
+
+    Args:
+        write (Callable[[str], object]): Called with every escaped chunk
+        text (str): The text to escape
+        quote (bool, optional): Also escape double quotes. Defaults to True.
+    """
+    if is_safe(text, quote):
+        write(text)
+        return
+    for pos in range(0, len(text), CHUNK_SIZE):
+        write(_replace(text[pos : pos + CHUNK_SIZE], quote))
+
+
+def escape(text: str, quote: bool = True) -> str:
+    """Escape a string for html
+
+    Args:
+        text (str): The text to escape
+        quote (bool, optional): Also escape double quotes. Defaults to True.
+
+    Returns:
+        str: The escaped text. Safe text is returned without a copy
+    """
+    if is_safe(text, quote):
+        return text
+    if len(text) <= CHUNK_SIZE:
+        return _replace(text, quote)
+    chunks = []
+    escape_to(chunks.append, text, quote)
+    return "".join(chunks)
+
+
+def _escape_batch(strings: List[str], quote: bool) -> List[str]:
+    joined = _separator.join(strings)
+    if joined.count(_separator) != len(strings) - 1:
+        # a string contains the separator itself
+        return [escape(s, quote) for s in strings]
+    return escape(joined, quote).split(_separator)
+
+
+def escape_many(strings: Iterable, quote: bool = True) -> Iterator[str]:
+    """Escape many short strings, about BATCH_SIZE characters in one pass, so
+    that only one batch is held in memory. Values that are not strings are
+    converted with str.
+
+    Args:
+        strings (Iterable): The strings to escape
+        quote (bool, optional): Also escape double quotes. Defaults to True.
+
+    Yields:
+        str: The escaped strings, in order
+    """
+    batch, size = [], 0
+    for s in strings:
+        s = s if isinstance(s, str) else str(s)
+        batch.append(s)
+        size += len(s) + 1
+        if size >= BATCH_SIZE:
+            yield from _escape_batch(batch, quote)
+            batch, size = [], 0
+    if batch:
+        yield from _escape_batch(batch, quote)
+
+
+def escaped(text: str, quote: bool = True) -> raw:
+    """
+    Escaped text as a dominate node, to use in place of a string argument of
+    a tag so that dominate does not escape it again. Numbers are converted
+    with str, like dominate does.
+    """
+    if isinstance(text, Number):
+        text = str(text)
+    return raw(escape(text, quote))
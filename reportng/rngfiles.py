@@ -0,0 +1,144 @@
+"""
+Helpers to include parts of large files in a report. Files are memory mapped
+and only the selected lines are read, decoded and escaped, a chunk at a time,
+so the size of the file does not matter.
+"""
+import codecs
+import mmap
+import re
+from io import StringIO
+from typing import Iterator, Tuple, Union
+
+from .rngescape import escape_to
+
+#: Bytes read from the file at a time
+CHUNK_SIZE = 1024 * 1024
+#: Bytes included by Reportng.section_from_file when no lines are selected
+MAX_BYTES = 1024 * 1024
+
+
+def _line_start(mm, pos: int) -> int:
+    return mm.rfind(b"\n", 0, pos) + 1
+
+
+def _skip_lines(mm, pos: int, count: int, end: int) -> int:
+    # position after count lines starting at pos
+    for _ in range(count):
+        nl = mm.find(b"\n", pos, end)
+        if nl == -1:
+            return end
+        pos = nl + 1
+    return pos
+
+
+def window(
+    mm, head: int = None, tail: int = None, line_range: Tuple[int, int] = None
+) -> Tuple[int, int]:
+    """Byte range of the selected lines
+
+    Args:
+        mm (mmap): The mapped file
+        head (int, optional): First lines of the file. Defaults to None.
+        tail (int, optional): Last lines of the file. Defaults to None.
+        line_range (Tuple[int, int], optional): First and last line, starting at 1. Defaults to None.
+
+    Returns:
+        Tuple[int, int]: Start and end byte
+    """
+    size = len(mm)
+    if head is not None:
+        return 0, _skip_lines(mm, 0, head, size)
+    if tail is not None:
+        # a trailing newline does not start another line
+        end = size - 1 if size and mm[size - 1 : size] == b"\n" else size
+        start = end
+        for _ in range(tail):
+            if start <= 0:
+                break
+            start = _line_start(mm, start - 1)
+        return start, size
+    if line_range is not None:
+        first, last = line_range
+        start = _skip_lines(mm, 0, first - 1, size)
+        return start, _skip_lines(mm, start, last - first + 1, size)
+    return 0, size
+
+
+def slices(
+    mm,
+    head: int = None,
+    tail: int = None,
+    line_range: Tuple[int, int] = None,
+    pattern: Union[str, bytes] = None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    Byte ranges of the selected lines. With a pattern, only the lines in the
+    window that match the regex are selected.
+    """
+    start, end = window(mm, head, tail, line_range)
+    if pattern is None:
+        yield start, end
+        return
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    # the regex runs over the mapped file in C and matches whole lines
+    lines = re.compile(rb"^[^\n]*(?:" + pattern + rb")[^\n]*\n?", re.M)
+    for m in lines.finditer(mm, start, end):
+        yield m.start(), m.end()
+
+
+def escape_slices(
+    mm,
+    ranges: Iterator[Tuple[int, int]],
+    encoding: str = "utf-8",
+    max_bytes: int = None,
+) -> Tuple[str, int]:
+    """Decode and html escape byte ranges of a mapped file a chunk at a time
+
+    Args:
+        mm (mmap): The mapped file
+        ranges (Iterator[Tuple[int, int]]): Byte ranges
+        encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+        max_bytes (int, optional): Stop after this many bytes of the file. Defaults to None.
+
+    Returns:
+        Tuple[str, int]: The escaped text and the number of bytes read
+    """
+    out = StringIO()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    total = 0
+    for start, end in ranges:
+        if max_bytes is not None:
+            end = min(end, start + max_bytes - total)
+        for pos in range(start, end, CHUNK_SIZE):
+            escape_to(out.write, decoder.decode(mm[pos : min(pos + CHUNK_SIZE, end)]))
+        total += max(0, end - start)
+        if max_bytes is not None and total >= max_bytes:
+            break
+    escape_to(out.write, decoder.decode(b"", final=True))
+    return out.getvalue(), total
+
+
+def read_escaped(
+    path: str,
+    head: int = None,
+    tail: int = None,
+    line_range: Tuple[int, int] = None,
+    pattern: Union[str, bytes] = None,
+    encoding: str = "utf-8",
+    max_bytes: int = None,
+) -> Tuple[str, int]:
+    """
+    Memory map a file and return the selected lines html escaped, see
+    ``slices`` and ``escape_slices``
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return "", 0
+        with mm:
+            return escape_slices(
+                mm, slices(mm, head, tail, line_range, pattern), encoding, max_bytes
+            )
@@ -3,8 +3,18 @@ Helper module for reportng
 """
 import dominate.tags as tag
 from dominate.util import raw
+from .rngescape import escaped
 import logging
-from random import choice
+import re
+from random import choices
+
+
+class template(tag.html_tag):
+    """
+    The html template tag, which dominate does not have
+    """
+
+    pass
 
 
 def check_keys(keys: list, check_dict: dict):
@@ -67,6 +77,12 @@ class CSSControl:
     sticky_section_css = "padding:0; margin-top:-2rem;"
     #: not_stick_section: Controls if the section is not a sticky
     not_sticky_section = "padding-bottom:3; padding-top:40;"
+    #: sortable_table: Style sheet of sortable table headers
+    sortable_table = (
+        "th.reportng-sortable{cursor:pointer;user-select:none}"
+        'th[aria-sort=ascending]::after{content:" \\25B2"}'
+        'th[aria-sort=descending]::after{content:" \\25BC"}'
+    )
 
 
 class JSCustom:
@@ -135,11 +151,95 @@ class JSCustom:
                         $clearBtn = $("button[data-search='clear']"),
                         $prevBtn = $("button[data-search='prev']"),
                         $nextBtn = $("button[data-search='next']"),
-                        $content = $(".context"),
-                        $results,
+                        $results = $(),
                         currentClass = "current",
                         offsetTop = 150,
-                        currentIndex = 0;
+                        currentIndex = 0,
+                        sections = null,
+                        worker = null,
+                        query = 0,
+                        searchVal = "",
+                        marked = [],
+                        timer;
+                    // matching runs in a worker over the text of the sections so
+                    // that typing never blocks the page. A newer query stops the
+                    // scan of an older one.
+                    var workerSource = [
+                        "var texts = [], latest = 0;",
+                        "onmessage = function (e) {",
+                        "    var d = e.data, pattern, matches = [], i = 0;",
+                        "    if (d.texts) { texts = d.texts; return; }",
+                        "    latest = d.id;",
+                        "    try { pattern = new RegExp(d.pattern); }",
+                        "    catch (err) { postMessage({ id: d.id, error: true }); return; }",
+                        "    (function next() {",
+                        "        if (d.id !== latest) { return; }",
+                        "        for (var end = Math.min(i + 500, texts.length); i < end; i++) {",
+                        "            if (pattern.test(texts[i])) { matches.push(i); }",
+                        "        }",
+                        "        if (i < texts.length) { setTimeout(next, 0); }",
+                        "        else { postMessage({ id: d.id, matches: matches }); }",
+                        "    })();",
+                        "};"
+                    ].join("\\n");
+                    var idle = window.requestIdleCallback || function (callback) {
+                        var start = Date.now();
+                        return setTimeout(function () {
+                            callback({
+                                timeRemaining: function () {
+                                    return Math.max(0, 12 - (Date.now() - start));
+                                }
+                            });
+                        }, 1);
+                    };
+                    function lazyBody(el) {
+                        return el.querySelector("template.reportng-lazy-body");
+                    }
+                    function templateText(id) {
+                        var t = document.getElementById(id);
+                        return t ? t.content.textContent : "";
+                    }
+                    function sectionTexts() {
+                        if (sections === null) {
+                            if (window.reportngExpandBlocks) {
+                                reportngExpandBlocks();
+                            }
+                            // collapsed bodies that are not rendered are searched
+                            // in the template their index points at
+                            var index = {};
+                            $("script[data-reportng-index]").each(function () {
+                                index[this.getAttribute("data-reportng-index")] = JSON.parse(this.textContent);
+                            });
+                            sections = $(".context").map(function () {
+                                var id = $(this).closest(".collapse").attr("id");
+                                return {
+                                    el: this,
+                                    text: lazyBody(this) && id in index ? templateText(index[id]) : this.textContent
+                                };
+                            }).get();
+                        }
+                        return sections;
+                    }
+                    function getWorker() {
+                        if (worker === null) {
+                            try {
+                                worker = new Worker(URL.createObjectURL(
+                                    new Blob([workerSource], { type: "text/javascript" })
+                                ));
+                                worker.onmessage = function (e) {
+                                    showResults(e.data);
+                                };
+                                worker.postMessage({
+                                    texts: sectionTexts().map(function (s) {
+                                        return s.text;
+                                    })
+                                });
+                            } catch (e) {
+                                worker = false;
+                            }
+                        }
+                        return worker;
+                    }
                     function jumpTo() {
                         if ($results.length) {
                             var position,
@@ -152,22 +252,82 @@ class JSCustom:
                             }
                         }
                     }
-                    $input.on("input", function () {
-                        var searchVal = this.value;
-                        $content.unmark({
-                            done: function () {
-                                $content.markRegExp(RegExp(searchVal), {
-                                    separateWordSearch: false,
-                                    done: function () {
-                                        $results = $content.find("mark");
-                                        currentIndex = 0;
-                                        var c = document.getElementById('searchcount');
-                                        c.innerHTML = $results.length;
-                                        jumpTo();
-                                    }
-                                });
-                            }
+                    function search(value) {
+                        var texts = sectionTexts(),
+                            w = getWorker(),
+                            pattern;
+                        query += 1;
+                        searchVal = value;
+                        if (!value) {
+                            return showResults({ id: query, matches: [] });
+                        }
+                        if (w) {
+                            return w.postMessage({ id: query, pattern: value });
+                        }
+                        try {
+                            pattern = new RegExp(value);
+                        } catch (e) {
+                            return showResults({ id: query, error: true });
+                        }
+                        showResults({
+                            id: query,
+                            matches: texts.map(function (s, i) {
+                                return pattern.test(s.text) ? i : -1;
+                            }).filter(function (i) {
+                                return i >= 0;
+                            })
                         });
+                    }
+                    function showResults(data) {
+                        // results of stale queries and half typed regexes are
+                        // ignored, the previous highlights stay
+                        if (data.id !== query || data.error) {
+                            return;
+                        }
+                        var pattern = new RegExp(searchVal),
+                            todo = data.matches.slice(),
+                            counter = document.getElementById("searchcount");
+                        $(marked).unmark();
+                        marked = [];
+                        $results = $();
+                        currentIndex = 0;
+                        counter.innerHTML = 0;
+                        // sections are highlighted a few at a time while the
+                        // browser is idle
+                        function step(deadline) {
+                            var batch = [];
+                            while (data.id === query && todo.length && (!batch.length || deadline.timeRemaining() > 1)) {
+                                var el = sections[todo.shift()].el;
+                                if (window.reportngLazyCollapse && lazyBody(el)) {
+                                    var $collapse = $(el).closest(".collapse");
+                                    reportngLazyCollapse($collapse[0]);
+                                    $collapse.collapse("show");
+                                }
+                                $(el).markRegExp(pattern);
+                                batch.push(el);
+                            }
+                            if (data.id !== query) {
+                                return;
+                            }
+                            marked = marked.concat(batch);
+                            var first = !$results.length;
+                            $results = $results.add($(batch).find("mark"));
+                            counter.innerHTML = $results.length;
+                            if (first) {
+                                jumpTo();
+                            }
+                            if (todo.length) {
+                                idle(step);
+                            }
+                        }
+                        idle(step);
+                    }
+                    $input.on("input", function () {
+                        var value = this.value;
+                        clearTimeout(timer);
+                        timer = setTimeout(function () {
+                            search(value);
+                        }, 200);
                     });
                     $nextBtn.add($prevBtn).on("click", function () {
                         if ($results.length) {
@@ -220,6 +380,279 @@ class JSCustom:
     });
                 """
 
+    lazy_carousel = """
+                if (!window.reportngLazyCarousel) {
+                    window.reportngLazyCarousel = true;
+                    $(function () {
+                        function loadSlide(slide) {
+                            $(slide).find("img[data-src]").each(function () {
+                                var srcset = this.getAttribute("data-srcset");
+                                if (srcset) {
+                                    this.setAttribute("sizes", this.getAttribute("data-sizes"));
+                                    this.setAttribute("srcset", srcset);
+                                }
+                                this.setAttribute("src", this.getAttribute("data-src"));
+                                this.removeAttribute("data-src");
+                            });
+                        }
+                        $(".carousel").on("slide.bs.carousel", function (e) {
+                            // load the next slide in the same direction as well
+                            var $slide = $(e.relatedTarget);
+                            loadSlide($slide);
+                            loadSlide(e.direction === "left" ? $slide.next() : $slide.prev());
+                        });
+                    });
+                }
+                """
+
+    asciinema_cast = """
+                if (!window.reportngCastLoader) {
+                    window.reportngCastLoader = true;
+                    $(function () {
+                        $(".reportng-asciinema-cast").each(function () {
+                            var holder = this;
+                            var bytes = Uint8Array.from(atob(holder.getAttribute("data-cast")), function (c) {
+                                return c.charCodeAt(0);
+                            });
+                            var cast = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+                            new Response(cast).blob().then(function (blob) {
+                                var player = document.createElement("asciinema-player");
+                                player.setAttribute("src", URL.createObjectURL(blob));
+                                holder.appendChild(player);
+                            });
+                        });
+                    });
+                }
+                """
+
+    expand_blocks = """
+                if (!window.reportngExpandBlocks) {
+                    // sections that repeat a large body reference a template
+                    // that holds it once. They are filled when scrolled near.
+                    var expandBlock = function (el) {
+                        var id = el.getAttribute("data-reportng-block");
+                        if (id) {
+                            el.removeAttribute("data-reportng-block");
+                            var t = document.getElementById("reportng-block-" + id);
+                            el.appendChild(t.content.cloneNode(true));
+                        }
+                    };
+                    window.reportngExpandBlock = expandBlock;
+                    window.reportngExpandBlocks = function () {
+                        $("[data-reportng-block]").each(function () {
+                            expandBlock(this);
+                        });
+                    };
+                    $(function () {
+                        if (!("IntersectionObserver" in window)) {
+                            return reportngExpandBlocks();
+                        }
+                        var observer = new IntersectionObserver(function (entries) {
+                            entries.forEach(function (e) {
+                                if (e.isIntersecting) {
+                                    observer.unobserve(e.target);
+                                    expandBlock(e.target);
+                                }
+                            });
+                        }, { rootMargin: "1000px" });
+                        $("[data-reportng-block]").each(function () {
+                            observer.observe(this);
+                        });
+                    });
+                }
+                """
+
+    lazy_collapse = """
+                if (!window.reportngLazyCollapse) {
+                    // collapsed bodies are kept in templates until they are shown
+                    window.reportngLazyCollapse = function (collapse) {
+                        $(collapse).find("template.reportng-lazy-body").each(function () {
+                            var body = document.importNode(this.content, true);
+                            if (window.reportngExpandBlock) {
+                                body.querySelectorAll("[data-reportng-block]").forEach(reportngExpandBlock);
+                            }
+                            this.parentNode.replaceChild(body, this);
+                        });
+                    };
+                    $(document).on("show.bs.collapse", ".collapse", function () {
+                        reportngLazyCollapse(this);
+                    });
+                }
+                """
+
+    sortable_table = """
+                (function () {
+                    // rows are reordered and filtered with the indexes built by
+                    // rngtable, nothing is compared in the browser
+                    function decode(b64, bytes) {
+                        var s = atob(b64), u8 = new Uint8Array(s.length);
+                        for (var i = 0; i < s.length; i++) u8[i] = s.charCodeAt(i);
+                        return bytes === 2 ? new Uint16Array(u8.buffer) : new Uint32Array(u8.buffer);
+                    }
+                    function setup(el) {
+                        var index = JSON.parse(el.textContent);
+                        var table = document.getElementById(el.getAttribute("data-reportng-table"));
+                        if (!table || table.reportngIndex) return;
+                        table.reportngIndex = index;
+                        var tbody = table.tBodies[0], rows = Array.prototype.slice.call(tbody.rows);
+                        var columns = index.columns, offset = index.offset || 0, n = rows.length;
+                        var order = null, desc = false, visible = null;
+                        function array(column, key, bytes) {
+                            var cache = "_" + key;
+                            if (!column[cache]) column[cache] = decode(column[key], bytes);
+                            return column[cache];
+                        }
+                        function render() {
+                            var fragment = document.createDocumentFragment();
+                            for (var k = 0; k < n; k++) {
+                                var i = order ? order[desc ? n - 1 - k : k] : k;
+                                if (!visible || visible[i]) fragment.appendChild(rows[i]);
+                            }
+                            tbody.textContent = "";
+                            tbody.appendChild(fragment);
+                        }
+                        var headers = table.tHead ? table.tHead.rows[0].cells : [];
+                        Array.prototype.forEach.call(headers, function (th, c) {
+                            var column = columns[c - offset];
+                            if (c >= offset && !(column && column.order)) return;
+                            th.classList.add("reportng-sortable");
+                            th.addEventListener("click", function () {
+                                var ascending = th.getAttribute("aria-sort") !== "ascending";
+                                Array.prototype.forEach.call(headers, function (h) {
+                                    h.removeAttribute("aria-sort");
+                                });
+                                // the index column restores the original order
+                                order = c < offset ? null : array(column, "order", index.bytes);
+                                desc = !ascending;
+                                th.setAttribute("aria-sort", ascending ? "ascending" : "descending");
+                                render();
+                            });
+                        });
+                        var input = document.querySelector('[data-reportng-filter="' + table.id + '"]');
+                        if (!input) return;
+                        var timer = null;
+                        input.addEventListener("input", function () {
+                            clearTimeout(timer);
+                            timer = setTimeout(function () {
+                                var query = input.value.toLowerCase();
+                                if (!query) {
+                                    visible = null;
+                                } else {
+                                    visible = new Uint8Array(n);
+                                    columns.forEach(function (column) {
+                                        if (!column.values) return;
+                                        // matching values are found in the dictionary,
+                                        // rows only look up their rank
+                                        var match = new Uint8Array(column.values.length), any = false;
+                                        for (var j = 0; j < match.length; j++) {
+                                            if (column.values[j].indexOf(query) !== -1) match[j] = any = 1;
+                                        }
+                                        if (!any) return;
+                                        var ranks = array(column, "ranks", column.bytes);
+                                        for (var i = 0; i < n; i++) if (match[ranks[i]]) visible[i] = 1;
+                                    });
+                                }
+                                render();
+                            }, 150);
+                        });
+                    }
+                    function setupAll() {
+                        document.querySelectorAll("script[data-reportng-table]").forEach(setup);
+                    }
+                    if (document.readyState === "loading") {
+                        document.addEventListener("DOMContentLoaded", setupAll);
+                    } else {
+                        setupAll();
+                    }
+                })();
+                """
+
+    table_export = """
+                (function () {
+                    // embedded exports are gzip blobs, decompressed when clicked.
+                    // Browsers without DecompressionStream get the .gz file
+                    document.addEventListener("click", function (e) {
+                        var a = e.target.closest ? e.target.closest("a[data-reportng-export]") : null;
+                        if (!a || a.href.indexOf("blob:") === 0) return;
+                        e.preventDefault();
+                        var id = a.getAttribute("data-reportng-export");
+                        var data = document.querySelector('script[data-reportng-export-data="' + id + '"]');
+                        var s = atob(data.textContent.trim()), u8 = new Uint8Array(s.length);
+                        for (var i = 0; i < s.length; i++) u8[i] = s.charCodeAt(i);
+                        var blob = new Blob([u8], {type: "application/gzip"});
+                        function download(b) {
+                            a.href = URL.createObjectURL(b);
+                            a.click();
+                        }
+                        if (window.DecompressionStream) {
+                            new Response(blob.stream().pipeThrough(new DecompressionStream("gzip")))
+                                .blob()
+                                .then(function (b) {
+                                    download(new Blob([b], {type: a.getAttribute("data-mime")}));
+                                });
+                        } else {
+                            a.download += ".gz";
+                            download(blob);
+                        }
+                    });
+                })();
+                """
+
+    shard_navigation = """
+                var reportngShardTexts = {};
+                var reportngShardQuery = "";
+                function reportngShardText(page, texts) {
+                    reportngShardTexts[page] = texts;
+                    reportngShardSearch();
+                }
+                function populateShardDropdown() {
+                    var select = document.getElementById("ddmenu");
+                    var current = window.location.pathname.split("/").pop();
+                    for (var i = 0; i < reportngShards.length; i++){
+                        var s = reportngShards[i];
+                        var a = document.createElement("a");
+                        a.setAttribute("class", "dropdown-item reportng-shard-item");
+                        a.setAttribute("href", (s.page === current ? "" : s.page) + "#" + s.id);
+                        a.setAttribute("data-shard", i);
+                        a.innerText = s.title;
+                        select.appendChild(a);
+                    }
+                }
+                function reportngShardSearch() {
+                    var re = null;
+                    try {
+                        if (reportngShardQuery) { re = RegExp(reportngShardQuery); }
+                    } catch (e) {
+                        return;
+                    }
+                    var items = document.getElementsByClassName("reportng-shard-item");
+                    for (var i = 0; i < items.length; i++) {
+                        var s = reportngShards[items[i].getAttribute("data-shard")];
+                        var texts = reportngShardTexts[s.page];
+                        var hit = re === null || (texts !== undefined && re.test(texts[s.index]));
+                        items[i].style.display = hit ? "" : "none";
+                    }
+                }
+                $(function () {
+                    $("input[type='search']").on("input", function () {
+                        reportngShardQuery = this.value;
+                        // page texts are only fetched once somebody searches
+                        for (var page in reportngShardTextFiles) {
+                            if (reportngShardTextFiles[page] !== null) {
+                                var script = document.createElement("script");
+                                script.src = reportngShardTextFiles[page];
+                                document.head.appendChild(script);
+                                reportngShardTextFiles[page] = null;
+                            }
+                        }
+                        reportngShardSearch();
+                    });
+                });
+                // sharded pages do not use populateDropdown, which would list
+                // the sections of the page a second time
+                window.addEventListener("load", populateShardDropdown);
+                """
+
 
 class CustomHTML:
     """
@@ -291,6 +724,14 @@ class TableError(Exception):
     pass
 
 
+class BudgetExceeded(Exception):
+    """
+    Exception when a report is larger than its performance budget
+    """
+
+    pass
+
+
 class HelperFunctions:
     """
     Some helper functions that does not impact how enduser uses reportng
@@ -316,10 +757,38 @@ class HelperFunctions:
 
     @staticmethod
     def id_with_random(length, title):
-        random_string = "".join(
-            [choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length)]
+        random_string = "".join(choices("abcdefghijklmnopqrstuvwxyz", k=length))
+        return "".join(filter(str.isalnum, title)) + random_string
+
+    @staticmethod
+    def strip_tags(html):
+        """
+        Reduces rendered html to its visible text
+        """
+        from html import unescape
+
+        text = re.sub(r"<script.*?</script>|<[^>]+>", " ", html, flags=re.S)
+        return " ".join(unescape(text).split())
+
+    @staticmethod
+    def cache_dir():
+        """
+        Folder for caches shared by all reports. Can be set with the
+        REPORTNG_CACHE_DIR environment variable. Defaults to ~/.cache/reportng
+        """
+        import os
+        from pathlib import Path
+
+        return Path(
+            os.environ.get("REPORTNG_CACHE_DIR") or Path.home() / ".cache" / "reportng"
         )
-        return "".join(e for e in title if e.isalnum()) + random_string
+
+    @staticmethod
+    def count_elements(html):
+        """
+        Counts the html elements in rendered html
+        """
+        return len(re.findall(r"<[a-zA-Z]", html))
 
     @staticmethod
     def color_to_tag(s):
@@ -392,9 +861,9 @@ class HelperFunctions:
             _class="card %s %s-%s m-3" % (text, style, HelperFunctions.color_to_tag(k)),
             style="width: 20rem;",
         ) as m:
-            tag.div(h, _class="card-header")
+            tag.div(escaped(h), _class="card-header")
             with tag.div(_class="card-body"):
-                tag.p(v, _class="card-text")
+                tag.p(escaped(v), _class="card-text")
         return m
 
     @staticmethod
@@ -459,23 +928,34 @@ class HelperFunctions:
         return total
 
     @staticmethod
-    def make_modals(section, info):
-        if not "button" in info:
-            button = "Info"
-        else:
-            button = info["button"]
+    def _modal_title(info):
         for k in ["title", "message"]:
             if not k in info:
                 raise NotValidTag("Make sure to use both title and content keys")
-        modal_title = info["title"].replace(" ", "")
-        modal_content = info["message"]
-        tag.button(
-            button,
+        return info["title"].replace(" ", "")
+
+    @staticmethod
+    def modal_button(info):
+        """
+        Creates the button that opens a modal
+        """
+        modal_title = HelperFunctions._modal_title(info)
+        return tag.button(
+            info.get("button", "Info"),
             type="button",
             _class="btn btn-primary btn-md reportng-button-class",
             data_toggle="modal",
             data_target="#%s" % modal_title,
         )
+
+    @staticmethod
+    def modal_dialog(info):
+        """
+        Creates the dialog of a modal. Reportng renders dialogs once at the end
+        of the report, no matter how many sections open the same modal.
+        """
+        modal_title = HelperFunctions._modal_title(info)
+        modal_content = info["message"]
         with tag.div(
             _class="modal fade",
             id="%s" % modal_title,
@@ -483,7 +963,7 @@ class HelperFunctions:
             role="dialog",
             aria_labelledby="model%s" % modal_title,
             aria_hidden="true",
-        ):
+        ) as m:
             with tag.div(_class="modal-dialog", role="document"):
                 with tag.div(_class="modal-content reportng-modal-content-class"):
                     with tag.div(_class="modal-header reportng-modal-header-class"):
@@ -505,13 +985,33 @@ class HelperFunctions:
                             _class="btn btn-sm btn-secondary",
                             data_dismiss="modal",
                         )
+        return m
 
     @staticmethod
-    def accordian_collapse(color, title, content, pre, raw_html, **kwargs):
+    def make_modals(section, info):
+        """
+        Creates a modal button and its dialog in place
         """
-        Creates a collapsible accordian
+        HelperFunctions.modal_button(info)
+        HelperFunctions.modal_dialog(info)
+
+    @staticmethod
+    def accordian_collapse(
+        color,
+        title,
+        content,
+        pre,
+        raw_html,
+        anchor=None,
+        attrs=None,
+        lazy=False,
+        **kwargs
+    ):
         """
-        title_random = HelperFunctions.id_with_random(5, title)
+        Creates a collapsible accordian. A lazy accordian keeps its body in a
+        template that is only added to the page when it is expanded.
+        """
+        title_random = anchor or HelperFunctions.id_with_random(5, title)
         with tag.div(
             _class="jumbotron container reportng-section-collapsible-class"
         ) as h:
@@ -538,15 +1038,89 @@ class HelperFunctions:
                 ):
                     with tag.div(
                         _class="card-body context reportng-collapse-card-body-class"
-                    ):
+                    ) as body:
+                        if lazy:
+                            body = template(
+                                _class="reportng-lazy-body",
+                                id="reportng-lazy-%s" % title_random,
+                            )
                         if raw_html != "":
-                            raw(raw_html)
+                            node = raw(raw_html)
                         elif pre:
-                            tag.pre(content)
+                            node = tag.pre(escaped(content), **(attrs or {}))
                         else:
-                            tag.p(content)
+                            node = tag.p(escaped(content), **(attrs or {}))
+                        body.add(node)
                 if "alert" in kwargs:
                     HelperFunctions.make_alert(kwargs.get("alert"))
                 if "badge" in kwargs:
                     HelperFunctions.create_badges(kwargs.get("badge"))
         return HelperFunctions.convert_to_string(h)
+
+
+class BuildStats:
+    """
+    Collects the elapsed time, rendered bytes and number of html elements of
+    every builder call of a report. Enabled with ``Reportng(collect_stats=True)``
+    and available as ``Reportng.stats``.
+    """
+
+    def __init__(self):
+        #: records: One dictionary per builder call
+        self.records = []
+
+    def record(self, builder: str, title: str, seconds: float, html: str):
+        """
+        Adds a record for a builder call
+        """
+        self.records.append(
+            {
+                "builder": builder,
+                "title": title,
+                "seconds": seconds,
+                "bytes": len(html.encode("utf-8")),
+                "elements": HelperFunctions.count_elements(html),
+            }
+        )
+
+    def summary(self) -> dict:
+        """
+        Totals per builder
+        """
+        totals = {}
+        for r in self.records:
+            t = totals.setdefault(
+                r["builder"], {"calls": 0, "seconds": 0.0, "bytes": 0, "elements": 0}
+            )
+            t["calls"] += 1
+            for k in ("seconds", "bytes", "elements"):
+                t[k] += r[k]
+        return totals
+
+    def table(self) -> str:
+        """
+        Summary as a printable table, slowest builder first
+        """
+        rows = [
+            "%-20s %8s %10s %12s %10s"
+            % ("builder", "calls", "seconds", "bytes", "elements")
+        ]
+        summary = sorted(self.summary().items(), key=lambda i: -i[1]["seconds"])
+        for builder, t in summary:
+            rows.append(
+                "%-20s %8d %10.4f %12d %10d"
+                % (builder, t["calls"], t["seconds"], t["bytes"], t["elements"])
+            )
+        return "\n".join(rows)
+
+    def to_json(self, path: str = None) -> str:
+        """
+        Exports the summary and all records as json. Saved to path if a path is given
+        """
+        import json
+
+        data = json.dumps({"summary": self.summary(), "records": self.records})
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
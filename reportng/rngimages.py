@@ -0,0 +1,197 @@
+"""
+Image helpers for reportng. Images can be embedded as data URIs or copied
+into an asset folder, optionally with downscaled thumbnails. Thumbnails need
+Pillow (``pip install reportng[images]``).
+
+Work is cached by the sha256 of the image content, in memory for the running
+process and on disk in ``HelperFunctions.cache_dir()``, so the same screenshot
+used in many reports is only processed once.
+"""
+import base64
+import hashlib
+import mimetypes
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .rnghelpers import HelperFunctions
+
+#: Max number of encoded images kept in memory
+MEMORY_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_hashes: Dict[Tuple[str, int, int], str] = {}
+_encoded: Dict[tuple, str] = {}
+
+
+def is_local(path: str) -> bool:
+    """
+    Checks if an image path is a local file and not a url
+    """
+    return not path.startswith(("http://", "https://", "data:", "//"))
+
+
+def content_hash(path: str) -> str:
+    """
+    sha256 of a file, memoized by path, modification time and size
+    """
+    stat = Path(path).stat()
+    key = (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _lock:
+            _hashes[key] = digest
+    return digest
+
+
+def _resize(path: str, width: int) -> Tuple[bytes, str]:
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "Pillow is needed for thumbnails. Install it with pip install reportng[images]"
+        )
+    from io import BytesIO
+
+    with Image.open(path) as img:
+        fmt = img.format if img.format in ("JPEG", "PNG", "WEBP", "GIF") else "PNG"
+        if img.width > width:
+            img = img.resize(
+                (width, max(1, round(img.height * width / img.width))), Image.LANCZOS
+            )
+        out = BytesIO()
+        img.save(out, format=fmt)
+    return out.getvalue(), "." + fmt.lower().replace("jpeg", "jpg")
+
+
+def thumbnail(path: str, digest: str, width: int) -> Tuple[bytes, str]:
+    """
+    Downscaled copy of an image and its file extension. Cached on disk.
+    """
+    cache = HelperFunctions.cache_dir() / "images"
+    found = list(cache.glob("%s-%d.*" % (digest, width))) if cache.is_dir() else []
+    if found:
+        return found[0].read_bytes(), found[0].suffix
+    data, ext = _resize(path, width)
+    cache.mkdir(parents=True, exist_ok=True)
+    # write then rename so that parallel builds never read a partial file
+    tmp = cache / ("%s-%d%s.%d.tmp" % (digest, width, ext, threading.get_ident()))
+    tmp.write_bytes(data)
+    tmp.replace(cache / ("%s-%d%s" % (digest, width, ext)))
+    return data, ext
+
+
+def image_source(
+    path: str,
+    embed: str,
+    width: int = None,
+    asset_dir: str = None,
+    rel_path: str = "",
+) -> str:
+    """Encode a local image for a report
+
+    Args:
+        path (str): Path of the image
+        embed (str): datauri to embed the image, or copy to copy it into asset_dir
+        width (int, optional): Downscale to this width. Defaults to None.
+        asset_dir (str, optional): Folder to copy the image to. Defaults to None.
+        rel_path (str, optional): Relative path to asset_dir from the report. Defaults to "".
+
+    Returns:
+        str: The value for a src or href attribute
+    """
+    digest = content_hash(path)
+    key = (digest, width, embed, asset_dir, rel_path)
+    with _lock:
+        if key in _encoded:
+            return _encoded[key]
+
+    if width:
+        data, ext = thumbnail(path, digest, width)
+    else:
+        data, ext = None, Path(path).suffix.lower()
+
+    if embed == "datauri":
+        if data is None:
+            data = Path(path).read_bytes()
+        mime = mimetypes.guess_type("image" + ext)[0] or "application/octet-stream"
+        src = "data:%s;base64,%s" % (mime, base64.b64encode(data).decode("ascii"))
+    elif embed == "copy":
+        name = "%s-%d%s" % (digest, width, ext) if width else digest + ext
+        target = Path(asset_dir, name)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if data is None:
+                shutil.copyfile(path, str(target))
+            else:
+                target.write_bytes(data)
+        src = rel_path + name
+    else:
+        raise ValueError("embed should be datauri or copy")
+
+    with _lock:
+        if len(_encoded) >= MEMORY_CACHE_SIZE:
+            del _encoded[next(iter(_encoded))]
+        _encoded[key] = src
+    return src
+
+
+def prepare_images(
+    paths: List[str],
+    embed: str,
+    widths: List[int] = (),
+    asset_dir: str = None,
+    rel_path: str = "",
+    workers: int = None,
+    include_full: bool = True,
+) -> List[Dict[str, object]]:
+    """Encode many images in parallel. Every distinct image and width is only
+    processed once.
+
+    Args:
+        paths (List[str]): Image paths. Urls are passed through unchanged
+        embed (str): datauri or copy
+        widths (List[int], optional): Widths of the downscaled versions to make. Defaults to ().
+        asset_dir (str, optional): Folder to copy images to. Defaults to None.
+        rel_path (str, optional): Relative path to asset_dir from the report. Defaults to "".
+        workers (int, optional): Number of threads. Defaults to the ThreadPoolExecutor default.
+        include_full (bool, optional): Also encode the full size image. If False the path is used as is. Defaults to True.
+
+    Returns:
+        List[Dict[str, object]]: For every path, the full size image under "full" and a dictionary of width to downscaled image under "widths"
+    """
+    sizes = ((None,) if include_full else ()) + tuple(widths)
+    jobs = sorted(
+        {(p, w) for p in paths if is_local(p) for w in sizes},
+        key=lambda j: (j[0], j[1] or 0),
+    )
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = dict(
+            zip(
+                jobs,
+                pool.map(
+                    lambda j: image_source(j[0], embed, j[1], asset_dir, rel_path),
+                    jobs,
+                ),
+            )
+        )
+    images = []
+    for p in paths:
+        if not is_local(p):
+            images.append({"full": p, "widths": {}})
+        else:
+            images.append(
+                {
+                    "full": encoded[(p, None)] if include_full else p,
+                    "widths": {w: encoded[(p, w)] for w in widths},
+                }
+            )
+    return images
@@ -0,0 +1,244 @@
+"""
+Search across saved reports. Reports are split into their sections using the
+reportng section classes and stored in an SQLite FTS5 index, so that queries
+over many thousands of reports take milliseconds. Indexing is incremental,
+files are only parsed again when their size or modification time changed.
+"""
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from .rnghelpers import HelperFunctions
+
+# rowid of a section is the file id shifted by this, plus the section index
+_SECTION_BITS = 20
+
+_section_start = re.compile(
+    r'<div class="(?:[^"]*\breportng-(?:report-section|section-collapsible|table|'
+    r"captions|code-section|acsiinema|image-carousel|list-group|custom-html|chart|summary)-class\b"
+    r'[^"]*|jumbotron container context)"'
+)
+_section_end = re.compile(r'<footer class="[^"]*\breportng-footer-class\b|</body>')
+_div = re.compile(r"<(/?)div\b")
+_title = re.compile(r"<h1([^>]*)>(.*?)</h1>", re.S)
+_anchor = re.compile(r'\bid="([^"]*)"')
+_blocks = re.compile(r'<template id="reportng-block-(\w+)">(.*?)</template>', re.S)
+_block_refs = re.compile(r'data-reportng-block="(\w+)"')
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    title, body, anchor UNINDEXED, tokenize = 'unicode61'
+);
+"""
+
+
+def default_db() -> Path:
+    """
+    Location of the index when none is given
+    """
+    return HelperFunctions.cache_dir() / "search.db"
+
+
+def connect(db: str = None) -> sqlite3.Connection:
+    """Open the index, creating it if needed
+
+    Args:
+        db (str, optional): Path of the index. Defaults to default_db().
+
+    Raises:
+        RuntimeError: If the sqlite3 module does not support FTS5
+
+    Returns:
+        sqlite3.Connection: The connection
+    """
+    path = Path(db) if db else default_db()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(_schema)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError("SQLite with FTS5 is needed to search reports: %s" % e)
+    return conn
+
+
+def _element_end(html: str, start: int) -> int:
+    # end of the div that opens at start. Scripts, templates and modals that
+    # the report adds after its sections are not part of the last one
+    depth = 0
+    for m in _div.finditer(html, start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return html.index(">", m.end()) + 1
+    return len(html)
+
+
+def parse_report(html: str) -> List[Tuple[str, str, str]]:
+    """Split a saved report into its sections
+
+    Args:
+        html (str): The report
+
+    Returns:
+        List[Tuple[str, str, str]]: Anchor, title and text of every section
+    """
+    blocks = dict(_blocks.findall(html))
+    starts = [m.start() for m in _section_start.finditer(html)]
+    if not starts:
+        return []
+    end = _section_end.search(html, starts[-1])
+    starts.append(end.start() if end else _element_end(html, starts[-1]))
+    sections = []
+    for start, stop in zip(starts, starts[1:]):
+        chunk = _blocks.sub("", html[start:stop])
+        # deduplicated bodies are stored once at the end of the report
+        chunk += "".join(blocks.get(b, "") for b in _block_refs.findall(chunk))
+        anchor, title = "", ""
+        m = _title.search(chunk)
+        if m:
+            title = HelperFunctions.strip_tags(m.group(2))
+            a = _anchor.search(m.group(1))
+            anchor = a.group(1) if a else ""
+        sections.append((anchor, title, HelperFunctions.strip_tags(chunk)))
+    return sections
+
+
+def _report_files(paths: List[str]) -> Iterator[Path]:
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            yield from (f for f in p.rglob("*.html") if f.is_file())
+        elif p.is_file():
+            yield p
+
+
+def index(paths: List[str], db: str = None) -> Dict[str, float]:
+    """Add saved reports to the index. Unchanged files are skipped and files
+    that were removed from the given folders are dropped from the index.
+
+    Args:
+        paths (List[str]): Report files or folders to search for .html files
+        db (str, optional): Path of the index. Defaults to default_db().
+
+    Returns:
+        Dict[str, float]: Stats of the run
+    """
+    start = time.perf_counter()
+    stats = {"indexed": 0, "sections": 0, "unchanged": 0, "removed": 0}
+    conn = connect(db)
+    with conn:
+        known = {
+            path: (id_, mtime, size)
+            for id_, path, mtime, size in conn.execute(
+                "SELECT id, path, mtime_ns, size FROM files"
+            )
+        }
+        seen = set()
+        for f in _report_files(paths):
+            path = str(f.resolve())
+            seen.add(path)
+            st = f.stat()
+            old = known.get(path)
+            if old and old[1:] == (st.st_mtime_ns, st.st_size):
+                stats["unchanged"] += 1
+                continue
+            if old:
+                _delete_sections(conn, old[0])
+                conn.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (st.st_mtime_ns, st.st_size, old[0]),
+                )
+                file_id = old[0]
+            else:
+                file_id = conn.execute(
+                    "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (path, st.st_mtime_ns, st.st_size),
+                ).lastrowid
+            sections = parse_report(f.read_text(encoding="utf-8", errors="replace"))[
+                : 1 << _SECTION_BITS
+            ]
+            conn.executemany(
+                "INSERT INTO sections (rowid, title, body, anchor) VALUES (?, ?, ?, ?)",
+                (
+                    ((file_id << _SECTION_BITS) + i, title, body, anchor)
+                    for i, (anchor, title, body) in enumerate(sections)
+                ),
+            )
+            stats["indexed"] += 1
+            stats["sections"] += len(sections)
+        # files under the indexed folders that are gone
+        folders = tuple(
+            os.path.join(str(Path(p).resolve()), "") for p in paths if Path(p).is_dir()
+        )
+        for path, (file_id, _, _) in known.items():
+            if path not in seen and path.startswith(folders):
+                _delete_sections(conn, file_id)
+                conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                stats["removed"] += 1
+    conn.close()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _delete_sections(conn: sqlite3.Connection, file_id: int):
+    # a rowid range is a cheap delete in fts5
+    conn.execute(
+        "DELETE FROM sections WHERE rowid BETWEEN ? AND ?",
+        (file_id << _SECTION_BITS, ((file_id + 1) << _SECTION_BITS) - 1),
+    )
+
+
+def _phrase_query(query: str) -> str:
+    # every word is a quoted phrase, so that CVE-2021-44228 or paths work
+    # without knowing the fts5 query syntax
+    return " ".join('"%s"' % w.replace('"', '""') for w in query.split())
+
+
+def search(
+    query: str, db: str = None, limit: int = 20, raw: bool = False
+) -> List[Dict[str, str]]:
+    """Search the index
+
+    Args:
+        query (str): Words that all have to be in a section
+        db (str, optional): Path of the index. Defaults to default_db().
+        limit (int, optional): Max number of results. Defaults to 20.
+        raw (bool, optional): The query uses the FTS5 query syntax. Defaults to False.
+
+    Raises:
+        ValueError: If raw is set and the query is not valid FTS5 syntax
+
+    Returns:
+        List[Dict[str, str]]: The best matches with the keys path, anchor, title and snippet
+    """
+    if not raw:
+        query = _phrase_query(query)
+    if not query:
+        return []
+    conn = connect(db)
+    try:
+        rows = conn.execute(
+            "SELECT f.path, s.anchor, s.title, snippet(sections, 1, '[', ']', '...', 12) "
+            "FROM sections AS s JOIN files AS f ON f.id = (s.rowid >> ?) "
+            "WHERE sections MATCH ? ORDER BY rank LIMIT ?",
+            (_SECTION_BITS, query, limit),
+        ).fetchall()
+    except sqlite3.OperationalError as e:
+        if not raw:
+            raise
+        raise ValueError("%s is not a valid FTS5 query: %s" % (query, e))
+    finally:
+        conn.close()
+    return [
+        {"path": path, "anchor": anchor, "title": title, "snippet": snippet}
+        for path, anchor, title, snippet in rows
+    ]
@@ -0,0 +1,265 @@
+"""
+Local preview server for report specs, see ``reportng serve``. The spec and
+the files it uses are watched, and when they change only the sections whose
+inputs changed are built again. Open pages reload through server sent events.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from shutil import copyfileobj
+from socketserver import ThreadingMixIn
+from typing import Dict, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .rnghelpers import HelperFunctions
+
+#: Seconds between checks of the spec and the files it uses
+POLL_INTERVAL = 0.25
+#: Seconds between keep alive messages on the event stream
+HEARTBEAT = 15
+
+_EVENTS = "/__reportng/events"
+_ASSETS = "/__reportng/assets/"
+_RELOAD = (
+    "<script>new EventSource('%s').onmessage = function () {"
+    " location.reload(); };</script>" % _EVENTS
+)
+
+
+class ReportServer(ThreadingMixIn, HTTPServer):
+    """Serves the report of a spec file and rebuilds it when it changes.
+    Other paths are served from the root folder, so that images and files
+    used by the spec work.
+
+    Args:
+        spec (str): Path of a JSON, YAML or JSONL spec file
+        address (Tuple[str, int]): Host and port to listen on
+        index (int, optional): Spec to serve when the file has many. Defaults to 0.
+        root (str, optional): Folder of other files. Defaults to the working directory.
+        local_assets (bool, optional): Serve the javascript and css from the reportng cache instead of the CDNs. Defaults to False.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        spec: str,
+        address: Tuple[str, int] = ("127.0.0.1", 8000),
+        index: int = 0,
+        root: str = None,
+        local_assets: bool = False,
+    ):
+        super().__init__(address, _Handler)
+        self.spec = Path(spec)
+        self.index = index
+        self.root = Path(root or os.getcwd()).resolve()
+        self.assets = HelperFunctions.cache_dir() / "assets"
+        self.local_assets = local_assets
+        #: Number of the current build
+        self.version = 0
+        self.html = b""
+        #: Hash of the html, used as the ETag of the report. Unlike the
+        #: version it does not start over when the server is restarted
+        self.etag = '""'
+        self._cache = {}
+        self._files = ()
+        self._changed = threading.Condition()
+        self._closed = False
+
+    def build(self) -> Dict[str, float]:
+        """Build the report again. Sections whose spec and files did not
+        change are reused from the last build.
+
+        Raises:
+            SpecError: If the spec is not valid
+
+        Returns:
+            Dict[str, float]: Stats of the build
+        """
+        from .cli import build_report, iter_specs, spec_files
+        from .core import Assets
+
+        start = time.perf_counter()
+        specs = [spec for _, _, spec in iter_specs([str(self.spec)])]
+        spec = specs[self.index]
+        old = set(self._cache)
+        report = build_report(spec, cache=self._cache)
+        html = report.report
+        if self.local_assets:
+            try:
+                html = Assets.localize(html, str(self.assets), _ASSETS)
+            except Exception as e:
+                logging.warning("Could not cache the assets: %s" % e)
+        with self._changed:
+            self.html = (html + _RELOAD).encode("utf-8")
+            self.etag = '"%s"' % hashlib.sha1(self.html).hexdigest()[:16]
+            self._files = tuple(sorted(set(spec_files(spec.get("sections", [])))))
+            self.version += 1
+            self._changed.notify_all()
+        return {
+            "sections": len(spec.get("sections", [])),
+            "rebuilt": len(set(self._cache) - old),
+            "seconds": time.perf_counter() - start,
+        }
+
+    def _inputs(self) -> tuple:
+        # stat of the spec and of the files used by the last build
+        inputs = []
+        for path in (str(self.spec),) + self._files:
+            try:
+                st = os.stat(path)
+                inputs.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                inputs.append((path, None, None))
+        return tuple(inputs)
+
+    def watch(self):
+        """
+        Build the report again whenever the spec or a file it uses changes.
+        Runs until the server is closed.
+        """
+        inputs = self._inputs()
+        while not self._closed:
+            time.sleep(POLL_INTERVAL)
+            current = self._inputs()
+            if current == inputs:
+                continue
+            inputs = current
+            try:
+                stats = self.build()
+            except Exception as e:
+                # the last good build is still served
+                logging.error("Rebuild failed: %s: %s" % (type(e).__name__, e))
+                continue
+            # the new build may use other files
+            inputs = self._inputs()
+            print(
+                "Rebuilt %d of %d sections in %.0fms"
+                % (stats["rebuilt"], stats["sections"], stats["seconds"] * 1000)
+            )
+
+    def wait(self, version: int, timeout: float = None) -> int:
+        """
+        Wait for a build newer than version, or until the timeout. Returns the
+        current version.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.version != version or self._closed, timeout
+            )
+            return self.version
+
+    def serve(self):
+        """
+        Build the report, watch for changes and handle requests until
+        interrupted
+        """
+        self.build()
+        threading.Thread(target=self.watch, daemon=True).start()
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+
+    def server_close(self):
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        super().server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ReportServer
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path in ("/", "/index.html"):
+            self._send_report()
+        elif path == _EVENTS:
+            self._send_events()
+        elif path.startswith(_ASSETS):
+            # asset names hold the version from the CDN url
+            self._send_file(
+                self.server.assets,
+                path[len(_ASSETS) :],
+                "public, max-age=31536000, immutable",
+            )
+        else:
+            self._send_file(self.server.root, path.lstrip("/"), "no-cache")
+
+    def _send_report(self):
+        with self.server._changed:
+            body, etag = self.server.html, self.server.etag
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self):
+        # taken before the headers, so that no build is missed once they are sent
+        version = self.server.version
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while not self.server._closed:
+                current = self.server.wait(version, HEARTBEAT)
+                if current != version:
+                    version = current
+                    self.wfile.write(b"data: %d\n\n" % version)
+                else:
+                    self.wfile.write(b": keep alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_file(self, folder: Path, name: str, cache_control: str):
+        path = (folder / name).resolve()
+        try:
+            # nothing outside of the folder is served
+            path.relative_to(folder)
+            st = path.stat()
+        except (ValueError, OSError):
+            self.send_error(404)
+            return
+        if not path.is_file():
+            self.send_error(404)
+            return
+        etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            mimetypes.guess_type(str(path))[0] or "application/octet-stream",
+        )
+        self.send_header("Content-Length", str(st.st_size))
+        self.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        with open(str(path), "rb") as f:
+            copyfileobj(f, self.wfile)
+
+    def log_message(self, format: str, *args):
+        logging.debug("%s - %s" % (self.address_string(), format % args))
@@ -0,0 +1,226 @@
+"""
+Summary statistics of large numeric data in one pass. Data is read a chunk at
+a time, so arrays, lists and iterators that do not fit in memory all work.
+Count, mean, standard deviation, min and max are exact. Percentiles and the
+histogram come from a histogram of ``BINS`` bins that grows with the range of
+the data by doubling the width of its bins, so percentiles are within
+2 * range / ``BINS`` of the exact value.
+Chunks are vectorized with numpy when it is installed.
+"""
+from bisect import bisect_left
+from itertools import accumulate, chain, islice
+from math import isfinite
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#: Values read at a time
+CHUNK_SIZE = 1 << 20
+#: Bins of the histogram used for percentiles. Must be even
+BINS = 1 << 14
+
+
+def _is_array(values) -> bool:
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def chunks(data) -> Iterable[Sequence[float]]:
+    """
+    The data a chunk at a time. Arrays and lists are sliced, and iterators can
+    yield numbers or chunks of numbers, like arrays read from a file.
+    """
+    if _is_array(data):
+        data = data.ravel()
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start : start + CHUNK_SIZE]
+        return
+    if isinstance(data, (list, tuple, range)):
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start : start + CHUNK_SIZE]
+        return
+    data = iter(data)
+    for first in data:
+        if _is_array(first) or isinstance(first, (list, tuple)):
+            yield first
+            yield from data
+            return
+        data = chain([first], data)
+        break
+    while True:
+        chunk = list(islice(data, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Summary:
+    """
+    Statistics of numbers, updated a chunk at a time with ``add``
+    """
+
+    def __init__(self):
+        self.count = 0
+        #: Values that are nan or infinite, which are not counted
+        self.missing = 0
+        self.mean = 0.0
+        self.min = self.max = None
+        self._m2 = 0.0
+        self._lo = self._width = None
+        self._bins = np.zeros(BINS, np.int64) if np is not None else [0] * BINS
+
+    def add(self, chunk: Sequence[float]) -> "Summary":
+        """Add a chunk of numbers
+
+        Args:
+            chunk (Sequence[float]): The numbers
+
+        Returns:
+            Summary: The Summary object
+        """
+        if np is not None:
+            values = np.asarray(chunk, np.float64).ravel()
+            keep = np.isfinite(values)
+            finite = values if keep.all() else values[keep]
+            self.missing += len(values) - len(finite)
+            if not len(finite):
+                return self
+            lo, hi = float(finite.min()), float(finite.max())
+            n, mean = len(finite), float(finite.mean())
+            deviation = finite - mean
+            m2 = float(deviation @ deviation)
+        else:
+            finite = [float(v) for v in chunk]
+            count = len(finite)
+            finite = [v for v in finite if isfinite(v)]
+            self.missing += count - len(finite)
+            if not finite:
+                return self
+            lo, hi = min(finite), max(finite)
+            n, mean = len(finite), sum(finite) / len(finite)
+            m2 = sum((v - mean) ** 2 for v in finite)
+        # mean and variance of the chunks are combined, see Chan et al.
+        total = self.count + n
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        self._grow(lo, hi)
+        if np is not None:
+            # the deviation buffer is reused for the bin positions
+            np.subtract(finite, self._lo, out=deviation)
+            deviation /= self._width
+            index = deviation.astype(np.intp)
+            np.clip(index, 0, BINS - 1, out=index)
+            self._bins += np.bincount(index, minlength=BINS)
+        else:
+            for v in finite:
+                self._bins[
+                    min(BINS - 1, max(0, int((v - self._lo) / self._width)))
+                ] += 1
+        return self
+
+    def _grow(self, lo: float, hi: float):
+        # the bins cover [_lo, _lo + BINS * _width). To cover more, pairs of
+        # bins are merged, which doubles the width and keeps every count
+        if self._lo is None:
+            self._lo = lo
+            self._width = (hi - lo) / BINS or max(abs(lo), 1.0) / BINS
+            # the max falls in the last bin and not after it
+            self._width *= 1 + 1e-9
+        while lo < self._lo or hi >= self._lo + BINS * self._width:
+            half = BINS // 2
+            if np is not None:
+                merged = self._bins.reshape(half, 2).sum(1)
+                self._bins = np.zeros(BINS, np.int64)
+            else:
+                merged = [a + b for a, b in zip(self._bins[::2], self._bins[1::2])]
+                self._bins = [0] * BINS
+            self._width *= 2
+            if lo < self._lo:
+                self._bins[half:] = merged
+                self._lo -= half * self._width
+            else:
+                self._bins[:half] = merged
+
+    @property
+    def std(self) -> float:
+        """
+        Population standard deviation
+        """
+        return (self._m2 / self.count) ** 0.5 if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Percentile interpolated within its bin
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: The value, or nan without data
+        """
+        if not self.count:
+            return float("nan")
+        cumulative = list(accumulate(int(c) for c in self._bins))
+        target = self.count * q / 100
+        i = min(bisect_left(cumulative, target), BINS - 1)
+        before = cumulative[i - 1] if i else 0
+        inside = (target - before) / self._bins[i] if self._bins[i] else 0.0
+        value = self._lo + (i + inside) * self._width
+        return min(self.max, max(self.min, value))
+
+    def histogram(self, bins: int = 30) -> Tuple[List[float], List[int]]:
+        """Histogram between min and max. Edges fall on the bins used for
+        percentiles, so the counts are exact.
+
+        Args:
+            bins (int, optional): Number of bins at most. Defaults to 30.
+
+        Returns:
+            Tuple[List[float], List[int]]: bins + 1 edges and the count of every bin
+        """
+        if not self.count:
+            return [], []
+        first = int((self.min - self._lo) / self._width)
+        last = min(BINS - 1, int((self.max - self._lo) / self._width))
+        fine = last - first + 1
+        bins = min(bins, fine)
+        starts = [first + fine * i // bins for i in range(bins)] + [last + 1]
+        counts = [int(sum(self._bins[a:b])) for a, b in zip(starts, starts[1:])]
+        edges = [self._lo + s * self._width for s in starts]
+        edges[0], edges[-1] = self.min, self.max
+        return edges, counts
+
+
+def describe(
+    data, percentiles: Sequence[float] = (25, 50, 75, 90, 99), bins: int = 30
+) -> Dict[str, object]:
+    """Statistics of numbers in one pass
+
+    Args:
+        data: A numpy array, a sequence of numbers, or an iterable of numbers or of chunks of numbers
+        percentiles (Sequence[float], optional): Percentiles to compute. Defaults to (25, 50, 75, 90, 99).
+        bins (int, optional): Bins of the histogram. Defaults to 30.
+
+    Returns:
+        Dict[str, object]: count, missing, mean, std, min, max, a pN key per percentile and the histogram edges and counts
+    """
+    s = Summary()
+    for chunk in chunks(data):
+        s.add(chunk)
+    stats = {
+        "count": s.count,
+        "missing": s.missing,
+        "mean": s.mean if s.count else float("nan"),
+        "std": s.std,
+        "min": s.min,
+        "max": s.max,
+    }
+    for q in percentiles:
+        stats["p%g" % q] = s.percentile(q)
+    stats["edges"], stats["counts"] = s.histogram(bins)
+    return stats
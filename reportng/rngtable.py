@@ -0,0 +1,171 @@
+"""
+Helpers for large tables.
+
+Column indexes make tables sortable and filterable. Sorting and filtering is
+done when the report is built: every column gets a dictionary of its distinct
+values in sort order, the rank of every row in it, and the row permutation
+that sorts it. The arrays are embedded as base64 typed arrays, so the browser
+only has to reorder rows.
+
+Exports write the rows of a table to CSV or JSON while the table is rendered,
+into a sidecar file or a gzip blob that is embedded in the report.
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+from array import array
+from base64 import b64encode
+from typing import Dict, List, Sequence, Union
+
+
+def _sort_key(value: str) -> tuple:
+    # numbers sort by value and before text, text sorts case insensitive.
+    # The value itself breaks ties, so that the order does not depend on sets
+    try:
+        number = float(value)
+    except ValueError:
+        return (1, 0.0, value.casefold(), value)
+    if number != number:
+        # nan does not compare
+        return (1, 0.0, value.casefold(), value)
+    return (0, number, "", value)
+
+
+def encode(values: Sequence[int], typecode: str) -> str:
+    """
+    Base64 of unsigned integers as a little endian typed array
+    """
+    a = array(typecode, values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return b64encode(a.tobytes()).decode("ascii")
+
+
+def _typecode(size: int) -> str:
+    if size <= 0xFFFF:
+        return "H"
+    # I is 4 bytes on all platforms python supports, L is 8 on some
+    return "I" if array("I").itemsize == 4 else "L"
+
+
+def column_index(
+    columns: List[Sequence[str]], sortable: bool = True, filterable: bool = True
+) -> Dict[str, object]:
+    """Build the index of a table
+
+    Args:
+        columns (List[Sequence[str]]): The cells of every column, not escaped
+        sortable (bool, optional): Add the sort permutations. Defaults to True.
+        filterable (bool, optional): Add the value dictionaries. Defaults to True.
+
+    Returns:
+        Dict[str, object]: The index, to be embedded as JSON
+    """
+    rows = len(columns[0]) if columns else 0
+    typecode = _typecode(rows)
+    index = {"rows": rows, "bytes": 2 if typecode == "H" else 4, "columns": []}
+    for column in columns:
+        # distinct values are sorted once, rows are then ranked by a lookup
+        values = sorted(set(column), key=_sort_key)
+        rank = {v: i for i, v in enumerate(values)}
+        ranks = [rank[v] for v in column]
+        entry = {}
+        if sortable:
+            entry["order"] = encode(
+                sorted(range(rows), key=ranks.__getitem__), typecode
+            )
+        if filterable:
+            entry["values"] = [v.lower() for v in values]
+            entry["ranks"] = encode(ranks, _typecode(len(values)))
+            entry["bytes"] = 2 if _typecode(len(values)) == "H" else 4
+        index["columns"].append(entry)
+    return index
+
+
+def index_script(table_id: str, index: Dict[str, object]) -> str:
+    """
+    The index as a JSON script tag that the table script reads
+    """
+    return '<script type="application/json" data-reportng-table="%s">%s</script>' % (
+        table_id,
+        json.dumps(index, separators=(",", ":")).replace("<", "\\u003c"),
+    )
+
+
+class Export:
+    """Writes table rows to CSV or JSON one at a time. Closes the file at the
+    end of a with block.
+
+    Args:
+        fmt (str): csv or json. JSON is a list of objects keyed by the header
+        header (List[str]): The table header
+        path (str, optional): File to write. Gzip compressed if it ends with .gz. Defaults to None, which compresses into memory for embedding.
+    """
+
+    def __init__(self, fmt: str, header: List[str], path: str = None):
+        if fmt not in ("csv", "json"):
+            raise ValueError("%s is not a valid export format, use csv or json" % fmt)
+        self.fmt = fmt
+        self.header = [str(h) for h in header]
+        self.path = path
+        self._buffer = None
+        if path is None:
+            self._buffer = io.BytesIO()
+            # mtime 0 so the same rows give the same report
+            self._file = io.TextIOWrapper(
+                gzip.GzipFile(mode="wb", fileobj=self._buffer, mtime=0),
+                encoding="utf-8",
+                newline="",
+            )
+        elif str(path).endswith(".gz"):
+            self._file = gzip.open(str(path), "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(str(path), "w", encoding="utf-8", newline="")
+        self.rows = 0
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.header)
+        else:
+            self._file.write("[")
+
+    def write(self, row: Sequence):
+        """
+        Write a row
+        """
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            self._file.write(
+                ("\n" if self.rows == 0 else ",\n")
+                + json.dumps(dict(zip(self.header, row)), default=str)
+            )
+        self.rows += 1
+
+    def close(self) -> Union[bytes, None]:
+        """Finish the file. Closing it again does nothing.
+
+        Returns:
+            Union[bytes, None]: The gzip compressed rows when no path was given
+        """
+        if not self._file.closed:
+            try:
+                if self.fmt == "json":
+                    self._file.write("\n]\n")
+            finally:
+                self._file.close()
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        return None
+
+    def __enter__(self) -> "Export":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def mime(self) -> str:
+        return "text/csv" if self.fmt == "csv" else "application/json"
@@ -1,4 +1,9 @@
-from typing_extensions import TypedDict, Literal
+from typing import NamedTuple
+
+try:
+    from typing import Literal, TypedDict
+except ImportError:  # python < 3.8
+    from typing_extensions import Literal, TypedDict
 
 
 class ImageCarouselType(TypedDict):
@@ -50,3 +55,22 @@ class Cards(TypedDict):
     ]
     title: str
     message: str
+
+
+class Budget(TypedDict, total=False):
+    max_total_bytes: int
+    max_section_bytes: int
+    max_table_rows: int
+    max_elements: int
+    max_carousel_images: int
+
+
+class Section(NamedTuple):
+    builder: str
+    title: str
+    anchor: str
+    html: str
+    attached: bool
+    meta: dict
+    # tier, sort key and sequence number, see Reportng.ordered
+    order: tuple = ()
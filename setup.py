@@ -1,5 +1,4 @@
-from distutils.core import setup
-from setuptools import find_packages
+from setuptools import setup, find_packages
 
 with open('reportng/__version__.py', 'r') as f:
     exec(f.read())
@@ -21,5 +20,11 @@ setup(
         "Programming Language :: Python :: Implementation :: PyPy",
         "Natural Language :: English",
     ],
-    install_requires=["dominate==2.4.0", "requests", "typing_extensions"],
+    install_requires=[
+        "dominate==2.4.0",
+        "requests",
+        "typing_extensions; python_version < '3.8'",
+    ],
+    extras_require={"yaml": ["pyyaml"], "images": ["pillow"], "charts": ["numpy"]},
+    entry_points={"console_scripts": ["reportng=reportng.cli:main"]},
 )
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from reportng import Reportng, rngasciinema
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTNG_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(rngasciinema, "_urls", None)
+
+
+def test_resolve_cached(tmp_path, monkeypatch):
+    calls = []
+
+    def fetch(link, timeout):
+        calls.append(link)
+        return "https://cdn.example/%s.json" % link[-1]
+
+    monkeypatch.setattr(rngasciinema, "_fetch", fetch)
+    links = ["https://asciinema.org/a/%d" % i for i in range(5)]
+    urls = rngasciinema.resolve_many(links + links[:2])
+    assert sorted(calls) == links
+    assert urls[links[3]] == "https://cdn.example/3.json"
+
+    # a new process only reads the cache file
+    monkeypatch.setattr(rngasciinema, "_urls", None)
+    assert rngasciinema.resolve(links[1]) == "https://cdn.example/1.json"
+    assert len(calls) == 5
+    cached = json.loads((tmp_path / "cache" / "asciinema.json").read_text())
+    assert len(cached) == 5
+
+
+def test_offline(monkeypatch):
+    def fetch(link, timeout):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(rngasciinema, "_fetch", fetch)
+    r = Reportng(report_name="asciinema", brand="test", use_asciinema=True)
+    r.asciinema("https://asciinema.org/a/1", title="offline")
+    assert 'src="https://asciinema.org/a/1.json"' in r.report
+
+
+def test_failed_fetch_is_not_cached(tmp_path, monkeypatch):
+    import requests
+
+    class NotFound:
+        url = "https://asciinema.org/a/2.json"
+
+        def raise_for_status(self):
+            raise requests.HTTPError("404 Client Error")
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: NotFound())
+    link = "https://asciinema.org/a/2"
+    assert rngasciinema.resolve(link) == link + ".json"
+    assert not (tmp_path / "cache" / "asciinema.json").exists()
+    assert link not in rngasciinema._urls
+
+
+def test_cast_file(tmp_path):
+    cast = tmp_path / "demo.cast"
+    cast.write_text('{"version": 2, "width": 80, "height": 24}\n[0.1, "o", "hi"]\n')
+    r = Reportng(report_name="asciinema", brand="test", use_asciinema=True)
+    r.asciinema(str(cast), title="local")
+    r.asciinema(str(cast), title="compressed", compress_cast=True)
+    assert 'src="data:application/json;base64,' in r.report
+    assert 'class="reportng-asciinema-cast" data-cast="' in r.report
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import math
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from reportng import Reportng, rngchart
+
+n = 20000
+x = [float(i) for i in range(n)]
+y = [math.sin(i / 500) for i in range(n)]
+y[12345] = 50.0
+y[777] = float("nan")
+
+
+@pytest.fixture(params=["python", "numpy"])
+def arrays(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(rngchart, "np", None)
+        return x, y
+    np = pytest.importorskip("numpy")
+    return np.array(x), np.array(y)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_keeps_shape(arrays, method):
+    xs, ys = rngchart.downsample(*arrays, points=500, method=method)
+    assert len(ys) <= 502
+    # the ends and the spike are kept, nan is dropped
+    assert xs[0] == 0 and xs[-1] == n - 1
+    assert max(ys) == 50.0 and xs[list(ys).index(50.0)] == 12345
+    assert not any(math.isnan(v) for v in ys)
+    assert list(xs) == sorted(xs)
+
+
+def test_downsample_short_and_invalid(arrays):
+    assert rngchart.downsample([0.0, 1.0], [1.0, 2.0], 10) == ([0.0, 1.0], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        rngchart.downsample(x, y, 10, method="mean")
+    with pytest.raises(ValueError):
+        rngchart.downsample(*arrays, points=2)
+    with pytest.raises(ValueError):
+        Reportng(report_name="chart", brand="test").chart("few", None, y, max_points=2)
+
+
+def test_chart_size_is_bounded():
+    c = Reportng(report_name="chart", brand="test")
+    c.chart("small", None, y[:2000], max_points=300)
+    c.chart("large", None, y * 5, max_points=300)
+    small, large = c._sections
+    assert large.meta["points"] <= 300
+    assert abs(len(large.html) - len(small.html)) < len(small.html) * 0.2
+    assert 'class="text-primary"' in large.html and "<svg" in large.html
+
+
+def test_chart_series_and_dates():
+    c = Reportng(report_name="chart", brand="test")
+    start = datetime(2024, 1, 1)
+    times = [start + timedelta(minutes=i) for i in range(100)]
+    c.chart(
+        "latency <ms>",
+        times,
+        {"p50": range(100), "p99": [i * 2 for i in range(100)]},
+        colors=["green", "red"],
+    )
+    html = c._sections[0].html
+    assert "2024-01-01 00:00" in html
+    assert 'class="text-success"' in html and 'class="text-danger"' in html
+    assert "latency &lt;ms&gt;" in html
+    with pytest.raises(ValueError):
+        c.chart("bad", [1, 2], [1, 2, 3])
+
+
+def test_chart_dates_are_utc(monkeypatch):
+    np = pytest.importorskip("numpy")
+    if hasattr(time, "tzset"):
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+    try:
+        c = Reportng(report_name="chart", brand="test")
+        times = np.arange("2024-01-01T00:00", "2024-01-01T01:40", dtype="datetime64[m]")
+        c.chart("numpy", times, range(100))
+        c.chart(
+            "naive",
+            [datetime(2024, 1, 1) + timedelta(minutes=i) for i in range(100)],
+            range(100),
+        )
+    finally:
+        monkeypatch.undo()
+        if hasattr(time, "tzset"):
+            time.tzset()
+    assert "2024-01-01 00:00" in c._sections[0].html
+    assert "2024-01-01 00:00" in c._sections[1].html
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import json
+from pathlib import Path
+
+from reportng import cli
+
+spec = {
+    "report_name": "cli",
+    "brand": "test",
+    "options": {"show_progress_bar": False},
+    "sections": [
+        {"type": "section", "title": "title", "content": "some content"},
+        {"type": "table", "table_header": ["a", "b"], "data": [["1", "2"]]},
+        {"type": "footer", "message": "message"},
+    ],
+}
+
+
+def test_build_json(tmp_path):
+    spec_file = tmp_path / "report.json"
+    spec_file.write_text(json.dumps(spec))
+    assert cli.main(["build", str(spec_file), "-o", str(tmp_path), "-w", "1"]) == 0
+    assert "some content" in (tmp_path / "report.html").read_text()
+
+
+def test_build_jsonl_pool(tmp_path):
+    spec_file = tmp_path / "reports.jsonl"
+    spec_file.write_text("\n".join(json.dumps(spec) for _ in range(4)))
+    stats = cli.build([str(spec_file)], output_dir=str(tmp_path), workers=2)
+    assert stats["reports"] == 4
+    assert stats["failed"] == 0
+    assert (tmp_path / "reports-3.html").exists()
+
+
+def test_bounded_map(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    read = []
+
+    def jobs():
+        for i in range(1000):
+            read.append(i)
+            yield i
+
+    monkeypatch.setattr(cli, "_render", lambda job: (str(job), job, ""))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = cli._bounded_map(pool, jobs(), chunksize=4, window=3)
+        assert next(results) == ("0", 0, "")
+        # only the batches in the window are read from the stream
+        assert len(read) == 12
+        assert [size for _, size, _ in results] == list(range(1, 1000))
+
+
+def test_build_invalid_type(tmp_path):
+    spec_file = tmp_path / "bad.json"
+    spec_file.write_text(
+        json.dumps(dict(spec, sections=[{"type": "save", "path": "x"}]))
+    )
+    assert cli.main(["build", str(spec_file), "-o", str(tmp_path), "-w", "1"]) == 1
+    assert not Path(tmp_path / "bad.html").exists()
+
+
+def test_build_report_cache(tmp_path):
+    log = tmp_path / "out.log"
+    log.write_text("first run\n")
+    cached = dict(
+        spec,
+        sections=spec["sections"]
+        + [{"type": "section_from_file", "path": str(log), "title": "log"}],
+    )
+    cache = {}
+    first = cli.build_report(cached, cache=cache).report
+    assert len(cache) == 4
+    second = cli.build_report(cached, cache=cache).report
+    # reused sections keep their anchors, so the reports are the same
+    assert first == second
+    log.write_text("second run\n")
+    changed = cli.build_report(cached, cache=cache)
+    assert "second run" in changed.report
+    assert [s.anchor for s in changed._sections[:3]] == [
+        s.anchor for s in cli.build_report(cached, cache=cache)._sections[:3]
+    ]
+
+
+def test_serve(tmp_path):
+    from threading import Thread
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+    from reportng.rngserve import ReportServer
+
+    spec_file = tmp_path / "report.json"
+    spec_file.write_text(json.dumps(spec))
+    (tmp_path / "image.png").write_bytes(b"png")
+    server = ReportServer(str(spec_file), ("127.0.0.1", 0), root=str(tmp_path))
+    server.build()
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%d" % server.server_address[1]
+    try:
+        with urlopen(url + "/") as r:
+            etag = r.headers["ETag"]
+            assert "some content" in r.read().decode()
+        try:
+            urlopen(Request(url + "/", headers={"If-None-Match": etag}))
+            assert False
+        except HTTPError as e:
+            assert e.code == 304
+        with urlopen(url + "/image.png") as r:
+            assert r.read() == b"png"
+        try:
+            urlopen(url + "/../report.json")
+            assert False
+        except HTTPError as e:
+            assert e.code == 404
+
+        events = urlopen(url + "/__reportng/events")
+        spec_file.write_text(json.dumps(dict(spec, report_name="changed")))
+        stats = server.build()
+        assert stats["rebuilt"] == 0
+        assert events.readline() == b"data: 2\n"
+        events.close()
+        with urlopen(Request(url + "/", headers={"If-None-Match": etag})) as r:
+            assert "changed" in r.read().decode()
+            assert r.headers["ETag"] not in (etag, '"2"')
+    finally:
+        server.shutdown()
+        server.server_close()
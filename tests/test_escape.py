@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from dominate.util import escape as dominate_escape
+
+from reportng import Reportng, rngescape
+
+texts = ["", "safe", 'a <b> & "c"', "\x00<\x00", "아름다운 & 你好"]
+
+
+def test_escape_matches_dominate(monkeypatch):
+    monkeypatch.setattr(rngescape, "CHUNK_SIZE", 4)
+    for text in texts:
+        assert rngescape.escape(text) == dominate_escape(text)
+        assert rngescape.escape(text, quote=False) == dominate_escape(text, False)
+
+
+def test_escape_many(monkeypatch):
+    assert list(rngescape.escape_many(texts)) == [dominate_escape(t) for t in texts]
+    assert list(rngescape.escape_many([1, "<"])) == ["1", "&lt;"]
+    assert list(rngescape.escape_many([])) == []
+    # strings are escaped a batch at a time, as they are needed
+    monkeypatch.setattr(rngescape, "BATCH_SIZE", 8)
+    read = []
+    escaped = rngescape.escape_many(read.append(t) or t for t in texts * 3)
+    assert next(escaped) == ""
+    assert len(read) < len(texts * 3)
+    assert [""] + list(escaped) == [dominate_escape(t) for t in texts * 3]
+
+
+def test_builders_escape_once():
+    r = Reportng(report_name="escape", brand="test")
+    r.section("section", "<b>&amp;</b>").table(
+        ["a", "b"], [["<i>", 1]], show_index=True
+    )
+    html = r.report
+    assert "&lt;b&gt;&amp;amp;&lt;/b&gt;" in html
+    assert "<tr><td>1</td><td>&lt;i&gt;</td><td>1</td></tr>" in html
+
+
+def test_builders_match_dominate():
+    # builders escape text like dominate did before they used rngescape
+    text = 'a <b> & "c"'
+    r = Reportng(report_name="escape", brand="test")
+    r.table([text, 2], [["x", "y"]])
+    r.list_group("list", [text, 3])
+    r.cards([{"title": text, "message": 4, "color": "info"}])
+    r.footer(message=text)
+    html = r.report
+    assert html.count(dominate_escape(text)) == 4
+    assert '<th scope="col">2</th>' in html
+    assert ">3</li>" in html and ">4</p>" in html
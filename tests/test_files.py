@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from reportng import Reportng, rngfiles
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(
+        "".join(
+            "line %d <%s>\n" % (i, "error" if i % 10 == 0 else "ok")
+            for i in range(1, 101)
+        ),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def lines(text):
+    return text.splitlines()
+
+
+def test_head_tail_range(log):
+    assert lines(rngfiles.read_escaped(log, head=2)[0]) == [
+        "line 1 &lt;ok&gt;",
+        "line 2 &lt;ok&gt;",
+    ]
+    assert lines(rngfiles.read_escaped(log, tail=2)[0]) == [
+        "line 99 &lt;ok&gt;",
+        "line 100 &lt;error&gt;",
+    ]
+    assert len(lines(rngfiles.read_escaped(log, line_range=(5, 9))[0])) == 5
+    assert (
+        lines(rngfiles.read_escaped(log, line_range=(5, 9))[0])[0]
+        == "line 5 &lt;ok&gt;"
+    )
+
+
+def test_pattern(log):
+    text, _ = rngfiles.read_escaped(log, tail=20, pattern="error")
+    assert lines(text) == ["line 90 &lt;error&gt;", "line 100 &lt;error&gt;"]
+
+
+def test_small_chunks(log, monkeypatch):
+    monkeypatch.setattr(rngfiles, "CHUNK_SIZE", 3)
+    text, size = rngfiles.read_escaped(log)
+    assert size == len(open(log, "rb").read())
+    assert len(lines(text)) == 100
+
+
+def test_section_from_file(log, tmp_path):
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    r = Reportng(report_name="files", brand="test")
+    r.section_from_file(log, tail=5, pattern="error").section_from_file(str(empty))
+    assert "line 100 &lt;error&gt;" in r.report
+    assert "line 99" not in r.report
+    assert "reportng-file-" not in r.report
+    with pytest.raises(TypeError):
+        r.section_from_file(log, head=1, tail=1)
+
+
+def test_section_from_file_capped(log, monkeypatch):
+    monkeypatch.setattr(rngfiles, "MAX_BYTES", 20)
+    r = Reportng(report_name="files", brand="test")
+    r.section_from_file(log).section_from_file(log, max_bytes=40)
+    r.section_from_file(log, pattern="error")
+    capped, larger, matched = r._sections
+    assert capped.meta["bytes_read"] == 20 and larger.meta["bytes_read"] == 40
+    assert "line 100 &lt;error&gt;" in matched.html
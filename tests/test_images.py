@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from reportng import Assets, Reportng, rngimages
+from reportng import rnghelpers as rng
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTNG_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def make_png(path, width=400, height=300):
+    Image = pytest.importorskip("PIL.Image")
+    Image.new("RGB", (width, height), "red").save(str(path))
+    return str(path)
+
+
+def test_datauri(tmp_path):
+    image = tmp_path / "a.png"
+    image.write_bytes(b"not really a png")
+    r = Reportng(report_name="images", brand="test")
+    r.image_carousel([{"path": str(image), "caption": ""}], embed="datauri")
+    assert 'src="data:image/png;base64,' in r.report
+    assert str(image) not in r.report
+
+
+def test_copy_thumbnails(tmp_path):
+    image = make_png(tmp_path / "a.png")
+    r = Reportng(report_name="images", brand="test")
+    r.image_carousel(
+        [{"path": image, "caption": "a"}, {"path": image, "caption": "b"}],
+        embed="copy",
+        thumbnail_width=100,
+        asset_dir=str(tmp_path / "assets"),
+        rel_path="assets/",
+    )
+    digest = rngimages.content_hash(image)
+    assert sorted(p.name for p in (tmp_path / "assets").iterdir()) == [
+        "%s-100.png" % digest,
+        "%s.png" % digest,
+    ]
+    assert 'href="assets/%s.png"' % digest in r.report
+
+
+def test_thumbnail_cache(tmp_path, monkeypatch):
+    image = make_png(tmp_path / "a.png")
+    rngimages.prepare_images([image], "datauri", widths=[50])
+
+    def fail(*args):
+        raise AssertionError("thumbnail should come from the cache")
+
+    monkeypatch.setattr(rngimages, "_resize", fail)
+    rngimages._encoded.clear()
+    assert rngimages.prepare_images([image], "datauri", widths=[50])[0]["widths"][50]
+
+
+def test_lazy_srcset(tmp_path):
+    image = make_png(tmp_path / "a.png", width=1000)
+    r = Reportng(report_name="images", brand="test")
+    r.image_carousel(
+        [{"path": image, "caption": ""}, {"path": image, "caption": ""}],
+        embed="copy",
+        asset_dir=str(tmp_path / "assets"),
+        rel_path="assets/",
+        srcset_widths=[200, 600],
+    )
+    digest = rngimages.content_hash(image)
+    html = r.report
+    assert (
+        'srcset="assets/%s-200.png 200w, assets/%s-600.png 600w"'
+        % (
+            digest,
+            digest,
+        )
+        in html
+    )
+    assert html.count("data-src=") == 1
+    assert html.count('loading="lazy"') == 1
+
+
+class FakeResponse:
+    def __init__(self, url):
+        self.url = url
+        if url.endswith(".css"):
+            self.text = (
+                "@font-face{src:url(../webfonts/fa.woff2?v=5) format('woff2'),"
+                'url("data:font/woff;base64,AAAA")}'
+            )
+        else:
+            self.text = "/* %s */" % url
+        self.content = b"font bytes" if ".woff2" in url else self.text.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+def test_save_zip(tmp_path, monkeypatch):
+    import zipfile
+    import requests
+
+    fetched = []
+    monkeypatch.setattr(
+        requests, "get", lambda url, **kwargs: fetched.append(url) or FakeResponse(url)
+    )
+    image = make_png(tmp_path / "a.png")
+    r = Reportng(report_name="zip", brand="test", theme="pulse")
+    r.image_carousel([{"path": image, "caption": ""}])
+    r.image_carousel(
+        [{"path": image, "caption": ""}],
+        embed="copy",
+        asset_dir=str(tmp_path / "assets"),
+        rel_path="images/",
+        thumbnail_width=100,
+    )
+    r.save_zip(str(tmp_path / "report.zip"))
+    with zipfile.ZipFile(str(tmp_path / "report.zip")) as zf:
+        names = zf.namelist()
+        html = zf.read("report.html").decode("utf-8")
+        infos = {i.filename: i for i in zf.infolist()}
+    assert names[-1] == "report.html"
+    moved = [n for n in names if n.startswith("assets/files/") and n.endswith("a.png")]
+    assert len(moved) == 1 and 'src="%s"' % moved[0] in html
+    assert image not in html
+    copied = [n for n in names if n.startswith("images/")]
+    assert len(copied) == 2
+    assert all(infos[n].compress_type == zipfile.ZIP_STORED for n in copied)
+    assert infos["report.html"].compress_type == zipfile.ZIP_DEFLATED
+    assert "bootswatch.com" not in html
+    # fonts of the stylesheets are fetched once and stored next to them
+    fonts = [n for n in names if n.endswith("fa.woff2")]
+    downloads = [u for u in fetched if "fa.woff2" in u]
+    assert fonts and len(downloads) == len(set(downloads)) == len(fonts)
+    with zipfile.ZipFile(str(tmp_path / "report.zip")) as zf:
+        assert all(zf.read(n) == b"font bytes" for n in fonts)
+        css = [zf.read(n).decode() for n in names if n.endswith(".css")]
+    assert all("url(%s)" % n.split("/")[-1] in "".join(css) for n in fonts)
+    assert all("//" not in c.replace("data:", "") for c in css)
+
+
+def zip_links(path):
+    import re
+    import zipfile
+
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        html = zf.read("report.html").decode("utf-8")
+    links = re.findall(r'(?:src|href)="([^"]+\.(?:js|css))"', html)
+    return names, [l for l in links if rngimages.is_local(l)]
+
+
+@pytest.fixture
+def jscss(monkeypatch):
+    # Assets.local and Assets.download change the links of every report
+    for k, v in list(vars(rng.JSCSS).items()):
+        if not k.startswith("__"):
+            monkeypatch.setattr(rng.JSCSS, k, v)
+    return [v.split("/")[-1] for k, v in vars(rng.JSCSS).items() if "__" not in k]
+
+
+@pytest.mark.parametrize("rel_path", ["./assets/", "assets/"])
+def test_save_zip_local_assets(tmp_path, jscss, rel_path):
+    (tmp_path / "assets").mkdir()
+    for name in jscss:
+        (tmp_path / "assets" / name).write_text("/* %s */" % name)
+    Assets.local(rel_path)
+    r = Reportng(report_name="zip", brand="test")
+    r.section("one", "a")
+    r.save_zip(str(tmp_path / "report.zip"))
+    names, links = zip_links(str(tmp_path / "report.zip"))
+    assert links
+    # every link points at a file in the zip
+    assert all(l.replace("./", "", 1) in names for l in links)
+
+
+def test_save_zip_downloaded_assets(tmp_path, jscss, monkeypatch):
+    import requests
+
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: FakeResponse(url))
+    Assets.download(str(tmp_path / "dl") + "/", "./dl/")
+    (tmp_path / "out").mkdir()
+    # the links are not next to the zip, so they come from the working directory
+    monkeypatch.chdir(tmp_path)
+    r = Reportng(report_name="zip", brand="test")
+    r.section("one", "a")
+    r.save_zip(str(tmp_path / "out" / "report.zip"))
+    names, links = zip_links(str(tmp_path / "out" / "report.zip"))
+    assert sorted(l.replace("./", "", 1) for l in set(links)) == sorted(
+        n for n in names if n.startswith("dl/")
+    )
+    assert links
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+#: Regression threshold for the cumulative time of ``import reportng`` in microseconds
+IMPORT_BUDGET_US = int(os.environ.get("REPORTNG_IMPORT_BUDGET_US", 20000))
+
+
+def importtime(statement):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", line)
+        if m:
+            times[m.group(2)] = int(m.group(1))
+    return times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs module __getattr__")
+def test_import_is_lazy():
+    times = importtime("import reportng")
+    for module in ("reportng.core", "dominate", "requests", "typing_extensions"):
+        assert module not in times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs -X importtime")
+def test_import_time():
+    times = importtime("import reportng")
+    assert times["reportng"] < IMPORT_BUDGET_US
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs -X importtime")
+def test_lazy_attributes():
+    times = importtime("from reportng import Reportng, Assets")
+    assert "reportng.core" in times
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 from reportng import Reportng, Assets
 from pathlib import Path
+import json
+import re
+import pytest
+from reportng import rnghelpers as rng
+from reportng.rnghelpers import BudgetExceeded
 
 Assets.download(download_path="./tests/dtest/", rel_path="/", theme="pulse")
 print("download_assets")
@@ -42,6 +47,27 @@ def test_section():
     )
 
 
+def test_sections_from_records():
+    records = [
+        {"name": 'finding "<%d>"' % i, "output": '100% & "more"', "severity": c}
+        for i, c in enumerate(("red", "blue", "primary"))
+    ]
+    one = Reportng(report_name="records", brand="test")
+    for rec in records:
+        one.section(rec["name"], rec["output"], section_color=rec["severity"])
+    bulk = Reportng(report_name="records", brand="test").sections_from_records(
+        iter(records), title_key="name", content_key="output", color_key="severity"
+    )
+    # the same markup as section, apart from the random part of the anchors
+    strip = lambda s: re.sub(r'id="[^"]*"', "", s.html)
+    assert [strip(s) for s in bulk._sections] == [strip(s) for s in one._sections]
+    assert [s.title for s in bulk._sections] == [r["name"] for r in records]
+    with pytest.raises(rng.NotValidTag):
+        bulk.sections_from_records(
+            [{"title": "t", "content": "c", "c": "pink"}], color_key="c"
+        )
+
+
 def test_listgroup():
     r.list_group(
         "some title", ["some nonsense", "some other nonense", "hello world"],
@@ -140,6 +166,70 @@ def test_table():
     )
 
 
+def test_sortable_table():
+    from array import array
+    from base64 import b64decode
+
+    t = Reportng(report_name="sortable", brand="test")
+    data = [["10", "b"], ["9", "</script>"], ["x", "A"], ["10", "a"]]
+    t.table(["n", "name"], data, sortable=True, filterable=True, show_index=True)
+    resources = t._sections[0].meta["resources"]
+    assert "</script>" not in resources[0][:-9]
+    index = json.loads(resources[0].split(">", 1)[1][: -len("</script>")])
+    assert index["offset"] == 1 and index["bytes"] == 2
+    order = lambda c: list(array("H", b64decode(index["columns"][c]["order"])))
+    # numbers by value before text, text case insensitive
+    assert order(0) == [1, 0, 3, 2]
+    assert [data[i][1] for i in order(1)] == ["</script>", "A", "a", "b"]
+    assert index["columns"][1]["values"] == ["</script>", "a", "a", "b"]
+    table_id = resources[0].split('data-reportng-table="')[1].split('"')[0]
+    assert 'data-reportng-filter="%s"' % table_id in t._sections[0].html
+    # plain tables are unchanged
+    t.table(["n"], [["1"]])
+    assert "<tbody>" not in t._sections[1].html
+    assert t.report.count("th.reportng-sortable{") == 1
+
+
+def test_table_export(tmp_path, monkeypatch):
+    import gzip
+    from base64 import b64decode
+    from reportng import rngtable
+
+    e = Reportng(report_name="export", brand="test")
+    data = [[1, "a,b"], [2, '"quoted" <x>']]
+    e.table(["n", "name"], data, export="csv", section_title="Hosts", sortable=True)
+    blob = re.search(r'data-reportng-export-data="\w+">([^<]*)<', e.report).group(1)
+    assert gzip.decompress(b64decode(blob)).decode() == (
+        'n,name\r\n1,"a,b"\r\n2,"""quoted"" <x>"\r\n'
+    )
+    assert 'download="Hosts.csv"' in e._sections[0].html
+    sidecar = tmp_path / "hosts.json"
+    e.table(["n", "name"], data + [[3]], export="json", export_path=str(sidecar))
+    assert json.loads(sidecar.read_text()) == [
+        {"n": 1, "name": "a,b"},
+        {"n": 2, "name": '"quoted" <x>'},
+        {"n": 3, "name": ""},
+    ]
+    assert e._sections[1].meta["files"] == {sidecar.as_posix(): str(sidecar)}
+    assert len(re.findall(r"data-reportng-export-data=\"\w+\">", e.report)) == 1
+
+    class Broken:
+        def __str__(self):
+            raise ValueError("broken cell")
+
+    exports = []
+
+    class Recorded(rngtable.Export):
+        def __init__(self, *args):
+            super().__init__(*args)
+            exports.append(self)
+
+    monkeypatch.setattr(rngtable, "Export", Recorded)
+    with pytest.raises(ValueError):
+        e.table(["n"], [[1], [Broken()]], export="csv", export_path=str(sidecar))
+    assert exports[0]._file.closed
+
+
 def test_cards():
     r.cards(
         [
@@ -162,5 +252,236 @@ def test_footer():
     )
 
 
+def test_stats():
+    s = Reportng(report_name="stats", brand="test", collect_stats=True)
+    s.section("title", "content").table(["a"], [["1"]])
+    assert [x["builder"] for x in s.stats.records] == ["section", "table"]
+    assert s.stats.summary()["table"]["elements"] > 0
+    assert "section" in s.stats.table()
+    assert json.loads(s.stats.to_json())["records"]
+
+
+def test_budget():
+    b = Reportng(
+        report_name="budget",
+        brand="test",
+        budget={"max_table_rows": 1, "max_section_bytes": 10 ** 6},
+        budget_action="raise",
+    )
+    b.table(["a"], [["1"], ["2"]], section_title="too long")
+    with pytest.raises(BudgetExceeded, match="too long"):
+        b.save("./tests/dtest/budget.html")
+    b.budget_action = "warn"
+    assert len(b.check_budget()) == 1
+
+
+def test_budget_resources(tmp_path):
+    # the index and the export of a table are written after the sections
+    data = [[i, "host %d" % i] for i in range(2000)]
+    t = Reportng(report_name="budget", brand="test")
+    t.table(["n", "name"], data, sortable=True, export="csv", section_title="big")
+    t.save(str(tmp_path / "budget.html"))
+    size = (tmp_path / "budget.html").stat().st_size
+    t.budget = {"max_total_bytes": size}
+    assert t.check_budget() == []
+    t.budget = {"max_total_bytes": size - 1}
+    assert len(t.check_budget()) == 1
+    html = len(t._sections[0].html)
+    t.budget = {"max_section_bytes": html + 1000}
+    assert "big" in t.check_budget()[0]
+
+
+def test_resources_once():
+    d = Reportng(report_name="resources", brand="test", use_asciinema=True)
+    modal = {"button": "info", "title": "same modal", "message": "message"}
+    for i in range(3):
+        d.asciinema("./tests/test_report.py", title=str(i))
+        d.section("title", "content", add_modal=modal)
+    d.add_javascript(code="var a = 1;").add_javascript(code="var a = 1;")
+    d.add_stylesheet(css="p {color: red;}").add_stylesheet(css="p {color: red;}")
+    html = d.report
+    assert html.count(rng.JSCSS.asciinema_js) == 1
+    assert html.count('id="samemodal"') == 1
+    assert html.count("var a = 1;") == 1
+    assert html.count("p {color: red;}") == 1
+    assert html.index("p {color: red;}") < html.index("</head>")
+
+
+def test_dedup():
+    d = Reportng(report_name="dedup", brand="test", dedup_threshold=1000)
+    body = "<remediation>\n" * 1000
+    for i in range(20):
+        d.section("finding %d" % i, body).section_collapsible("details %d" % i, body)
+    html = d.report
+    assert html.count("&lt;remediation&gt;") == 1000
+    # the body is stored once, also for the search index of lazy bodies
+    assert html.count("remediation") == 1000
+    assert html.count('data-reportng-block="') == 40
+    assert html.count('data-reportng-index="collapse') == 20
+    assert html.count('">"reportng-block-') == 20
+    assert html.count("reportngExpandBlocks = ") == 1
+    saved = d.save_sharded("./tests/dtest/dedup/", max_sections_per_page=10)
+    assert len(saved) == 5
+    text = Path("./tests/dtest/dedup/assets/page-0001.js").read_text(encoding="utf-8")
+    assert "<remediation>" in text
+
+
+def test_lazy_collapsible():
+    c = Reportng(report_name="lazy", brand="test")
+    c.section_collapsible("lazy", "</script> body").section_collapsible(
+        "eager", "eager body", lazy=False
+    )
+    html = c.report
+    assert html.count('<template class="reportng-lazy-body"') == 1
+    anchor = re.search(r'data-reportng-index="collapse(\w+)">"reportng-lazy-\1"', html)
+    assert 'id="reportng-lazy-%s">' % anchor.group(1) in html
+    assert html.count("/script&gt; body") == 1
+    assert html.count("window.reportngLazyCollapse = ") == 1
+
+
+def test_head_cache():
+    from reportng import core
+
+    a = Reportng(report_name="first & name", brand="brand one")
+    b = Reportng(report_name="second", brand="<brand two>")
+    assert "<title>first &amp; name</title>" in a.report
+    assert "<title>second</title>" in b.report
+    assert "&lt;brand two&gt;" in b.report
+    assert "a8c1d" not in a.report + b.report
+    themed = Reportng(report_name="second", brand="<brand two>", theme="pulse")
+    assert "bootswatch.com/4/pulse" in themed.report
+    assert "bootswatch.com/4/pulse" not in b.report
+    assert len(core._head_cache) <= core.HEAD_CACHE_SIZE
+    # the document is built on use, with the real names
+    assert b._document is None
+    document = str(b.document)
+    assert "<title>second</title>" in document and "&lt;brand two&gt;" in document
+    assert b.document is b.document
+    assert str(b.document.head) == b._head
+
+
+def test_concurrent_ordered():
+    from concurrent.futures import ThreadPoolExecutor
+
+    c = Reportng(report_name="threads", brand="test", collect_stats=True)
+    c.section("first", "before the threads")
+
+    def collect(i):
+        with c.ordered(i + 1):
+            c.section("host %03d" % i, "content %d" % i)
+            c.table(["port"], [[str(i)]], is_section=True)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(collect, reversed(range(100))))
+    c.footer(message="message")
+    sections = c._ordered_sections()
+    assert [s.title for s in sections[1:-1:2]] == ["host %03d" % i for i in range(100)]
+    assert all(s.builder == "table" for s in sections[2:-1:2])
+    assert len(c.stats.records) == 202
+    assert c.report.index("host 000") < c.report.index("host 099")
+
+
+def test_ordered_keys():
+    o = Reportng(report_name="keys", brand="test")
+    for i in range(5):
+        o.section("pre%d" % i, "unkeyed")
+    with o.ordered(1):
+        o.section("one", "keyed")
+    with o.ordered(0):
+        o.section("zero", "keyed")
+    o.section("post", "unkeyed")
+    titles = [s.title for s in o._ordered_sections()]
+    assert titles == ["pre0", "pre1", "pre2", "pre3", "pre4", "zero", "one", "post"]
+
+    named = Reportng(report_name="keys", brand="test")
+    for host in ("b.example", "a.example"):
+        with named.ordered(host):
+            named.section(host, "keyed")
+    named.footer(message="message")
+    sections = named._ordered_sections()
+    assert [s.title for s in sections[:2]] == ["a.example", "b.example"]
+    assert sections[-1].builder == "footer"
+    assert named.report.index("a.example") < named.report.index("b.example")
+
+
+def test_journal_resume(tmp_path):
+    journal = str(tmp_path / "report.journal")
+    j = Reportng(
+        report_name="journal", brand="test", dedup_threshold=10, journal=journal
+    )
+    j.add_stylesheet(css="p {color: red;}")
+    j.section("first", "repeated body " * 5)
+    with j.ordered(0):
+        j.section("zero", "moved to the top")
+    j.section_collapsible("second", "repeated body " * 5)
+    with pytest.raises(TypeError):
+        with j.ordered(object()):
+            j.section("not serializable", "key")
+    assert len(j._sections) == 3
+    expected = j.report
+    j.close()
+    assert j._journal is None
+    # the shared template and scripts are journaled once
+    with open(journal, encoding="utf-8") as f:
+        assert f.read().count("repeated body " * 5) == 1
+    with open(journal, "a") as f:
+        f.write('{"builder": "cut of')
+
+    with Reportng.resume(journal) as resumed:
+        assert resumed.report == expected
+        assert resumed._blocks == j._blocks
+        resumed.section_collapsible("third", "repeated body " * 5)
+        resumed.section("fourth", "after the crash")
+        resumed.save(str(tmp_path / "report.html"))
+    assert resumed._journal is None
+    html = Reportng.resume(journal).report
+    assert html.index("moved to the top") < html.index("after the crash")
+    assert html.count("p {color: red;}") == 1
+    assert html.count("repeated body " * 5) == 1
+
+
+def test_save_sharded():
+    saved = r.save_sharded("./tests/dtest/sharded/", max_sections_per_page=2)
+    assert Path(saved[0]).name == "index.html"
+    assert len(saved) > 2
+    toc = Path("./tests/dtest/sharded/assets/reportng-toc.js").read_text()
+    assert 'window.addEventListener("load", populateShardDropdown)' in toc
+    # the sections of a page are only listed once, from the table of contents
+    for page in saved:
+        assert "populateDropdown" not in Path(page).read_text()
+
+
+def test_save_sharded_journal(tmp_path):
+    with Reportng(
+        report_name="journal", brand="test", journal=str(tmp_path / "journal")
+    ) as j:
+        j.journal_sync_every = 100
+        j.section("first", "body")
+        assert j._journal_pending
+        j.save_sharded(str(tmp_path / "sharded"))
+        assert j._journal_pending == 0
+
+
+def test_report_append():
+    a = Reportng(report_name="append", brand="test").section("first", "first body")
+    a.report += "<div>appended</div>"
+    html = a.report
+    assert html.count("<div>appended</div>") == 1
+    assert html.index("first body") < html.index("appended")
+    with pytest.raises(ValueError):
+        a.report = "<html></html>"
+    # appending does not render the whole report again
+    rendered = []
+    resources = a._resources
+    a._resources = lambda *args: rendered.append(args) or resources(*args)
+    for i in range(5):
+        a.report += "<p>line %d</p>" % i
+    assert rendered == []
+    a.section("last", "last body")
+    html = a.report
+    assert len(rendered) == 1
+    assert html.index("line 4") < html.index("last body")
+
+
 # def test_save():
 r.save("./tests/dtest/test.html")
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from reportng import Reportng, cli, rngsearch
+
+
+def save(path, cve):
+    r = Reportng(report_name="scan", brand="test", dedup_threshold=100)
+    r.section("Finding", "vulnerable to %s" % cve)
+    r.section_collapsible("Details", "remediation " * 20 + cve)
+    r.table(["a"], [["other"]], section_title="Table")
+    r.footer(message="footer %s" % cve)
+    r.save(str(path))
+
+
+def test_parse_report(tmp_path):
+    save(tmp_path / "a.html", "CVE-2021-44228")
+    sections = rngsearch.parse_report((tmp_path / "a.html").read_text())
+    assert [s[1] for s in sections] == ["Finding", "Details", "Table"]
+    assert sections[0][0].startswith("Finding")
+    assert "remediation" in sections[1][2]
+    assert "footer" not in sections[2][2]
+
+
+def test_parse_report_without_footer(tmp_path):
+    r = Reportng(report_name="scan", brand="test")
+    r.section_collapsible("Details", "remediation")
+    r.table(["a"], [["other"]], section_title="Table", sortable=True)
+    r.save(str(tmp_path / "a.html"))
+    sections = rngsearch.parse_report((tmp_path / "a.html").read_text())
+    assert [s[1] for s in sections] == ["Details", "Table"]
+    # the scripts after the last section are not part of it
+    assert "function" not in sections[-1][2]
+    assert sections[-1][2].split() == ["Table", "a", "other"]
+
+
+def test_index_search(tmp_path):
+    db = str(tmp_path / "index.db")
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    save(reports / "a.html", "CVE-2021-44228")
+    save(reports / "b.html", "CVE-2014-0160")
+    assert rngsearch.index([str(reports)], db=db)["indexed"] == 2
+
+    hits = rngsearch.search("CVE-2021-44228", db=db)
+    assert {h["path"] for h in hits} == {str((reports / "a.html").resolve())}
+    assert {h["title"] for h in hits} == {"Finding", "Details"}
+
+    save(reports / "b.html", "CVE-2021-44228")
+    os.utime(str(reports / "b.html"), ns=(1, 1))
+    (reports / "a.html").unlink()
+    stats = rngsearch.index([str(reports)], db=db)
+    assert (stats["indexed"], stats["unchanged"], stats["removed"]) == (1, 0, 1)
+    assert rngsearch.index([str(reports)], db=db)["unchanged"] == 1
+    hits = rngsearch.search("CVE-2021-44228", db=db)
+    assert {h["path"] for h in hits} == {str((reports / "b.html").resolve())}
+
+    assert cli.main(["search", "--db", db, "CVE-2014-0160"]) == 1
+    assert cli.main(["search", "--db", db, "--raw", "remediation NOT zzz"]) == 0
+    with pytest.raises(ValueError):
+        rngsearch.search('"unbalanced', db=db, raw=True)
+    assert cli.main(["search", "--db", db, "--raw", '"unbalanced']) == 2
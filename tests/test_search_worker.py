@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from reportng import Reportng
+from reportng import rnghelpers as rng
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("node") is None, reason="needs node to run the search script"
+)
+
+# runs the search script of a report against a minimal jQuery and DOM. The
+# worker, when enabled, runs the worker source in its own vm context
+HARNESS = """
+const vm = require("vm");
+const sent = [], received = [];
+let blobSource = null, ready = null;
+
+function Coll(items) { this.items = items || []; this.length = this.items.length; }
+Coll.prototype = {
+    each(f) { this.items.forEach((x, i) => f.call(x, i, x)); return this; },
+    map(f) { return new Coll(this.items.map((x, i) => f.call(x, i, x))); },
+    get() { return this.items; },
+    on(ev, f) { this.items.forEach(x => { x.handlers = { [ev]: f }; }); return this; },
+    add(o) { return new Coll(this.items.concat(o instanceof Coll ? o.items : o)); },
+    closest() { return new Coll(this.items.map(x => x.collapse).filter(Boolean)); },
+    attr(name) { return this.items.length ? this.items[0][name] : undefined; },
+    unmark() { this.items.forEach(x => { x.marked = null; }); return this; },
+    markRegExp(p) { this.items.forEach(x => { x.marked = p.source; }); return this; },
+    find() { return new Coll(this.items.filter(x => x.marked)); },
+    eq(i) { return new Coll(this.items.slice(i, i + 1)); },
+    removeClass() { return this; },
+    addClass() { return this; },
+    offset() { return { top: 0 }; },
+    is() { return false; },
+};
+
+const input = {}, counter = { innerHTML: "" }, templates = {}, indexes = [];
+const sections = CONFIG.sections.map((s, i) => {
+    const el = { textContent: s.lazy ? "" : s.text, querySelector: () => s.lazy ? {} : null };
+    if (s.lazy) {
+        el.collapse = { id: "collapse" + i };
+        templates["reportng-lazy-" + i] = { content: { textContent: s.text } };
+        indexes.push({
+            getAttribute: () => "collapse" + i,
+            textContent: JSON.stringify("reportng-lazy-" + i),
+        });
+    }
+    return el;
+});
+const selectors = {
+    "input[type='search']": [input],
+    ".context": sections,
+    "script[data-reportng-index]": indexes,
+};
+global.$ = function (x) {
+    if (typeof x === "function") { ready = x; return; }
+    if (x === undefined) { return new Coll(); }
+    if (typeof x === "string") { return new Coll(selectors[x] || []); }
+    return x instanceof Coll ? x : new Coll(Array.isArray(x) ? x : [x]);
+};
+global.window = global;
+global.scrollTo = () => {};
+global.document = {
+    getElementById: id => id === "searchcount" ? counter : templates[id] || null,
+};
+global.Blob = function (parts) { blobSource = parts.join(""); };
+URL.createObjectURL = () => "blob:worker";
+if (CONFIG.worker) {
+    global.Worker = function () {
+        const page = this, context = vm.createContext({ setTimeout });
+        context.postMessage = d => {
+            received.push(d);
+            setTimeout(() => page.onmessage({ data: structuredClone(d) }), 0);
+        };
+        vm.runInContext(blobSource, context);
+        this.postMessage = d => {
+            sent.push(d);
+            setTimeout(() => context.onmessage({ data: structuredClone(d) }), 0);
+        };
+    };
+}
+
+vm.runInThisContext(CONFIG.script);
+ready();
+const results = [];
+(function next(queries) {
+    if (!queries.length) {
+        console.log(JSON.stringify({ sent, received, results, worker: blobSource !== null }));
+        return;
+    }
+    input.handlers.input.call({ value: queries[0] });
+    setTimeout(() => {
+        results.push({ count: counter.innerHTML, marked: sections.map(s => s.marked || null) });
+        next(queries.slice(1));
+    }, 400);
+})(CONFIG.queries);
+"""
+
+SECTIONS = [
+    {"text": "host a port 22 open"},
+    {"text": "host b needle in the output"},
+    {"text": "remediation needle and more", "lazy": True},
+    {"text": "nothing here"},
+]
+
+
+def run_node(source):
+    return json.loads(
+        subprocess.run(
+            ["node", "-e", source],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+            timeout=60,
+        ).stdout
+    )
+
+
+def run_page(worker, queries):
+    config = {
+        "script": rng.JSCustom.markjs_script,
+        "sections": SECTIONS,
+        "worker": worker,
+        "queries": queries,
+    }
+    return run_node("const CONFIG = %s;\n%s" % (json.dumps(config), HARNESS))
+
+
+def worker_source():
+    m = re.search(
+        r"var workerSource = (\[.*?\])\.join", rng.JSCustom.markjs_script, re.S
+    )
+    return "\n".join(json.loads(m.group(1)))
+
+
+def test_report_has_one_search_script():
+    r = Reportng(report_name="search", brand="test")
+    r.section("one", "a").section("two", "b")
+    assert r.report.count("new Worker(") == 1
+
+
+def test_worker_contract():
+    # a newer query stops the scan of an older one, and an invalid regex
+    # is answered with an error instead of matches
+    texts = ["text %d" % i for i in range(1200)] + ["needle"]
+    out = run_node("""
+        const vm = require("vm"), received = [];
+        const context = vm.createContext({ setTimeout, postMessage: d => received.push(d) });
+        vm.runInContext(%s, context);
+        const send = d => context.onmessage({ data: d });
+        send({ texts: %s });
+        send({ id: 1, pattern: "text" });
+        send({ id: 2, pattern: "needle|text 7$" });
+        setTimeout(() => send({ id: 3, pattern: "(" }), 100);
+        setTimeout(() => console.log(JSON.stringify(received)), 200);
+        """ % (json.dumps(worker_source()), json.dumps(texts)))
+    assert out == [{"id": 2, "matches": [7, 1200]}, {"id": 3, "error": True}]
+
+
+def test_search_with_worker():
+    out = run_page(True, ["needle", "needle ("])
+    assert out["worker"]
+    # the worker is sent the text of every section once, lazy bodies come
+    # from the template their index points at
+    assert out["sent"][0] == {"texts": [s["text"] for s in SECTIONS]}
+    assert out["sent"][1:] == [
+        {"id": 1, "pattern": "needle"},
+        {"id": 2, "pattern": "needle ("},
+    ]
+    assert out["received"] == [{"id": 1, "matches": [1, 2]}, {"id": 2, "error": True}]
+    first, invalid = out["results"]
+    assert first == {"count": 2, "marked": [None, "needle", "needle", None]}
+    # a half typed regex keeps the previous highlights
+    assert invalid == first
+
+
+def test_search_without_worker():
+    out = run_page(False, ["needle", "port \\d+", ""])
+    assert out["sent"] == out["received"] == []
+    needle, port, cleared = out["results"]
+    assert needle == {"count": 2, "marked": [None, "needle", "needle", None]}
+    assert port == {"count": 1, "marked": ["port \\d+", None, None, None]}
+    assert cleared == {"count": 0, "marked": [None, None, None, None]}
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import random
+import statistics
+
+import pytest
+
+from reportng import Reportng, rngstats
+
+random.seed(7)
+values = [random.gauss(100, 15) for _ in range(20000)] + [1000.0, float("nan")]
+finite = values[:-1]
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(rngstats, "np", None)
+    else:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(rngstats, "CHUNK_SIZE", 3000)
+    return request.param
+
+
+def test_describe(backend):
+    s = rngstats.describe(values, percentiles=(50, 90))
+    assert s["count"] == len(finite) and s["missing"] == 1
+    assert s["min"] == min(finite) and s["max"] == 1000.0
+    assert s["mean"] == pytest.approx(statistics.mean(finite))
+    assert s["std"] == pytest.approx(statistics.pstdev(finite))
+    width = (s["max"] - s["min"]) / rngstats.BINS * 2
+    ordered = sorted(finite)
+    assert abs(s["p50"] - ordered[len(ordered) // 2]) <= width
+    assert abs(s["p90"] - ordered[int(len(ordered) * 0.9)]) <= width
+    assert sum(s["counts"]) == len(finite)
+    assert len(s["edges"]) == len(s["counts"]) + 1 == 31
+
+
+def test_describe_chunks_growing_range(backend):
+    # every chunk is outside the range of the ones before it
+    chunks = ([float(i * 100 + j) for j in range(100)] for i in range(-20, 20))
+    s = rngstats.describe(chunks)
+    assert s["count"] == 4000 and s["min"] == -2000 and s["max"] == 1999
+    assert sum(s["counts"]) == 4000
+    assert s["p50"] == pytest.approx(0, abs=1)
+    constant = rngstats.describe(iter([5] * 10))
+    assert constant["min"] == constant["p50"] == constant["max"] == 5
+    assert constant["counts"] == [10]
+    empty = rngstats.describe([])
+    assert empty["count"] == 0 and empty["counts"] == []
+
+
+def test_summary_section():
+    s = Reportng(report_name="summary", brand="test")
+    s.summary("sizes", {"a": values, "b": [1, 2, 3]}, color="red")
+    section = s._sections[0]
+    assert section.meta["stats"]["b"]["max"] == 3
+    assert section.html.count('<div class="card-header">Max</div>') == 2
+    assert '<div class="card-header">Missing</div>' in section.html
+    assert section.html.count("<svg") == 2 and 'class="text-danger"' in section.html
+    s.summary("empty", [])
+    assert s._sections[1].meta["stats"]["count"] == 0